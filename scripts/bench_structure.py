@@ -0,0 +1,81 @@
+from __future__ import annotations
+# ruff: noqa: E402
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _script_utils import ensure_src_on_path
+
+ensure_src_on_path()
+
+from ai_trader.chan.core.center import build_zhongshus_from_bis
+from ai_trader.chan.core.segment import build_segments
+from ai_trader.types import Bi, BiColumns
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark segment and center building on synthetic bis")
+    parser.add_argument("--bis", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def synthetic_bis(count: int, seed: int) -> list[Bi]:
+    """Alternating up/down bis whose pivots follow a random walk."""
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1, tzinfo=timezone.utc)
+    price = 20000.0
+    bis: list[Bi] = []
+    for i in range(count):
+        direction = "up" if i % 2 == 0 else "down"
+        move = rng.uniform(50.0, 600.0)
+        end_price = price + move if direction == "up" else max(1.0, price - move)
+        when = start + timedelta(hours=4 * 5 * (i + 1))
+        bis.append(
+            Bi(
+                direction=direction,
+                start_index=5 * i,
+                end_index=5 * (i + 1),
+                start_price=price,
+                end_price=end_price,
+                event_time=when,
+                available_time=when + timedelta(hours=4),
+            )
+        )
+        price = end_price
+    return bis
+
+
+def _best_of(repeat: int, fn) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    args = parse_args()
+    bis = synthetic_bis(args.bis, args.seed)
+
+    columns_s, cols = _best_of(args.repeat, lambda: BiColumns.from_bis(bis))
+    segments_s, segments = _best_of(args.repeat, lambda: build_segments(bis))
+    segments_cols_s, _ = _best_of(args.repeat, lambda: build_segments(cols))
+    centers_s, centers = _best_of(args.repeat, lambda: build_zhongshus_from_bis(bis))
+    centers_cols_s, _ = _best_of(args.repeat, lambda: build_zhongshus_from_bis(cols))
+
+    print(f"bis={len(bis)} segments={len(segments)} zhongshus={len(centers)} (best of {args.repeat})")
+    print(f"BiColumns.from_bis           {columns_s * 1000:9.1f} ms")
+    print(f"build_segments(bis)          {segments_s * 1000:9.1f} ms")
+    print(f"build_segments(columns)      {segments_cols_s * 1000:9.1f} ms")
+    print(f"build_zhongshus_from_bis     {centers_s * 1000:9.1f} ms")
+    print(f"build_zhongshus(columns)     {centers_cols_s * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+# ruff: noqa: E402
+
+import argparse
+import sys
+from pathlib import Path
+
+from _script_utils import ensure_src_on_path
+
+ensure_src_on_path()
+
+from ai_trader.data.binance_ohlcv import data_root, read_bars_csv, split_legacy_file, timeframe_to_ms
+from ai_trader.data.manifest import iter_cache_dirs, load_manifest, record_cache_file, verify_cache_dir
+from ai_trader.types import iso_utc, parse_utc_time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="List, verify or rebuild OHLCV cache manifests")
+    parser.add_argument("command", choices=("list", "verify", "rebuild"))
+    parser.add_argument("--root", default="", help="cache root (default $AI_TRADER_DATA_DIR or data/raw)")
+    parser.add_argument("--quick", action="store_true", help="verify: compare size/mtime only, skip checksums")
+    return parser.parse_args()
+
+
+def _fmt_ms(ms: int | None) -> str:
+    return iso_utc(parse_utc_time(ms / 1000)) if ms is not None else "-"
+
+
+def _list(root: Path) -> int:
+    for directory in iter_cache_dirs(root):
+        for name, entry in sorted(load_manifest(directory).items()):
+            print(
+                f"{directory.relative_to(root)}/{name} tf={entry.timeframe} bars={entry.bars} "
+                f"gaps={max(0, len(entry.coverage) - 1)} {_fmt_ms(entry.start_ms)} -> {_fmt_ms(entry.end_ms)} "
+                f"updated={entry.updated_at}"
+            )
+    return 0
+
+
+def _verify(root: Path, quick: bool) -> int:
+    failures = 0
+    for directory in iter_cache_dirs(root):
+        for issue in verify_cache_dir(directory, checksums=not quick):
+            print(f"{issue.path.relative_to(root)}: {issue.problem}")
+            failures += 1
+    print(f"verify: {failures} issue(s)")
+    return 1 if failures else 0
+
+
+def _rebuild(root: Path) -> int:
+    # Manifests for caches written before they existed; parses every file.
+    # Single-file caches are split into chunks on the way.
+    for legacy in sorted(root.glob("*/*/*.csv")):
+        try:
+            timeframe_to_ms(legacy.stem)
+        except ValueError:
+            continue
+        split_legacy_file(legacy, legacy.stem)
+        print(f"{legacy.relative_to(root)} split into chunks")
+    for path in sorted(root.glob("*/*/*/*.csv")):
+        timeframe = path.parent.name
+        try:
+            step_ms = timeframe_to_ms(timeframe)
+        except ValueError:
+            continue
+        bars = read_bars_csv(path)
+        entry = record_cache_file(path, bars, timeframe, step_ms)
+        print(f"{path.relative_to(root)} bars={entry.bars} runs={len(entry.coverage)}")
+    return 0
+
+
+def main() -> None:
+    args = parse_args()
+    root = Path(args.root) if args.root else data_root()
+    if args.command == "list":
+        code = _list(root)
+    elif args.command == "verify":
+        code = _verify(root, args.quick)
+    else:
+        code = _rebuild(root)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
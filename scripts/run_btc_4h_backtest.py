@@ -11,7 +11,8 @@ from _script_utils import ensure_src_on_path, write_csv_rows
 
 ensure_src_on_path()
 
-from ai_trader.backtest.engine import run_backtest, run_sensitivity
+from ai_trader.backtest.engine import cached_decision_stream, run_backtest, run_sensitivity
+from ai_trader.backtest.execution import BenchmarkReturnPool
 from ai_trader.data.binance_ohlcv import load_ohlcv
 from ai_trader.types import BacktestConfig
 
@@ -33,6 +34,16 @@ def main() -> None:
         action="store_true",
         help="enable the expensive in-loop signal repaint consistency check",
     )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_true",
+        help="recompute the per-bar decision stream instead of loading it from the result cache",
+    )
+    parser.add_argument(
+        "--resample-base",
+        default="",
+        help="derive the 4h bars locally from this cached timeframe, e.g. 1h",
+    )
     args = parser.parse_args()
 
     config = BacktestConfig(
@@ -54,12 +65,28 @@ def main() -> None:
         structure_lookback_main_bars=720,
         structure_lookback_sub_bars=2880,
         check_signal_repaint=args.repaint_check,
+        resample_base_timeframe=args.resample_base or None,
     )
 
-    bars_main = load_ohlcv(config.exchange, config.symbol, config.timeframe_main, config.start_utc, config.end_utc)
-    bars_sub = load_ohlcv(config.exchange, config.symbol, config.timeframe_sub, config.start_utc, config.end_utc)
+    bars_main, bars_sub = (
+        load_ohlcv(
+            config.exchange,
+            config.symbol,
+            timeframe,
+            config.start_utc,
+            config.end_utc,
+            base_timeframe=config.resample_base_timeframe,
+        )
+        for timeframe in (config.timeframe_main, config.timeframe_sub)
+    )
 
-    base_report = run_backtest(config, bars_main=bars_main, bars_sub=bars_sub)
+    # Cost scenarios only change execution, so they replay the same stream;
+    # every run on these bars draws benchmarks from one pool.
+    stream = None if args.no_result_cache else cached_decision_stream(config, bars_main, bars_sub)
+    pool = BenchmarkReturnPool.from_bars(sorted(bars_main, key=lambda x: x.time))
+    base_report = run_backtest(
+        config, bars_main=bars_main, bars_sub=bars_sub, decision_stream=stream, benchmark_pool=pool
+    )
     cost_reports = {"base": base_report}
     if args.cost_scenarios:
         cost_reports.update(
@@ -68,16 +95,20 @@ def main() -> None:
                     replace(config, fee_rate=0.0015, slippage_rate=0.0005),
                     bars_main=bars_main,
                     bars_sub=bars_sub,
+                    decision_stream=stream,
+                    benchmark_pool=pool,
                 ),
                 "stress_2": run_backtest(
                     replace(config, fee_rate=0.0020, slippage_rate=0.0010),
                     bars_main=bars_main,
                     bars_sub=bars_sub,
+                    decision_stream=stream,
+                    benchmark_pool=pool,
                 ),
             }
         )
     sensitivity_reports = (
-        run_sensitivity(config, bars_main=bars_main, bars_sub=bars_sub)
+        run_sensitivity(config, bars_main=bars_main, bars_sub=bars_sub, benchmark_pool=pool)
         if args.sensitivity
         else {}
     )
@@ -11,7 +11,9 @@ from _script_utils import ensure_src_on_path, write_csv_rows
 ensure_src_on_path()
 
 from ai_trader.chan import build_chan_state, generate_signal
+from ai_trader.chan.config import get_chan_config
 from ai_trader.data.binance_ohlcv import load_ohlcv
+from ai_trader.result_cache import ResultCache, bars_fingerprint, result_cache_key
 from ai_trader.types import Bi, Fractal, Segment, Zhongshu, iso_utc, parse_utc_time
 
 
@@ -21,10 +23,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--symbol", default="BTC/USDT")
     parser.add_argument("--timeframe-main", default="4h")
     parser.add_argument("--timeframe-sub", default="1h")
+    parser.add_argument("--resample-base", default="", help="derive coarser timeframes from this cached one, e.g. 1h")
     parser.add_argument("--start", default="2024-01-01T00:00:00Z")
     parser.add_argument("--end", default="2026-02-10T00:00:00Z")
     parser.add_argument("--asof", default="", help="analysis timestamp in UTC ISO8601; default is --end")
     parser.add_argument("--output-root", default="outputs/diagnostics")
+    parser.add_argument("--no-result-cache", action="store_true", help="recompute instead of using the result cache")
     return parser.parse_args()
 
 
@@ -112,21 +116,44 @@ def main() -> None:
 
     asof = parse_utc_time(args.asof if args.asof else args.end)
 
-    bars_main = load_ohlcv(args.exchange, args.symbol, args.timeframe_main, args.start, args.end)
-    bars_sub = load_ohlcv(args.exchange, args.symbol, args.timeframe_sub, args.start, args.end)
-
-    snapshot = build_chan_state(
-        bars_main=bars_main,
-        bars_sub=bars_sub,
-        macd_main=None,
-        macd_sub=None,
-        asof_time=asof,
-        exchange=args.exchange,
-        symbol=args.symbol,
-        timeframe_main=args.timeframe_main,
-        timeframe_sub=args.timeframe_sub,
+    bars_main = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_main, args.start, args.end, base_timeframe=args.resample_base
     )
-    decision = generate_signal(snapshot)
+    bars_sub = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_sub, args.start, args.end, base_timeframe=args.resample_base
+    )
+
+    cfg = get_chan_config("orthodox_chan")
+
+    def _compute():
+        snapshot = build_chan_state(
+            bars_main=bars_main,
+            bars_sub=bars_sub,
+            macd_main=None,
+            macd_sub=None,
+            asof_time=asof,
+            exchange=args.exchange,
+            symbol=args.symbol,
+            timeframe_main=args.timeframe_main,
+            timeframe_sub=args.timeframe_sub,
+            chan_config=cfg,
+        )
+        return snapshot, generate_signal(snapshot, chan_config=cfg)
+
+    if args.no_result_cache:
+        snapshot, decision = _compute()
+    else:
+        key = result_cache_key(
+            "chan_diagnostic",
+            bars_fingerprint(bars_main),
+            bars_fingerprint(bars_sub),
+            asof=asof,
+            exchange=args.exchange,
+            symbol=args.symbol,
+            timeframes=(args.timeframe_main, args.timeframe_sub),
+            chan=cfg,
+        )
+        snapshot, decision = ResultCache().get_or_compute(key, _compute)
     payload = decision.to_contract_dict()
 
     run_id = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
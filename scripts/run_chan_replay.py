@@ -12,11 +12,14 @@ from _script_utils import ensure_src_on_path, write_csv_rows
 ensure_src_on_path()
 
 from ai_trader.chan import build_chan_state, generate_signal
-from ai_trader.chan.engine import suppress_seen_signal_events
-from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.engine import structure_summary, suppress_seen_signal_events
+from ai_trader.chan.config import ChanConfig, get_chan_config
+from ai_trader.chan.dedup import SignalEventStore, TurningGuardBook
+from ai_trader.chan.delta import SnapshotDiffer
 from ai_trader.data.binance_ohlcv import load_ohlcv
-from ai_trader.indicators import compute_macd
-from ai_trader.types import iso_utc, parse_utc_time
+from ai_trader.indicators import MACDView, compute_macd
+from ai_trader.result_cache import ResultCache, bars_fingerprint, result_cache_key
+from ai_trader.types import Bar, DecisionStep, iso_utc, parse_utc_time
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,6 +30,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--symbol", default="BTC/USDT")
     parser.add_argument("--timeframe-main", default="4h")
     parser.add_argument("--timeframe-sub", default="1h")
+    parser.add_argument("--resample-base", default="", help="derive coarser timeframes from this cached one, e.g. 1h")
     parser.add_argument("--start", default="2024-01-01T00:00:00Z")
     parser.add_argument("--end", default="2025-12-31T23:59:59Z")
     parser.add_argument("--chan-mode", default="orthodox_chan", choices=("strict_kline8", "orthodox_chan", "pragmatic"))
@@ -39,6 +43,12 @@ def parse_args() -> argparse.Namespace:
         help="number of recent focus rows to render in summary.md",
     )
     parser.add_argument("--output-root", default="outputs/replays")
+    parser.add_argument("--no-result-cache", action="store_true", help="recompute instead of using the result cache")
+    parser.add_argument(
+        "--deltas",
+        action="store_true",
+        help="also write per-bar structure changes to structure_deltas.jsonl",
+    )
     return parser.parse_args()
 
 
@@ -64,9 +74,9 @@ def _last_zhongshu_fields(payload: dict) -> dict[str, float]:
     }
 
 
-def _replay_row(snapshot, payload: dict, asof_close: float) -> dict:
+def _replay_row(summary: dict, payload: dict, asof_close: float) -> dict:
     row = {
-        "asof": iso_utc(snapshot.asof_time),
+        "asof": iso_utc(summary["asof_time"]),
         "close": asof_close,
         "data_quality": payload["data_quality"]["status"],
         "action": payload["action"]["decision"],
@@ -80,16 +90,16 @@ def _replay_row(snapshot, payload: dict, asof_close: float) -> dict:
         "current_stroke_dir": payload["market_state"]["current_stroke_dir"],
         "current_segment_dir": payload["market_state"]["current_segment_dir"],
         "previous_main_available_time": (
-            iso_utc(snapshot.previous_main_bar_time)
-            if snapshot.previous_main_bar_time is not None
+            iso_utc(summary["previous_main_bar_time"])
+            if summary["previous_main_bar_time"] is not None
             else ""
         ),
-        "bars_main": len(snapshot.bars_main),
-        "bars_sub": len(snapshot.bars_sub),
-        "bis_main": len(snapshot.bis_main),
-        "bis_sub": len(snapshot.bis_sub),
-        "segments_main": len(snapshot.segments_main),
-        "segments_sub": len(snapshot.segments_sub),
+        "bars_main": summary["bars_main"],
+        "bars_sub": summary["bars_sub"],
+        "bis_main": summary["bis_main"],
+        "bis_sub": summary["bis_sub"],
+        "segments_main": summary["segments_main"],
+        "segments_sub": summary["segments_sub"],
         "signals": _signal_types(payload["signals"]),
         "signal_summary": _signal_summary(payload["signals"]),
         "signals_json": json.dumps(payload["signals"], ensure_ascii=False),
@@ -121,6 +131,50 @@ def _focus_markdown_rows(rows: list[dict]) -> list[str]:
     return lines
 
 
+def _replay_steps(
+    args: argparse.Namespace,
+    cfg: ChanConfig,
+    bars_main: list[Bar],
+    bars_sub: list[Bar],
+    start_index: int,
+) -> list[DecisionStep]:
+    macd_main_full = MACDView(compute_macd(bars_main))
+    macd_sub_full = MACDView(compute_macd(bars_sub))
+
+    differ = SnapshotDiffer() if args.deltas else None
+    steps: list[DecisionStep] = []
+    sub_cursor = 0
+    for i in range(start_index, len(bars_main)):
+        bar = bars_main[i]
+        while sub_cursor < len(bars_sub) and bars_sub[sub_cursor].time <= bar.time:
+            sub_cursor += 1
+
+        snapshot = build_chan_state(
+            bars_main=bars_main[: i + 1],
+            bars_sub=bars_sub[:sub_cursor],
+            macd_main=macd_main_full,
+            macd_sub=macd_sub_full,
+            asof_time=bar.time,
+            exchange=args.exchange,
+            symbol=args.symbol,
+            timeframe_main=args.timeframe_main,
+            timeframe_sub=args.timeframe_sub,
+            chan_config=cfg,
+        )
+        summary = structure_summary(snapshot)
+        if differ is not None:
+            summary["delta"] = differ.diff(snapshot).to_dict()
+        steps.append(
+            DecisionStep(
+                time=bar.time,
+                decision=generate_signal(snapshot=snapshot, chan_config=cfg),
+                last_zhongshu_main=snapshot.last_zhongshu_main,
+                summary=summary,
+            )
+        )
+    return steps
+
+
 def main() -> None:
     args = parse_args()
     cfg = get_chan_config(args.chan_mode)
@@ -129,10 +183,10 @@ def main() -> None:
     load_start = iso_utc(eval_start - timedelta(days=args.history_lookback_days))
 
     bars_main = load_ohlcv(
-        args.exchange, args.symbol, args.timeframe_main, load_start, args.end
+        args.exchange, args.symbol, args.timeframe_main, load_start, args.end, base_timeframe=args.resample_base
     )
     bars_sub = load_ohlcv(
-        args.exchange, args.symbol, args.timeframe_sub, load_start, args.end
+        args.exchange, args.symbol, args.timeframe_sub, load_start, args.end, base_timeframe=args.resample_base
     )
     bars_main.sort(key=lambda x: x.time)
     bars_sub.sort(key=lambda x: x.time)
@@ -142,44 +196,44 @@ def main() -> None:
             f"bars_main={len(bars_main)} must be > warmup_bars={args.warmup_bars}"
         )
 
-    macd_main_full = compute_macd(bars_main)
-    macd_sub_full = compute_macd(bars_sub)
-
     rows: list[dict] = []
     focus_rows: list[dict] = []
     action_counter: Counter[str] = Counter()
-    seen_signal_keys: set[tuple] = set()
-    turning_signal_guards: dict[tuple, dict[str, object]] = {}
+    seen_signal_keys = SignalEventStore()
+    turning_signal_guards = TurningGuardBook()
     signal_counter: Counter[str] = Counter()
     phase_counter: Counter[str] = Counter()
     conflict_counter: Counter[str] = Counter()
 
-    sub_cursor = 0
     eval_start_idx = next(
         (i for i, item in enumerate(bars_main) if item.time >= eval_start),
         len(bars_main),
     )
     start_index = max(args.warmup_bars, eval_start_idx)
-    for i in range(start_index, len(bars_main)):
-        bar = bars_main[i]
-        while sub_cursor < len(bars_sub) and bars_sub[sub_cursor].time <= bar.time:
-            sub_cursor += 1
 
-        snapshot = build_chan_state(
-            bars_main=bars_main[: i + 1],
-            bars_sub=bars_sub[:sub_cursor],
-            macd_main=macd_main_full,
-            macd_sub=macd_sub_full,
-            asof_time=bar.time,
+    # The structure pass is the expensive part and depends only on the bars
+    # and config; event suppression below is cheap and always re-run.
+    if args.no_result_cache:
+        steps = _replay_steps(args, cfg, bars_main, bars_sub, start_index)
+    else:
+        key = result_cache_key(
+            "chan_replay",
+            bars_fingerprint(bars_main),
+            bars_fingerprint(bars_sub),
+            start_index=start_index,
             exchange=args.exchange,
             symbol=args.symbol,
-            timeframe_main=args.timeframe_main,
-            timeframe_sub=args.timeframe_sub,
-            chan_config=cfg,
+            timeframes=(args.timeframe_main, args.timeframe_sub),
+            chan=cfg,
+            deltas=args.deltas,
         )
-        decision = generate_signal(snapshot=snapshot, chan_config=cfg)
+        steps = ResultCache().get_or_compute(
+            key, lambda: _replay_steps(args, cfg, bars_main, bars_sub, start_index)
+        )
+
+    for bar, step in zip(bars_main[start_index:], steps):
         decision = suppress_seen_signal_events(
-            decision=decision,
+            decision=step.decision,
             seen_signal_keys=seen_signal_keys,
             chan_config=cfg,
             min_confidence=cfg.min_confidence,
@@ -188,7 +242,7 @@ def main() -> None:
             asof_high=bar.high,
         )
         payload = decision.to_contract_dict()
-        row = _replay_row(snapshot, payload, asof_close=bar.close)
+        row = _replay_row(step.summary, payload, asof_close=bar.close)
         rows.append(row)
 
         action_counter[row["action"]] += 1
@@ -211,6 +265,11 @@ def main() -> None:
 
     write_csv_rows(out_dir / "replay_rows.csv", rows)
     write_csv_rows(out_dir / "focus_rows.csv", focus_rows)
+    if args.deltas:
+        # The first line carries the full structure at the first replayed bar.
+        with (out_dir / "structure_deltas.jsonl").open("w", encoding="utf-8") as f:
+            for step in steps:
+                f.write(json.dumps(step.summary["delta"], ensure_ascii=False) + "\n")
 
     summary = {
         "exchange": args.exchange,
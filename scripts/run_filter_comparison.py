@@ -12,6 +12,7 @@ from _script_utils import ensure_src_on_path
 ensure_src_on_path()
 
 from ai_trader.backtest.engine import run_backtest
+from ai_trader.backtest.execution import BenchmarkReturnPool
 from ai_trader.data.binance_ohlcv import load_ohlcv
 from ai_trader.types import BacktestConfig
 
@@ -75,8 +76,9 @@ def main() -> None:
     strict_cfg = replace(base_config, chan_mode="strict_kline8")
     pragmatic_cfg = replace(base_config, chan_mode="pragmatic")
 
-    strict_report = run_backtest(strict_cfg, bars_main=bars_main, bars_sub=bars_sub)
-    pragmatic_report = run_backtest(pragmatic_cfg, bars_main=bars_main, bars_sub=bars_sub)
+    pool = BenchmarkReturnPool.from_bars(sorted(bars_main, key=lambda x: x.time))
+    strict_report = run_backtest(strict_cfg, bars_main=bars_main, bars_sub=bars_sub, benchmark_pool=pool)
+    pragmatic_report = run_backtest(pragmatic_cfg, bars_main=bars_main, bars_sub=bars_sub, benchmark_pool=pool)
 
     strict_metrics = _pick_metrics(strict_report)
     pragmatic_metrics = _pick_metrics(pragmatic_report)
@@ -13,12 +13,14 @@ from _script_utils import ensure_src_on_path, write_csv_rows
 ensure_src_on_path()
 
 from ai_trader.chan import build_chan_state, generate_signal
-from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.config import ChanConfig, get_chan_config
 from ai_trader.chan.core.buy_sell_points import allow_high_conflict_reversal
 from ai_trader.chan.core.divergence import _find_trend_segments
+from ai_trader.chan.dedup import SignalEventStore, TurningGuardBook
 from ai_trader.chan.engine import suppress_seen_signal_events
 from ai_trader.data.binance_ohlcv import load_ohlcv
-from ai_trader.types import Bi, Signal, Zhongshu, iso_utc
+from ai_trader.result_cache import ResultCache, bars_fingerprint, result_cache_key
+from ai_trader.types import Bar, Bi, ChanSnapshot, DecisionStep, Signal, Zhongshu, iso_utc
 
 
 @dataclass(slots=True)
@@ -55,6 +57,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--symbol", default="BTC/USDT")
     parser.add_argument("--timeframe-main", default="4h")
     parser.add_argument("--timeframe-sub", default="1h")
+    parser.add_argument("--resample-base", default="", help="derive coarser timeframes from this cached one, e.g. 1h")
     parser.add_argument(
         "--chan-mode",
         default="orthodox_chan",
@@ -64,6 +67,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--end", default="2025-12-31T23:59:59Z")
     parser.add_argument("--warmup-bars", type=int, default=120)
     parser.add_argument("--output-root", default="outputs/diagnostics")
+    parser.add_argument("--no-result-cache", action="store_true", help="recompute instead of using the result cache")
     return parser.parse_args()
 
 
@@ -203,24 +207,36 @@ def _primary_reversal_signal(decision, action: str):
     return None
 
 
-def main() -> None:
-    args = parse_args()
-    cfg = get_chan_config(args.chan_mode)
-
-    bars_main = load_ohlcv(args.exchange, args.symbol, args.timeframe_main, args.start, args.end)
-    bars_sub = load_ohlcv(args.exchange, args.symbol, args.timeframe_sub, args.start, args.end)
+def _structure_check(signal: Signal, snap: ChanSnapshot) -> tuple[str, bool, str] | None:
+    """Rule checks that depend only on the snapshot; B2/S2 also need run state."""
+    if signal.type == "B1":
+        return ("b1_trend_new_low", *_rule_b1(signal, snap.bis_main, snap.zhongshus_main))
+    if signal.type == "S1":
+        return ("s1_trend_new_high", *_rule_s1(signal, snap.bis_main, snap.zhongshus_main))
+    close = snap.bars_main[-1].close if snap.bars_main else 0.0
+    last_bi = snap.bis_main[-1] if snap.bis_main else None
+    if signal.type == "B3":
+        return (
+            "b3_leave_anchor_center",
+            *_rule_b3(close, last_bi, signal, snap.zhongshus_main, snap.last_zhongshu_main),
+        )
+    if signal.type == "S3":
+        return (
+            "s3_leave_anchor_center",
+            *_rule_s3(close, last_bi, signal, snap.zhongshus_main, snap.last_zhongshu_main),
+        )
+    return None
 
-    signal_counter = Counter()
-    action_counter = Counter()
-    conflict_counter = Counter()
-    policy_violations = defaultdict(list)
-    signal_rows: list[SignalAuditRow] = []
-    seen_signal_keys: set[tuple] = set()
-    turning_signal_guards: dict[tuple, dict[str, object]] = {}
-    emitted_first_class_keys: set[tuple[str, int | None, int | None]] = set()
 
+def _audit_steps(
+    args: argparse.Namespace,
+    cfg: ChanConfig,
+    bars_main: list[Bar],
+    bars_sub: list[Bar],
+    start_index: int,
+) -> list[DecisionStep]:
+    steps: list[DecisionStep] = []
     sub_cursor = 0
-    start_index = max(args.warmup_bars, cfg.min_main_bars)
     for i in range(start_index, len(bars_main)):
         asof_bar = bars_main[i]
         while sub_cursor < len(bars_sub) and bars_sub[sub_cursor].time <= asof_bar.time:
@@ -239,8 +255,68 @@ def main() -> None:
             chan_config=cfg,
         )
         decision = generate_signal(snapshot=snap, chan_config=cfg)
+        steps.append(
+            DecisionStep(
+                time=asof_bar.time,
+                decision=decision,
+                last_zhongshu_main=snap.last_zhongshu_main,
+                summary={
+                    "signal_checks": [_structure_check(item, snap) for item in decision.signals],
+                    "bis_sub_tail": snap.bis_sub[-2:],
+                },
+            )
+        )
+    return steps
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = get_chan_config(args.chan_mode)
+
+    bars_main = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_main, args.start, args.end, base_timeframe=args.resample_base
+    )
+    bars_sub = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_sub, args.start, args.end, base_timeframe=args.resample_base
+    )
+
+    signal_counter = Counter()
+    action_counter = Counter()
+    conflict_counter = Counter()
+    policy_violations = defaultdict(list)
+    signal_rows: list[SignalAuditRow] = []
+    seen_signal_keys = SignalEventStore()
+    turning_signal_guards = TurningGuardBook()
+    emitted_first_class_keys: set[tuple[str, int | None, int | None]] = set()
+
+    start_index = max(args.warmup_bars, cfg.min_main_bars)
+    if args.no_result_cache:
+        steps = _audit_steps(args, cfg, bars_main, bars_sub, start_index)
+    else:
+        key = result_cache_key(
+            "kline8_audit",
+            bars_fingerprint(bars_main),
+            bars_fingerprint(bars_sub),
+            start_index=start_index,
+            exchange=args.exchange,
+            symbol=args.symbol,
+            timeframes=(args.timeframe_main, args.timeframe_sub),
+            chan=cfg,
+        )
+        steps = ResultCache().get_or_compute(
+            key, lambda: _audit_steps(args, cfg, bars_main, bars_sub, start_index)
+        )
+
+    for asof_bar, step in zip(bars_main[start_index:], steps):
+        # Suppression keeps a subset of the raw signal objects, so the
+        # precomputed checks are looked up by identity.
+        checks = {
+            id(item): check
+            for item, check in zip(step.decision.signals, step.summary["signal_checks"])
+        }
+        bis_sub_tail = step.summary["bis_sub_tail"]
         decision = suppress_seen_signal_events(
-            decision=decision,
+            decision=step.decision,
             seen_signal_keys=seen_signal_keys,
             chan_config=cfg,
             min_confidence=cfg.min_confidence,
@@ -279,28 +355,14 @@ def main() -> None:
             detail = ""
             check_name = ""
 
-            if sig_obj.type == "B1":
-                check_name = "b1_trend_new_low"
-                ok, detail = _rule_b1(sig_obj, snap.bis_main, snap.zhongshus_main)
-            elif sig_obj.type == "S1":
-                check_name = "s1_trend_new_high"
-                ok, detail = _rule_s1(sig_obj, snap.bis_main, snap.zhongshus_main)
-            elif sig_obj.type == "B2":
+            if sig_obj.type == "B2":
                 check_name = "b2_need_prior_b1_sub_confirm"
-                ok, detail = _rule_b2(sig_obj, known_first_class_keys, snap.bis_sub)
+                ok, detail = _rule_b2(sig_obj, known_first_class_keys, bis_sub_tail)
             elif sig_obj.type == "S2":
                 check_name = "s2_need_prior_s1_sub_confirm"
-                ok, detail = _rule_s2(sig_obj, known_first_class_keys, snap.bis_sub)
-            elif sig_obj.type == "B3":
-                check_name = "b3_leave_anchor_center"
-                close = snap.bars_main[-1].close if snap.bars_main else 0.0
-                last_bi = snap.bis_main[-1] if snap.bis_main else None
-                ok, detail = _rule_b3(close, last_bi, sig_obj, snap.zhongshus_main, snap.last_zhongshu_main)
-            elif sig_obj.type == "S3":
-                check_name = "s3_leave_anchor_center"
-                close = snap.bars_main[-1].close if snap.bars_main else 0.0
-                last_bi = snap.bis_main[-1] if snap.bis_main else None
-                ok, detail = _rule_s3(close, last_bi, sig_obj, snap.zhongshus_main, snap.last_zhongshu_main)
+                ok, detail = _rule_s2(sig_obj, known_first_class_keys, bis_sub_tail)
+            elif checks.get(id(sig_obj)) is not None:
+                check_name, ok, detail = checks[id(sig_obj)]
 
             row = SignalAuditRow(
                 asof=iso_utc(asof_bar.time),
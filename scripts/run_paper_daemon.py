@@ -0,0 +1,120 @@
+from __future__ import annotations
+# ruff: noqa: E402
+
+import argparse
+import asyncio
+import json
+import statistics
+from pathlib import Path
+
+from _script_utils import ensure_src_on_path
+
+ensure_src_on_path()
+
+from ai_trader.data import cache_path_for, load_ohlcv
+from ai_trader.live import PaperDecision, PaperTrader, ReplayFileFeed, WebSocketFeed, run_paper_daemon
+from ai_trader.types import BacktestConfig, iso_utc
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Paper-trade the Chan strategy on a live or replayed bar feed")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--timeframe-main", default="4h")
+    parser.add_argument("--timeframe-sub", default="1h")
+    parser.add_argument("--chan-mode", default="orthodox_chan", choices=("strict_kline8", "orthodox_chan", "pragmatic"))
+    parser.add_argument("--feed", default="replay", choices=("replay", "ws"))
+    parser.add_argument("--replay-path", default="", help="cache CSV to replay; defaults to the sub timeframe cache")
+    parser.add_argument("--start", default="", help="first bar (close time) to replay")
+    parser.add_argument("--end", default="", help="last bar (close time) to replay")
+    parser.add_argument("--delay", type=float, default=0.0, help="replay pacing in seconds per bar")
+    parser.add_argument("--ws-url", default="ws://127.0.0.1:8765/ws")
+    parser.add_argument(
+        "--prime-start",
+        default="",
+        help="when starting fresh, load cached history from here up to --prime-end without trading",
+    )
+    parser.add_argument("--prime-end", default="")
+    parser.add_argument("--state-path", default="", help="defaults to outputs/paper/<exchange>_<symbol>_<tf>.pkl")
+    parser.add_argument("--reset", action="store_true", help="ignore saved state and start a fresh account")
+    return parser.parse_args()
+
+
+def _default_state_path(config: BacktestConfig) -> Path:
+    symbol = config.symbol.replace("/", "")
+    return Path("outputs/paper") / f"{config.exchange}_{symbol}_{config.timeframe_main}_{config.timeframe_sub}.pkl"
+
+
+def main() -> None:
+    args = parse_args()
+    config = BacktestConfig(
+        exchange=args.exchange,
+        symbol=args.symbol,
+        timeframe_main=args.timeframe_main,
+        timeframe_sub=args.timeframe_sub,
+        chan_mode=args.chan_mode,
+    )
+    state_path = Path(args.state_path) if args.state_path else _default_state_path(config)
+
+    if state_path.exists() and not args.reset:
+        trader = PaperTrader.load(state_path)
+        print(f"Resumed {state_path} asof={iso_utc(trader.asof_time) if trader.asof_time else '-'}")
+    else:
+        trader = PaperTrader(config)
+        if args.prime_start and args.prime_end:
+            history = load_ohlcv(
+                exchange=config.exchange,
+                symbol=config.symbol,
+                timeframe=config.timeframe_sub,
+                start_utc=args.prime_start,
+                end_utc=args.prime_end,
+            )
+            trader.prime(history)
+            print(f"Primed {len(history)} {config.timeframe_sub} bars, main bars={len(trader.bars_main)}")
+
+    if args.feed == "ws":
+        feed = WebSocketFeed(args.ws_url, config.timeframe_sub)
+    else:
+        replay_path = args.replay_path or cache_path_for(config.exchange, config.symbol, config.timeframe_sub)
+        feed = ReplayFileFeed(
+            replay_path,
+            config.timeframe_sub,
+            start_utc=args.start or None,
+            end_utc=args.end or None,
+            delay=args.delay,
+        )
+
+    log_path = state_path.with_suffix(".decisions.jsonl")
+
+    def on_decision(event: PaperDecision) -> None:
+        payload = event.decision.to_contract_dict()
+        record = {
+            "time": iso_utc(event.time),
+            "action": payload["action"]["decision"],
+            "signals": [item["type"] for item in payload["signals"]],
+            "equity": round(event.equity, 2),
+            "drawdown": round(event.drawdown, 4),
+            "position_qty": event.position_qty,
+            "latency_ms": round(event.latency_ms, 3),
+        }
+        with log_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(
+            f"{record['time']} action={record['action']} signals={','.join(record['signals']) or '-'} "
+            f"equity={record['equity']:.2f} latency={record['latency_ms']:.2f}ms"
+        )
+
+    try:
+        asyncio.run(run_paper_daemon(trader, feed, state_path=state_path, on_decision=on_decision))
+    except KeyboardInterrupt:
+        pass
+
+    latencies = sorted(trader.latencies_ms)
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"decision latency: median={statistics.median(latencies):.2f}ms p95={p95:.2f}ms")
+    print(f"trades={len(trader.trades)} state={state_path} decisions={log_path}")
+
+
+if __name__ == "__main__":
+    main()
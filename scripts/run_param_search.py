@@ -0,0 +1,165 @@
+from __future__ import annotations
+# ruff: noqa: E402
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from _script_utils import ensure_src_on_path, write_csv_rows
+
+ensure_src_on_path()
+
+from ai_trader.backtest.search import rolling_walk_forward_folds, run_parameter_search
+from ai_trader.data.binance_ohlcv import load_ohlcv
+from ai_trader.types import BacktestConfig, iso_utc, parse_utc_time
+
+
+def _parse_value(text: str):
+    lowered = text.strip().lower()
+    if lowered in {"true", "false"}:
+        return lowered == "true"
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            continue
+    return text.strip()
+
+
+def _parse_space(items: list[str]) -> dict[str, list]:
+    space: dict[str, list] = {}
+    for item in items:
+        if "=" not in item:
+            raise ValueError(f"--param must look like name=v1,v2: {item}")
+        name, values = item.split("=", 1)
+        space[name.strip()] = [_parse_value(value) for value in values.split(",") if value.strip()]
+    return space
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Walk-forward parameter search over Chan/backtest settings")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--timeframe-main", default="4h")
+    parser.add_argument("--timeframe-sub", default="1h")
+    parser.add_argument("--resample-base", default="", help="derive coarser timeframes from this cached one, e.g. 1h")
+    parser.add_argument("--chan-mode", default="orthodox_chan", choices=("strict_kline8", "orthodox_chan", "pragmatic"))
+    parser.add_argument("--start", default="2022-02-10T00:00:00Z")
+    parser.add_argument("--end", default="2026-02-10T00:00:00Z")
+    parser.add_argument("--history-prefetch-days", type=int, default=60)
+    parser.add_argument("--train-days", type=int, default=365)
+    parser.add_argument("--test-days", type=int, default=90)
+    parser.add_argument("--step-days", type=int, default=0, help="fold step; 0 means --test-days")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="search dimension, e.g. chan.min_stroke_bars=4,5,6 or drawdown_reduce_threshold=0.10,0.12",
+    )
+    parser.add_argument("--strategy", default="grid", choices=("grid", "random", "successive_halving"))
+    parser.add_argument("--objective", default="sharpe")
+    parser.add_argument("--n-trials", type=int, default=20)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache-dir", default="", help="result cache dir; default $AI_TRADER_CACHE_DIR/results")
+    parser.add_argument("--output-root", default="outputs/search")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    space = _parse_space(args.param) or {
+        "chan.min_stroke_bars": [4, 5],
+        "macd_divergence_threshold": [0.08, 0.10, 0.12],
+        "drawdown_reduce_threshold": [0.10, 0.12],
+    }
+
+    config = BacktestConfig(
+        exchange=args.exchange,
+        symbol=args.symbol,
+        timeframe_main=args.timeframe_main,
+        timeframe_sub=args.timeframe_sub,
+        chan_mode=args.chan_mode,
+        start_utc=args.start,
+        end_utc=args.end,
+    )
+    load_start = iso_utc(parse_utc_time(args.start) - timedelta(days=args.history_prefetch_days))
+    bars_main = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_main, load_start, args.end, base_timeframe=args.resample_base
+    )
+    bars_sub = load_ohlcv(
+        args.exchange, args.symbol, args.timeframe_sub, load_start, args.end, base_timeframe=args.resample_base
+    )
+
+    folds = rolling_walk_forward_folds(
+        args.start,
+        args.end,
+        train_days=args.train_days,
+        test_days=args.test_days,
+        step_days=args.step_days or None,
+    )
+    result = run_parameter_search(
+        config,
+        space,
+        bars_main=bars_main,
+        bars_sub=bars_sub,
+        folds=folds,
+        strategy=args.strategy,
+        objective=args.objective,
+        n_trials=args.n_trials,
+        eta=args.eta,
+        seed=args.seed,
+        workers=args.workers,
+        cache_dir=args.cache_dir or None,
+    )
+
+    run_id = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    pair_key = args.symbol.replace("/", "")
+    out_dir = Path(args.output_root) / f"{pair_key}_{args.timeframe_main}_{args.timeframe_sub}" / run_id
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = result.to_rows()
+    write_csv_rows(out_dir / "ranked_trials.csv", rows)
+    payload = {
+        "strategy": result.strategy,
+        "objective": result.objective,
+        "space": space,
+        "structure_builds": result.structure_builds,
+        "folds": [
+            {
+                "name": fold.name,
+                "train_start": iso_utc(fold.train_start),
+                "test_start": iso_utc(fold.test_start),
+                "test_end": iso_utc(fold.test_end),
+            }
+            for fold in result.folds
+        ],
+        "trials": rows,
+    }
+    (out_dir / "search.json").write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    lines = [
+        "# 参数搜索结果",
+        "",
+        f"- strategy: {result.strategy}",
+        f"- objective: {result.objective}",
+        f"- folds: {len(result.folds)}",
+        f"- trials: {len(result.trials)}",
+        f"- structure_builds: {result.structure_builds}",
+        "",
+        "| rank | score | train | folds | params |",
+        "| ---: | ---: | ---: | ---: | --- |",
+    ]
+    for row, trial in zip(rows[:20], result.trials[:20]):
+        lines.append(
+            f"| {row['rank']} | {trial.score:.4f} | {trial.train_score:.4f} | "
+            f"{trial.folds_evaluated} | {trial.params} |"
+        )
+    (out_dir / "summary.md").write_text("\n".join(lines), encoding="utf-8")
+    print(f"Search completed. Output: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
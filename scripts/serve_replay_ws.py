@@ -0,0 +1,63 @@
+from __future__ import annotations
+# ruff: noqa: E402
+
+import argparse
+import asyncio
+import json
+
+from _script_utils import ensure_src_on_path
+
+ensure_src_on_path()
+
+from ai_trader.data import cache_path_for
+from ai_trader.data.binance_ohlcv import read_bars_csv
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in websocket server streaming cached bars to the paper daemon"
+    )
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--path", default="", help="cache CSV to stream; defaults to the timeframe cache")
+    parser.add_argument("--start", default="", help="first bar (open time) to stream")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds between bars")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        from aiohttp import web
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("aiohttp is required for the websocket server") from exc
+
+    path = args.path or cache_path_for(args.exchange, args.symbol, args.timeframe)
+    rows = [bar.to_dict() for bar in read_bars_csv(path)]
+    if args.start:
+        rows = [row for row in rows if row["time"] >= args.start]
+    if not rows:
+        raise RuntimeError(f"no bars to stream from {path}")
+
+    async def stream(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+        for row in rows:
+            if ws.closed:
+                break
+            await ws.send_str(json.dumps(row))
+            await asyncio.sleep(args.delay)
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws", stream)
+    print(f"Streaming {len(rows)} {args.timeframe} bars from {path} on ws://{args.host}:{args.port}/ws")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
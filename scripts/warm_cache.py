@@ -2,12 +2,13 @@ from __future__ import annotations
 # ruff: noqa: E402
 
 import argparse
+import asyncio
 
 from _script_utils import ensure_src_on_path
 
 ensure_src_on_path()
 
-from ai_trader.data import cache_path_for, load_ohlcv
+from ai_trader.data import AsyncOHLCVFetcher, CacheJob, cache_path_for, compact_cache, load_ohlcv, warm_cache_async
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,13 +18,43 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--start", default="2022-02-10T00:00:00Z")
     parser.add_argument("--end", default="2026-02-10T00:00:00Z")
     parser.add_argument("--timeframes", nargs="+", default=["4h", "1h"])
+    parser.add_argument(
+        "--resample-base",
+        default="",
+        help="fetch only this timeframe and derive coarser --timeframes from it locally, e.g. 1h",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="fill the cache gaps with concurrent ccxt.async_support requests first",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=4, help="concurrent page requests per exchange")
+    parser.add_argument(
+        "--compact-max-bars",
+        type=int,
+        default=10_000,
+        help="afterwards merge monthly chunks of finished years up to this many bars into yearly ones (0 = skip)",
+    )
     return parser.parse_args()
 
 
+async def _prefetch(args: argparse.Namespace) -> None:
+    timeframes = [args.resample_base] if args.resample_base else args.timeframes
+    jobs = [CacheJob(args.exchange, args.symbol, tf, args.start, args.end) for tf in timeframes]
+    async with AsyncOHLCVFetcher(max_in_flight=args.max_in_flight) as fetcher:
+        fetched = await warm_cache_async(jobs, fetcher=fetcher)
+        print(f"async prefetch: requests={fetcher.requests}")
+    for job, count in fetched.items():
+        print(f"[{job.timeframe}] fetched={count}")
+
+
 def main() -> None:
     args = parse_args()
 
     print(f"Warming cache: {args.exchange} {args.symbol} {args.start} -> {args.end}")
+    if args.use_async:
+        asyncio.run(_prefetch(args))
     for tf in args.timeframes:
         bars = load_ohlcv(
             exchange=args.exchange,
@@ -31,9 +62,15 @@ def main() -> None:
             timeframe=tf,
             start_utc=args.start,
             end_utc=args.end,
+            base_timeframe=args.resample_base,
         )
         path = cache_path_for(args.exchange, args.symbol, tf)
         print(f"[{tf}] bars={len(bars)} cache={path}")
+    if args.compact_max_bars > 0:
+        for tf in args.timeframes:
+            compacted = compact_cache(args.exchange, args.symbol, tf, max_bars=args.compact_max_bars)
+            if compacted:
+                print(f"[{tf}] compacted years: {' '.join(path.stem for path in compacted)}")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,10 @@
 from .engine import run_backtest
+from .search import rolling_walk_forward_folds, run_parameter_search
 from .significance import evaluate_significance
 
-__all__ = ["run_backtest", "evaluate_significance"]
+__all__ = [
+    "run_backtest",
+    "evaluate_significance",
+    "rolling_walk_forward_folds",
+    "run_parameter_search",
+]
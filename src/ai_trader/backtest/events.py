@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+from ai_trader.types import Bar, DecisionStep, Signal, SignalDecision
+
+OrderAction = Literal["open_long", "open_short", "close", "reduce"]
+OrderSide = Literal["buy", "sell"]
+
+
+@dataclass(frozen=True, slots=True)
+class Order:
+    """An order decided at the close of bar ``index``.
+
+    ``size`` is the fraction of cash to commit for opens and the fraction
+    of the position to exit for closes and reduces; quantities are fixed
+    only when the order fills, at the fill price.
+    """
+
+    action: OrderAction
+    side: OrderSide
+    index: int
+    time: datetime
+    size: float = 1.0
+    signal: Signal | None = None
+    center_key: tuple[str, int] | None = None
+    signature: tuple | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BarClosed:
+    """Main bar ``index`` closed; the account is marked at its close."""
+
+    index: int
+    bar: Bar
+    next_bar: Bar
+    drawdown: float
+
+
+@dataclass(frozen=True, slots=True)
+class SignalEmitted:
+    """The de-duplicated decision taken at the close of ``bar``."""
+
+    index: int
+    bar: Bar
+    next_bar: Bar
+    step: DecisionStep
+    decision: SignalDecision
+    signature: tuple
+    drawdown: float
+
+
+@dataclass(frozen=True, slots=True)
+class OrderSubmitted:
+    order: Order
+    next_bar: Bar
+
+
+@dataclass(frozen=True, slots=True)
+class Fill:
+    """An executed order: ``price`` includes slippage, ``reference_price`` does not."""
+
+    order: Order
+    time: datetime
+    reference_price: float
+    price: float
+
+
+class EventBus:
+    """Synchronous dispatch of typed events to their subscribers.
+
+    Handlers run in subscription order and may publish further events,
+    which are delivered before ``publish`` returns, so a fill is accounted
+    for before the handler that submitted its order continues.
+    """
+
+    __slots__ = ("_handlers",)
+
+    def __init__(self) -> None:
+        self._handlers: defaultdict[type, list[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, event_type: type, handler: Callable[[Any], None]) -> None:
+        self._handlers[event_type].append(handler)
+
+    def publish(self, event: Any) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
@@ -0,0 +1,545 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from ai_trader.backtest.events import EventBus, Fill, Order, OrderSubmitted, SignalEmitted
+from ai_trader.backtest.fills import FillModel, NextOpenFill
+from ai_trader.chan.config import ChanConfig
+from ai_trader.chan.core.buy_sell_points import allow_high_conflict_reversal
+from ai_trader.types import (
+    BacktestConfig,
+    Bar,
+    DecisionStep,
+    EquityPoint,
+    Signal,
+    SignalDecision,
+    Trade,
+)
+
+
+def decision_signature(decision: dict) -> tuple:
+    """What makes two contract decisions equivalent for dedup and repaint checks."""
+    signals = tuple((item["type"], item["level"], round(float(item["confidence"]), 6)) for item in decision["signals"])
+    return decision["action"]["decision"], signals, decision["risk"]["conflict_level"]
+
+
+class BenchmarkReturnPool:
+    """Forward 3-bar returns of a main-bar series, grouped by year.
+
+    The return of entering at bar ``i + 1``'s open and exiting at bar
+    ``i + 3``'s close, bucketed by bar ``i``'s year, held in one float64
+    array (years in order of first appearance) with each year's slice.
+    Built once per dataset, it can be shared by every ``run_backtest`` call
+    on the same bars.  ``pick`` draws exactly as ``_pick_benchmark_return``
+    does on the equivalent dict, so seeded draw sequences are unchanged.
+    """
+
+    __slots__ = ("returns", "spans")
+
+    def __init__(self, returns: np.ndarray, spans: dict[int, tuple[int, int]]) -> None:
+        self.returns = returns
+        self.spans = spans
+
+    @classmethod
+    def from_bars(cls, bars_main: Sequence[Bar]) -> BenchmarkReturnPool:
+        count = len(bars_main) - 3
+        if count <= 0:
+            return cls(np.empty(0, dtype=np.float64), {})
+        opens = np.fromiter((bar.open for bar in bars_main), dtype=np.float64, count=len(bars_main))
+        closes = np.fromiter((bar.close for bar in bars_main), dtype=np.float64, count=len(bars_main))
+        years = np.fromiter((bar.time.year for bar in bars_main[:count]), dtype=np.int64, count=count)
+        entry = opens[1 : count + 1]
+        keep = entry > 0
+        entry = entry[keep]
+        returns = (closes[3:][keep] - entry) / entry
+        years = years[keep]
+
+        uniq, first, inverse = np.unique(years, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        groups = rank[inverse]
+        counts = np.bincount(groups, minlength=len(order))
+        ends = np.cumsum(counts)
+        spans = {
+            int(uniq[idx]): (int(ends[pos] - counts[pos]), int(ends[pos]))
+            for pos, idx in enumerate(order)
+        }
+        return cls(returns[np.argsort(groups, kind="stable")], spans)
+
+    def __len__(self) -> int:
+        return len(self.returns)
+
+    def pick(self, rng: random.Random, year: int) -> float:
+        span = self.spans.get(year)
+        if span is None:
+            if not len(self.returns):
+                return 0.0
+            return float(self.returns[rng.randrange(0, len(self.returns))])
+        start, end = span
+        return float(self.returns[start + rng.randrange(0, end - start)])
+
+
+def _pick_benchmark_return(
+    rng: random.Random,
+    year_returns: dict[int, list[float]] | BenchmarkReturnPool,
+    year: int,
+) -> float:
+    if isinstance(year_returns, BenchmarkReturnPool):
+        return year_returns.pick(rng, year)
+    candidates = year_returns.get(year)
+    if not candidates:
+        merged = [item for values in year_returns.values() for item in values]
+        if not merged:
+            return 0.0
+        return merged[rng.randrange(0, len(merged))]
+    return candidates[rng.randrange(0, len(candidates))]
+
+
+def _top_signal(
+    signals: list[Signal],
+    signal_types: set[str],
+    min_confidence: float,
+    preferred_types: tuple[str, ...] = (),
+) -> Signal | None:
+    if not signal_types:
+        return None
+    candidates = [item for item in signals if item.type in signal_types and item.confidence >= min_confidence]
+    if not candidates:
+        return None
+    for preferred in preferred_types:
+        typed = [item for item in candidates if item.type == preferred]
+        if typed:
+            typed.sort(key=lambda item: item.confidence, reverse=True)
+            return typed[0]
+    candidates.sort(key=lambda item: item.confidence, reverse=True)
+    return candidates[0]
+
+
+def _signal_center_key(signal: Signal | None, snapshot) -> tuple[str, int] | None:
+    if signal is None or signal.type not in {"B3", "S3"}:
+        return None
+    if signal.anchor_center_start_index is not None:
+        return (signal.type, signal.anchor_center_start_index)
+    if snapshot.last_zhongshu_main is not None:
+        return (signal.type, snapshot.last_zhongshu_main.start_index)
+    return None
+
+
+@dataclass(slots=True)
+class ExecutionState:
+    """Account, position and risk-control state carried between bars."""
+
+    cash: float
+    position_qty: float = 0.0
+    position_entry_price: float = 0.0
+    position_entry_time: datetime | None = None
+    position_entry_fee: float = 0.0
+    position_signal_type: str = "B2"
+    position_signal_index: int = -1
+    position_stop_price: float | None = None
+    last_reduce_signature: tuple | None = None
+    consumed_buy_center_keys: set[tuple[str, int]] = field(default_factory=set)
+    consumed_sell_center_keys: set[tuple[str, int]] = field(default_factory=set)
+    frozen: bool = False
+    freeze_start: datetime | None = None
+    freeze_anchor_zhongshu_time: datetime | None = None
+    recovery_positive_needed: int = 0
+    peak_equity: float = 0.0
+    trades: list[Trade] = field(default_factory=list)
+    equity_curve: list[EquityPoint] = field(default_factory=list)
+
+
+class ExecutionSimulator:
+    """Execution rules of ``run_backtest``: t-bar decision, t+1 fill.
+
+    ``run_backtest`` and the paper-trading daemon drive the same simulator,
+    so fills, sizing, drawdown freeze and recovery behave identically in
+    both.  Per evaluated bar the caller first marks to market at the bar
+    close, then passes the (already de-duplicated) decision together with
+    the next bar, either through ``execute`` or as a ``SignalEmitted`` on
+    ``bus``.  The decision turns into ``OrderSubmitted`` events, which
+    ``fill_model`` prices (by default at the next bar's open) into
+    ``Fill`` events that ``apply_fill`` books.
+    """
+
+    def __init__(
+        self,
+        config: BacktestConfig,
+        chan_config: ChanConfig,
+        rng: random.Random | None = None,
+        year_returns: dict[int, list[float]] | BenchmarkReturnPool | None = None,
+        state: ExecutionState | None = None,
+        fill_model: FillModel | None = None,
+        bus: EventBus | None = None,
+        bars_main: Sequence[Bar] = (),
+    ) -> None:
+        self.config = config
+        self.chan_config = chan_config
+        self.rng = rng or random.Random(config.random_seed)
+        self.year_returns = year_returns if year_returns is not None else {}
+        self.state = state or ExecutionState(cash=config.initial_capital, peak_equity=config.initial_capital)
+        self.fill_model = fill_model or NextOpenFill()
+        # Main bars by index, for the forward-return statistic of closed trades.
+        self.bars_main = bars_main
+        # ``OnlineMetrics``-like sinks fed every equity point and closed trade.
+        self.metric_sinks: list = []
+        self.bus = bus or EventBus()
+        self.bus.subscribe(SignalEmitted, self.on_signal)
+        self.bus.subscribe(OrderSubmitted, self._on_order)
+        self.bus.subscribe(Fill, self.apply_fill)
+
+        self.buy_entry_types = set(chan_config.execution_buy_types)
+        self.sell_entry_types = set(chan_config.execution_sell_types)
+        self.reduce_types = set(chan_config.execution_reduce_types)
+        self.buy_entry_min_conf = max(config.min_confidence, chan_config.execution_buy_min_confidence)
+        self.sell_entry_min_conf = max(config.min_confidence, chan_config.execution_reduce_min_confidence)
+        self.reduce_min_conf = max(config.min_confidence, chan_config.execution_reduce_min_confidence)
+        self.buy_signal_priority = ("B1", "B2", "B3") if chan_config.prefer_first_class_signals else ()
+        self.sell_signal_priority = ("S1", "S2", "S3") if chan_config.prefer_first_class_signals else ()
+
+    def mark_to_market(self, bar: Bar) -> float:
+        """Record the equity point at ``bar`` close and return the drawdown."""
+        st = self.state
+        position_value = st.position_qty * bar.close
+        equity = st.cash + position_value
+        if equity > st.peak_equity:
+            st.peak_equity = equity
+        drawdown = (st.peak_equity - equity) / st.peak_equity if st.peak_equity > 0 else 0.0
+        point = EquityPoint(
+            time=bar.time,
+            equity=equity,
+            drawdown=drawdown,
+            cash=st.cash,
+            position_value=position_value,
+        )
+        if self.config.keep_equity_curve:
+            st.equity_curve.append(point)
+        else:
+            st.equity_curve[:] = [point]
+        for sink in self.metric_sinks:
+            sink.push_equity(point.time, point.equity)
+        return drawdown
+
+    def execute(
+        self,
+        i: int,
+        bar: Bar,
+        next_bar: Bar,
+        step: DecisionStep,
+        decision: SignalDecision,
+        signature: tuple,
+        drawdown: float,
+        bars_main: Sequence[Bar],
+    ) -> None:
+        """Apply the decision taken at ``bar`` close with fills on ``next_bar``.
+
+        ``i`` is the index of ``bar`` in ``bars_main``; it only feeds the
+        forward-return statistic of closed trades, which falls back to 0
+        while the three following bars are not known yet.
+        """
+        self.bars_main = bars_main
+        self.bus.publish(SignalEmitted(i, bar, next_bar, step, decision, signature, drawdown))
+
+    def on_signal(self, event: SignalEmitted) -> None:
+        """Update freeze and sizing state and submit the orders ``event`` calls for."""
+        config = self.config
+        st = self.state
+        bar, next_bar, step, decision = event.bar, event.next_bar, event.step, event.decision
+        drawdown = event.drawdown
+
+        if drawdown >= config.drawdown_freeze_threshold and not st.frozen:
+            st.frozen = True
+            st.freeze_start = bar.time
+            st.freeze_anchor_zhongshu_time = (
+                step.last_zhongshu_main.available_time if step.last_zhongshu_main else None
+            )
+
+        buy_signal = _top_signal(
+            decision.signals,
+            self.buy_entry_types,
+            self.buy_entry_min_conf,
+            preferred_types=self.buy_signal_priority,
+        )
+        reduce_signal = _top_signal(
+            decision.signals,
+            self.reduce_types,
+            self.reduce_min_conf,
+            preferred_types=self.sell_signal_priority,
+        )
+        sell_signal = _top_signal(
+            decision.signals,
+            self.sell_entry_types,
+            self.sell_entry_min_conf,
+            preferred_types=self.sell_signal_priority,
+        )
+        buy_center_key = _signal_center_key(buy_signal, step)
+        sell_center_key = _signal_center_key(sell_signal, step)
+
+        # 冻结恢复双通道
+        if st.frozen:
+            has_effective_buy = (
+                decision.action.decision == "buy"
+                and buy_signal is not None
+                and (
+                    buy_center_key is None
+                    or buy_center_key not in st.consumed_buy_center_keys
+                )
+                and (
+                    decision.risk.conflict_level != "high"
+                    or allow_high_conflict_reversal(buy_signal, decision.market_state)
+                )
+                and decision.data_quality.status == "ok"
+            )
+            newer_zhongshu = (
+                step.last_zhongshu_main is not None
+                and (
+                    st.freeze_anchor_zhongshu_time is None
+                    or step.last_zhongshu_main.available_time > st.freeze_anchor_zhongshu_time
+                )
+            )
+            channel_a = has_effective_buy and newer_zhongshu
+            channel_b = False
+            if st.freeze_start is not None:
+                days_frozen = (bar.time - st.freeze_start).days
+                channel_b = days_frozen >= config.freeze_recovery_days and drawdown < config.drawdown_reduce_threshold
+
+            if channel_a or channel_b:
+                st.frozen = False
+                st.freeze_start = None
+                st.freeze_anchor_zhongshu_time = None
+                st.recovery_positive_needed = 2
+
+        size_multiplier = 1.0
+        if drawdown >= config.drawdown_reduce_threshold:
+            size_multiplier = config.reduce_ratio
+        if st.frozen:
+            size_multiplier = 0.0
+        if st.recovery_positive_needed > 0:
+            size_multiplier = min(size_multiplier, 0.5)
+
+        # 先处理平仓/减仓（t信号，t+1开盘执行）
+        should_close = False
+        should_reduce = False
+
+        if st.position_qty > 0:
+            if st.position_stop_price is not None and bar.close <= st.position_stop_price:
+                should_close = True
+            elif decision.action.decision == "sell":
+                should_close = True
+            elif (
+                decision.action.decision == "reduce"
+                and reduce_signal is not None
+                and event.signature != st.last_reduce_signature
+            ):
+                should_reduce = True
+        elif st.position_qty < 0:
+            if st.position_stop_price is not None and bar.close >= st.position_stop_price:
+                should_close = True
+            elif decision.action.decision == "buy":
+                should_close = True
+
+        if st.position_qty != 0 and (should_close or should_reduce):
+            self._submit(
+                Order(
+                    action="close" if should_close else "reduce",
+                    side="sell" if st.position_qty > 0 else "buy",
+                    index=event.index,
+                    time=bar.time,
+                    size=1.0 if should_close else 0.5,
+                    signature=event.signature,
+                ),
+                next_bar,
+            )
+
+        # 再处理开仓
+        can_open_long = (
+            st.position_qty == 0
+            and size_multiplier > 0
+            and decision.action.decision == "buy"
+            and buy_signal is not None
+            and (buy_center_key is None or buy_center_key not in st.consumed_buy_center_keys)
+            and (
+                decision.risk.conflict_level != "high"
+                or allow_high_conflict_reversal(buy_signal, decision.market_state)
+            )
+            and decision.data_quality.status == "ok"
+        )
+        can_open_short = (
+            st.position_qty == 0
+            and size_multiplier > 0
+            and config.allow_short_entries
+            and decision.action.decision == "sell"
+            and sell_signal is not None
+            and (sell_center_key is None or sell_center_key not in st.consumed_sell_center_keys)
+            and (
+                decision.risk.conflict_level != "high"
+                or allow_high_conflict_reversal(sell_signal, decision.market_state)
+            )
+            and decision.data_quality.status == "ok"
+        )
+
+        if can_open_long and buy_signal is not None:
+            self._submit(
+                Order(
+                    action="open_long",
+                    side="buy",
+                    index=event.index,
+                    time=bar.time,
+                    size=size_multiplier,
+                    signal=buy_signal,
+                    center_key=buy_center_key,
+                ),
+                next_bar,
+            )
+        elif can_open_short and sell_signal is not None:
+            self._submit(
+                Order(
+                    action="open_short",
+                    side="sell",
+                    index=event.index,
+                    time=bar.time,
+                    size=size_multiplier,
+                    signal=sell_signal,
+                    center_key=sell_center_key,
+                ),
+                next_bar,
+            )
+
+    def _submit(self, order: Order, next_bar: Bar) -> None:
+        self.bus.publish(OrderSubmitted(order, next_bar))
+
+    def _on_order(self, event: OrderSubmitted) -> None:
+        fill = self.fill_model.fill(event.order, event.next_bar, self.config.slippage_rate)
+        if fill is not None:
+            self.bus.publish(fill)
+
+    def apply_fill(self, fill: Fill) -> None:
+        """Book ``fill`` into cash, position and trades."""
+        if fill.order.action in ("close", "reduce"):
+            self._close(fill)
+        else:
+            self._open(fill)
+
+    def _open(self, fill: Fill) -> None:
+        config = self.config
+        st = self.state
+        order = fill.order
+        signal = order.signal
+        if signal is None:
+            return
+        alloc = st.cash * order.size / (1 + config.fee_rate)
+        if alloc <= 0 or fill.price <= 0:
+            return
+        quantity = alloc / fill.price
+        entry_fee = alloc * config.fee_rate
+        if order.action == "open_long":
+            st.cash -= alloc + entry_fee
+            st.position_qty = quantity
+            consumed = st.consumed_buy_center_keys
+        else:
+            st.cash += alloc - entry_fee
+            st.position_qty = -quantity
+            consumed = st.consumed_sell_center_keys
+
+        st.position_entry_price = fill.price
+        st.position_entry_fee = entry_fee
+        st.position_entry_time = fill.time
+        st.position_signal_type = signal.type
+        st.position_signal_index = order.index
+        st.position_stop_price = signal.invalid_price
+        st.last_reduce_signature = None
+        if order.center_key is not None:
+            consumed.add(order.center_key)
+
+    def finalize(self, last: Bar) -> None:
+        """Append the closing equity point after the last evaluated bar."""
+        self.mark_to_market(last)
+
+    def _close(self, fill: Fill) -> None:
+        config = self.config
+        st = self.state
+        bars_main = self.bars_main
+        should_close = fill.order.action == "close"
+        is_long = st.position_qty > 0
+        qty_before = abs(st.position_qty)
+        qty_to_close = qty_before if should_close else qty_before * fill.order.size
+        if qty_to_close <= 0:
+            qty_to_close = 0.0
+
+        alloc_entry_fee = st.position_entry_fee * (qty_to_close / qty_before) if qty_before > 0 else 0.0
+
+        exit_price = fill.price
+        if is_long:
+            proceeds = qty_to_close * exit_price
+            exit_fee = proceeds * config.fee_rate
+            st.cash += proceeds - exit_fee
+            gross_pnl = (exit_price - st.position_entry_price) * qty_to_close
+            side = "long"
+        else:
+            cover_cost = qty_to_close * exit_price
+            exit_fee = cover_cost * config.fee_rate
+            st.cash -= cover_cost + exit_fee
+            gross_pnl = (st.position_entry_price - exit_price) * qty_to_close
+            side = "short"
+        slippage_cost = qty_to_close * fill.reference_price * config.slippage_rate
+
+        net_pnl = gross_pnl - alloc_entry_fee - exit_fee
+        notional = st.position_entry_price * qty_to_close
+        net_return = net_pnl / notional if notional > 0 else 0.0
+
+        signal_index = st.position_signal_index
+        if signal_index >= 0 and signal_index + 3 < len(bars_main):
+            fwd_entry = bars_main[signal_index + 1].open
+            forward_long = (bars_main[signal_index + 3].close - fwd_entry) / fwd_entry if fwd_entry > 0 else 0.0
+            forward_return = forward_long if is_long else -forward_long
+        else:
+            forward_return = 0.0
+
+        benchmark_long = _pick_benchmark_return(self.rng, self.year_returns, fill.time.year)
+        benchmark_return = benchmark_long if is_long else -benchmark_long
+        trade = Trade(
+            side=side,
+            signal_type=st.position_signal_type,  # type: ignore[arg-type]
+            entry_time=st.position_entry_time or fill.time,
+            exit_time=fill.time,
+            entry_price=st.position_entry_price,
+            exit_price=exit_price,
+            quantity=qty_to_close,
+            gross_pnl=gross_pnl,
+            net_pnl=net_pnl,
+            net_return=net_return,
+            fees=alloc_entry_fee + exit_fee,
+            slippage_cost=slippage_cost,
+            forward_3bar_return=forward_return,
+            benchmark_return=benchmark_return,
+        )
+        st.trades.append(trade)
+        for sink in self.metric_sinks:
+            sink.push_trade(trade)
+
+        st.position_entry_fee -= alloc_entry_fee
+        if st.position_entry_fee < 0:
+            st.position_entry_fee = 0.0
+
+        remaining_qty = qty_before - qty_to_close
+        if should_close or remaining_qty <= 0:
+            st.position_qty = 0.0
+            st.position_entry_price = 0.0
+            st.position_entry_fee = 0.0
+            st.position_entry_time = None
+            st.position_signal_index = -1
+            st.position_stop_price = None
+            st.last_reduce_signature = None
+        else:
+            st.position_qty = remaining_qty if is_long else -remaining_qty
+            if fill.order.action == "reduce":
+                st.last_reduce_signature = fill.order.signature
+
+        if st.trades and st.trades[-1].net_pnl > 0 and st.recovery_positive_needed > 0:
+            st.recovery_positive_needed -= 1
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Literal, Protocol
+
+from ai_trader.backtest.events import Fill, Order
+from ai_trader.types import Bar
+
+
+class FillModel(Protocol):
+    """Prices an order decided at a main bar close; ``None`` leaves it unfilled."""
+
+    def fill(self, order: Order, next_bar: Bar, slippage_rate: float) -> Fill | None: ...
+
+
+def _slipped(order: Order, reference_price: float, slippage_rate: float) -> float:
+    if order.side == "buy":
+        return reference_price * (1 + slippage_rate)
+    return reference_price * (1 - slippage_rate)
+
+
+class NextOpenFill:
+    """Fill at the next main bar's open, as ``run_backtest`` always has."""
+
+    __slots__ = ()
+
+    def fill(self, order: Order, next_bar: Bar, slippage_rate: float) -> Fill | None:
+        return Fill(
+            order=order,
+            time=next_bar.time,
+            reference_price=next_bar.open,
+            price=_slipped(order, next_bar.open, slippage_rate),
+        )
+
+
+class SubBarFill:
+    """Fill inside the next main bar, on a sub-level bar.
+
+    ``offset`` counts the sub bars closing after the decision bar (``0`` is
+    the one opening with the next main bar) and ``price`` picks its open or
+    close, modelling order latency at sub-bar resolution; the fill is
+    stamped with that sub bar's (close) time.  Orders fall back to the next
+    main bar's open when the sub bar is missing or beyond the next main bar.
+    """
+
+    __slots__ = ("bars_sub", "times", "offset", "price")
+
+    def __init__(self, bars_sub: Sequence[Bar], offset: int = 0, price: Literal["open", "close"] = "open") -> None:
+        if offset < 0:
+            raise ValueError("offset must be >= 0")
+        if price not in ("open", "close"):
+            raise ValueError(f"Unsupported fill price: {price}")
+        self.bars_sub = bars_sub
+        self.times = [bar.time for bar in bars_sub]
+        self.offset = offset
+        self.price = price
+
+    def fill(self, order: Order, next_bar: Bar, slippage_rate: float) -> Fill | None:
+        pos = bisect_right(self.times, order.time) + self.offset
+        if pos >= len(self.bars_sub) or self.times[pos] > next_bar.time:
+            return NextOpenFill().fill(order, next_bar, slippage_rate)
+        sub = self.bars_sub[pos]
+        reference = sub.open if self.price == "open" else sub.close
+        return Fill(
+            order=order,
+            time=sub.time,
+            reference_price=reference,
+            price=_slipped(order, reference, slippage_rate),
+        )
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import functools
+import math
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from statistics import mean, pstdev
+from typing import Literal
 
-from ai_trader.types import EquityPoint, Trade
+import numpy as np
+
+from ai_trader.types import EquityPoint, Trade, iso_utc, parse_utc_time
 
 
 def _safe_mean(values: Iterable[float]) -> float:
@@ -13,119 +23,613 @@ def _safe_mean(values: Iterable[float]) -> float:
     return mean(data)
 
 
-def _max_drawdown_from_equity(equity: list[float]) -> float:
-    if not equity:
+def _max_drawdown_from_equity(equity: Sequence[float] | np.ndarray) -> float:
+    values = np.asarray(equity, dtype=np.float64)
+    if not len(values):
+        return 0.0
+    peaks = np.maximum.accumulate(values)
+    positive = peaks > 0
+    if not positive.any():
         return 0.0
-    peak = equity[0]
-    max_dd = 0.0
-    for value in equity:
-        if value > peak:
-            peak = value
-        if peak > 0:
-            dd = (peak - value) / peak
-            if dd > max_dd:
-                max_dd = dd
-    return max_dd
-
-
-def _sharpe_from_returns(returns: list[float], periods_per_year: int = 365 * 6) -> float:
+    drawdowns = (peaks[positive] - values[positive]) / peaks[positive]
+    return max(0.0, float(drawdowns.max()))
+
+
+def _returns_from_equity(equity: np.ndarray) -> np.ndarray:
+    prev = equity[:-1]
+    out = np.zeros(len(prev), dtype=np.float64)
+    np.divide(equity[1:] - prev, prev, out=out, where=prev > 0)
+    return out
+
+
+def _sharpe_from_returns(returns: Sequence[float] | np.ndarray, periods_per_year: int = 365 * 6) -> float:
     if len(returns) < 2:
         return 0.0
-    avg = _safe_mean(returns)
-    std = pstdev(returns)
+    # ``statistics`` is exact before the final rounding; numpy's pairwise
+    # sums are not, and reports compare sharpe bit for bit.
+    data = returns.tolist() if isinstance(returns, np.ndarray) else list(returns)
+    avg = mean(data)
+    std = pstdev(data)
     if std == 0:
         return 0.0
     return (avg / std) * (periods_per_year**0.5)
 
 
-def calc_metrics(equity_curve: list[EquityPoint], trades: list[Trade], initial_capital: float) -> dict[str, float]:
-    equity = [item.equity for item in equity_curve]
-    if not equity:
-        return {
-            "total_return": 0.0,
-            "annual_return": 0.0,
-            "max_drawdown": 0.0,
-            "sharpe": 0.0,
-            "win_rate": 0.0,
-            "profit_factor": 0.0,
-            "expectancy": 0.0,
-            "trade_count": 0.0,
-        }
+@functools.lru_cache(maxsize=1)
+def _empyrical():
+    try:
+        import empyrical as ep  # type: ignore
+    except Exception:
+        return None
+    return ep
+
+
+_EMPTY_METRICS = {
+    "total_return": 0.0,
+    "annual_return": 0.0,
+    "max_drawdown": 0.0,
+    "sharpe": 0.0,
+    "win_rate": 0.0,
+    "profit_factor": 0.0,
+    "expectancy": 0.0,
+    "trade_count": 0.0,
+}
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_OPEN_START = np.iinfo(np.int64).min
+_OPEN_END = np.iinfo(np.int64).max
+
+CalendarPeriod = Literal["year", "quarter", "month"]
+_CALENDAR_PERIODS = ("year", "quarter", "month")
+
+
+def _micros(time: datetime) -> int:
+    return (time - _EPOCH) // _MICROSECOND
+
+
+def _year_start(year: int) -> datetime:
+    return datetime(year, 1, 1, tzinfo=timezone.utc)
+
+
+def _period_name(time: datetime, period: str) -> str:
+    if period == "year":
+        return str(time.year)
+    if period == "quarter":
+        return f"{time.year}Q{(time.month - 1) // 3 + 1}"
+    return f"{time.year}-{time.month:02d}"
+
+
+def _group_indices(ids: np.ndarray, count: int) -> list[np.ndarray]:
+    """Ascending member indices per segment id in ``range(count)``; ``-1`` is dropped.
+
+    The stable sort is linear on the already-ordered ids of range and
+    calendar segments (one run per segment).
+    """
+    order = np.argsort(ids, kind="stable")
+    sizes = np.bincount(ids + 1, minlength=count + 1)
+    return np.split(order, np.cumsum(sizes)[:-1])[1:]
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentSpec:
+    """How ``calc_segmented_metrics`` splits a run into named segments.
+
+    Exactly one of the fields is set:
+
+    - ``ranges``: ``(name, start, end)`` windows holding ``start <= time < end``,
+      sorted and non-overlapping; ``None`` leaves a side open.
+    - ``calendar``: one segment per ``"year"``, ``"quarter"`` or ``"month"``
+      with equity points, named ``2024``, ``2024Q1`` or ``2024-01``.
+    - ``labels``: ``(time, label)`` changes of a market-state series; a time
+      belongs to the label in effect then, and times before the first change
+      to no segment.
+
+    Equity points are assigned by time and trades by entry time.
+    """
+
+    ranges: tuple[tuple[str, datetime | None, datetime | None], ...] = ()
+    calendar: CalendarPeriod | None = None
+    labels: tuple[tuple[datetime, str], ...] = ()
+
+    def __post_init__(self) -> None:
+        if sum(1 for item in (self.ranges, self.calendar, self.labels) if item) != 1:
+            raise ValueError("SegmentSpec needs exactly one of ranges, calendar or labels")
+        if self.calendar is not None and self.calendar not in _CALENDAR_PERIODS:
+            raise ValueError(f"Unsupported calendar period: {self.calendar}")
+        for name, start, end in self.ranges:
+            if start is not None and end is not None and start >= end:
+                raise ValueError(f"Segment {name} ends before it starts")
+        for (_, _, end), (name, start, _) in zip(self.ranges, self.ranges[1:]):
+            if end is None or start is None or start < end:
+                raise ValueError(f"Segment {name} overlaps the one before it")
+        if any(a[0] > b[0] for a, b in zip(self.labels, self.labels[1:])):
+            raise ValueError("Market-state labels must be in time order")
+
+    @classmethod
+    def years(cls, spans: Mapping[str, tuple[int, int]]) -> SegmentSpec:
+        """Named inclusive year spans, e.g. ``{"2024-2026": (2024, 2026)}``."""
+        return cls(ranges=tuple((name, _year_start(lo), _year_start(hi + 1)) for name, (lo, hi) in spans.items()))
+
+    @classmethod
+    def periods(cls, calendar: CalendarPeriod) -> SegmentSpec:
+        return cls(calendar=calendar)
+
+    @classmethod
+    def cuts(cls, times: Iterable[datetime | str]) -> SegmentSpec:
+        """Consecutive segments between cut times, open before the first and after the last."""
+        edges = [None, *sorted({parse_utc_time(item) for item in times}), None]
+        return cls(
+            ranges=tuple(
+                (f"{iso_utc(lo) if lo else 'start'}..{iso_utc(hi) if hi else 'end'}", lo, hi)
+                for lo, hi in zip(edges, edges[1:])
+            )
+        )
+
+    @classmethod
+    def market_states(cls, labels: Mapping[datetime, str] | Iterable[tuple[datetime, str]]) -> SegmentSpec:
+        """Segments by regime, from label changes such as ``{time: phase}``."""
+        pairs = labels.items() if isinstance(labels, Mapping) else labels
+        changes = sorted(((parse_utc_time(time), str(label)) for time, label in pairs), key=itemgetter(0))
+        return cls(labels=tuple(changes))
+
+    def segment_of(self, time: datetime) -> str | None:
+        """Name of the segment holding ``time``, if any."""
+        if self.calendar is not None:
+            return _period_name(time, self.calendar)
+        if self.labels:
+            pos = bisect_right(self.labels, time, key=itemgetter(0))
+            return self.labels[pos - 1][1] if pos else None
+        for name, start, end in self.ranges:
+            if (start is None or start <= time) and (end is None or time < end):
+                return name
+        return None
+
+    def assign(self, frame: MetricsFrame) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """Segment names and the segment id (or ``-1``) of every equity point and trade."""
+        if self.calendar is not None:
+            ids: dict[str, int] = {}
+            points = np.fromiter(
+                (ids.setdefault(_period_name(item.time, self.calendar), len(ids)) for item in frame.equity_curve),
+                dtype=np.int64,
+                count=len(frame.equity_curve),
+            )
+            trades = np.fromiter(
+                (ids.get(_period_name(item.entry_time, self.calendar), -1) for item in frame.trades),
+                dtype=np.int64,
+                count=len(frame.trades),
+            )
+            return list(ids), points, trades
+
+        if self.labels:
+            names = list(dict.fromkeys(label for _, label in self.labels))
+            codes = np.array([names.index(label) for _, label in self.labels], dtype=np.int64)
+            changes = np.array([_micros(time) for time, _ in self.labels], dtype=np.int64)
+
+            def locate(stamps: np.ndarray) -> np.ndarray:
+                pos = np.searchsorted(changes, stamps, side="right") - 1
+                return np.where(pos >= 0, codes[np.maximum(pos, 0)], -1)
+
+            return names, locate(frame.times), locate(frame.trade_times)
+
+        starts = np.array([_OPEN_START if lo is None else _micros(lo) for _, lo, _ in self.ranges], dtype=np.int64)
+        ends = np.array([_OPEN_END if hi is None else _micros(hi) for _, _, hi in self.ranges], dtype=np.int64)
+
+        def locate(stamps: np.ndarray) -> np.ndarray:
+            pos = np.searchsorted(starts, stamps, side="right") - 1
+            inside = (pos >= 0) & (stamps < ends[np.maximum(pos, 0)])
+            return np.where(inside, pos, -1)
+
+        return [name for name, _, _ in self.ranges], locate(frame.times), locate(frame.trade_times)
+
+
+class MetricsFrame:
+    """An equity curve and its trades as arrays, for metrics over time slices.
+
+    Equity values and times (as microseconds) are converted once;
+    ``metrics`` then computes ``calc_metrics`` for any year range, locating
+    the equity points by ``searchsorted`` on the (time-ordered) curve, and
+    ``segments`` for every segment of a ``SegmentSpec`` in one grouping pass.
+    """
+
+    __slots__ = ("equity_curve", "trades", "equity", "times", "trade_times")
+
+    def __init__(self, equity_curve: Sequence[EquityPoint], trades: Sequence[Trade]) -> None:
+        self.equity_curve = equity_curve
+        self.trades = trades
+        self.equity = np.fromiter((item.equity for item in equity_curve), dtype=np.float64, count=len(equity_curve))
+        self.times = np.fromiter((_micros(item.time) for item in equity_curve), dtype=np.int64, count=len(equity_curve))
+        self.trade_times = np.fromiter((_micros(item.entry_time) for item in trades), dtype=np.int64, count=len(trades))
+
+    def span(self, start_year: int, end_year: int) -> tuple[int, int]:
+        """Index range of the equity points dated in ``[start_year, end_year]``."""
+        lo = int(np.searchsorted(self.times, _micros(_year_start(start_year)), side="left"))
+        return lo, max(lo, int(np.searchsorted(self.times, _micros(_year_start(end_year + 1)), side="left")))
+
+    def metrics(
+        self,
+        initial_capital: float,
+        years: tuple[int, int] | None = None,
+        use_first_equity: bool = False,
+    ) -> dict[str, float]:
+        """``calc_metrics`` of the points and trades (by entry year) in ``years``.
 
-    total_return = (equity[-1] - initial_capital) / initial_capital
+        ``use_first_equity`` measures from the slice's first equity value
+        instead of ``initial_capital`` when the slice is not empty.
+        """
+        if years is None:
+            lo, hi = 0, len(self.equity)
+            trades = list(self.trades)
+        else:
+            lo, hi = self.span(*years)
+            start, end = _micros(_year_start(years[0])), _micros(_year_start(years[1] + 1))
+            mask = (self.trade_times >= start) & (self.trade_times < end)
+            trades = [self.trades[idx] for idx in np.flatnonzero(mask).tolist()]
+        if use_first_equity and hi > lo:
+            initial_capital = self.equity_curve[lo].equity
+        return _metrics_core(
+            self.equity[lo:hi],
+            self.equity_curve[lo].time if hi > lo else None,
+            self.equity_curve[hi - 1].time if hi > lo else None,
+            trades,
+            initial_capital,
+        )
+
+    def segments(self, spec: SegmentSpec, initial_capital: float) -> dict[str, dict[str, float]]:
+        """Metrics of every segment of ``spec``, each measured from its own first equity.
+
+        A segment made of several stretches (a recurring market state) is
+        scored on the curve chained from its stretches, each restarting from
+        its own first point like a contiguous segment does.
+        """
+        names, point_ids, trade_ids = spec.assign(self)
+        point_groups = _group_indices(point_ids, len(names))
+        trade_groups = _group_indices(trade_ids, len(names))
+        full_returns = None
+        result: dict[str, dict[str, float]] = {}
+        for name, points, picked in zip(names, point_groups, trade_groups):
+            trades = [self.trades[idx] for idx in picked.tolist()]
+            if not len(points):
+                result[name] = _metrics_core(points, None, None, trades, initial_capital)
+                continue
+            first, last = int(points[0]), int(points[-1])
+            if last - first + 1 == len(points):
+                equity = self.equity[first : last + 1]
+            else:
+                if full_returns is None:
+                    full_returns = _returns_from_equity(self.equity)
+                growth = 1.0 + full_returns[np.maximum(points - 1, 0)]
+                growth[np.flatnonzero(np.diff(points, prepend=-2) != 1)] = 1.0
+                equity = self.equity[first] * np.cumprod(growth)
+            result[name] = _metrics_core(
+                equity,
+                self.equity_curve[first].time,
+                self.equity_curve[last].time,
+                trades,
+                float(self.equity[first]),
+            )
+        return result
+
+
+def _empyrical_risk(returns: np.ndarray) -> tuple[float, float] | None:
+    """``(max_drawdown, sharpe)`` from empyrical when it is installed and succeeds."""
+    ep = _empyrical()
+    if ep is None:
+        return None
+    try:
+        series = returns.tolist() if len(returns) else [0.0]
+        return float(ep.max_drawdown(series)) * -1.0, float(ep.sharpe_ratio(series) or 0.0)
+    except Exception:
+        return None
 
-    if len(equity_curve) >= 2:
-        days = (equity_curve[-1].time - equity_curve[0].time).total_seconds() / 86400
-    else:
-        days = 0.0
+
+def _metrics_core(equity: np.ndarray, first_time, last_time, trades: Sequence[Trade], initial_capital: float) -> dict[str, float]:
+    if not len(equity):
+        return dict(_EMPTY_METRICS)
+
+    total_return = (float(equity[-1]) - initial_capital) / initial_capital
+
+    days = (last_time - first_time).total_seconds() / 86400 if len(equity) >= 2 else 0.0
     annual_return = 0.0
     if days > 0:
         annual_return = (1 + total_return) ** (365 / days) - 1
 
-    returns = []
-    for i in range(1, len(equity)):
-        prev = equity[i - 1]
-        if prev <= 0:
-            returns.append(0.0)
-        else:
-            returns.append((equity[i] - prev) / prev)
+    returns = _returns_from_equity(equity)
 
     gross_profit = sum(item.net_pnl for item in trades if item.net_pnl > 0)
     gross_loss = abs(sum(item.net_pnl for item in trades if item.net_pnl < 0))
     win_count = sum(1 for item in trades if item.net_pnl > 0)
 
+    risk = _empyrical_risk(returns)
+    if risk is None:
+        risk = _max_drawdown_from_equity(equity), _sharpe_from_returns(returns)
     metrics = {
         "total_return": total_return,
         "annual_return": annual_return,
-        "max_drawdown": _max_drawdown_from_equity(equity),
-        "sharpe": _sharpe_from_returns(returns),
+        "max_drawdown": risk[0],
+        "sharpe": risk[1],
         "win_rate": (win_count / len(trades)) if trades else 0.0,
         "profit_factor": (gross_profit / gross_loss) if gross_loss > 0 else 0.0,
         "expectancy": _safe_mean([item.net_return for item in trades]),
         "trade_count": float(len(trades)),
     }
+    return metrics
 
-    try:
-        import empyrical as ep  # type: ignore
 
-        series = returns if returns else [0.0]
-        metrics["max_drawdown"] = float(ep.max_drawdown(series)) * -1.0
-        metrics["sharpe"] = float(ep.sharpe_ratio(series) or 0.0)
-    except Exception:
-        pass
+def calc_metrics(equity_curve: list[EquityPoint], trades: list[Trade], initial_capital: float) -> dict[str, float]:
+    return MetricsFrame(equity_curve, trades).metrics(initial_capital)
 
-    return metrics
+
+DEFAULT_SEGMENTS = SegmentSpec.years({"2022": (2022, 2022), "2023": (2023, 2023), "2024-2026": (2024, 2026)})
+
+
+# name -> (years, measure from the slice's first equity)
+_WALK_FORWARD = {
+    "train_2022_2023": ((2022, 2023), False),
+    "validate_2024_2026": ((2024, 2026), True),
+}
 
 
-def calc_segmented_metrics(equity_curve: list[EquityPoint], trades: list[Trade], initial_capital: float) -> dict[str, dict[str, float]]:
-    segments = {
-        "2022": (2022, 2022),
-        "2023": (2023, 2023),
-        "2024-2026": (2024, 2026),
+def _walk_forward(frame: MetricsFrame, initial_capital: float) -> dict[str, dict[str, float]]:
+    return {
+        name: frame.metrics(initial_capital, years, use_first_equity=use_first)
+        for name, (years, use_first) in _WALK_FORWARD.items()
     }
 
-    result: dict[str, dict[str, float]] = {}
-    for name, (start_year, end_year) in segments.items():
-        segment_equity = [item for item in equity_curve if start_year <= item.time.year <= end_year]
-        segment_trades = [item for item in trades if start_year <= item.entry_time.year <= end_year]
-        cap = initial_capital if not segment_equity else segment_equity[0].equity
-        result[name] = calc_metrics(segment_equity, segment_trades, cap)
 
-    return result
+def calc_segmented_metrics(
+    equity_curve: list[EquityPoint],
+    trades: list[Trade],
+    initial_capital: float,
+    spec: SegmentSpec | None = None,
+) -> dict[str, dict[str, float]]:
+    """Metrics per segment of ``spec`` (default: 2022, 2023 and 2024-2026)."""
+    return MetricsFrame(equity_curve, trades).segments(spec or DEFAULT_SEGMENTS, initial_capital)
 
 
 def calc_walk_forward_metrics(equity_curve: list[EquityPoint], trades: list[Trade], initial_capital: float) -> dict[str, dict[str, float]]:
-    train_equity = [item for item in equity_curve if 2022 <= item.time.year <= 2023]
-    val_equity = [item for item in equity_curve if 2024 <= item.time.year <= 2026]
+    return _walk_forward(MetricsFrame(equity_curve, trades), initial_capital)
 
-    train_trades = [item for item in trades if 2022 <= item.entry_time.year <= 2023]
-    val_trades = [item for item in trades if 2024 <= item.entry_time.year <= 2026]
 
-    return {
-        "train_2022_2023": calc_metrics(train_equity, train_trades, initial_capital),
-        "validate_2024_2026": calc_metrics(
-            val_equity,
-            val_trades,
-            (val_equity[0].equity if val_equity else initial_capital),
-        ),
-    }
+def calc_report_metrics(
+    equity_curve: list[EquityPoint],
+    trades: list[Trade],
+    initial_capital: float,
+    segments: SegmentSpec | None = None,
+) -> tuple[dict[str, float], dict[str, dict[str, float]], dict[str, dict[str, float]]]:
+    """Overall, segmented and walk-forward metrics from one ``MetricsFrame``."""
+    frame = MetricsFrame(equity_curve, trades)
+    return (
+        frame.metrics(initial_capital),
+        frame.segments(segments or DEFAULT_SEGMENTS, initial_capital),
+        _walk_forward(frame, initial_capital),
+    )
+
+
+class OnlineMetrics:
+    """``calc_metrics`` kept up to date one equity point or trade at a time.
+
+    Each update is amortized O(1): drawdown tracks the running peak, Sharpe uses
+    Welford's running mean and variance of the bar returns, and the trade
+    statistics are running sums.  Results agree with ``calc_metrics`` up to
+    floating-point rounding (and use this module's Sharpe and drawdown even
+    when empyrical is installed).  ``initial_capital=None`` measures from
+    the first point counted.
+
+    With ``window``, only points within ``window`` of the latest one, and
+    trades entered in that span, are counted.  Both sit in deques and are
+    subtracted from the running sums as they age out.  The window's max
+    drawdown has no running form, so ``metrics`` recomputes it over the held
+    points: reading a windowed accumulator is O(points in the window), not
+    O(1).  Unwindowed reads are O(1).
+    """
+
+    __slots__ = (
+        "initial_capital",
+        "window",
+        "periods_per_year",
+        "_points",
+        "_trades",
+        "_first",
+        "_last",
+        "_peak",
+        "_max_drawdown",
+        "_count",
+        "_mean",
+        "_m2",
+        "_trade_count",
+        "_wins",
+        "_losses",
+        "_gross_profit",
+        "_gross_loss",
+        "_return_sum",
+    )
+
+    def __init__(
+        self,
+        initial_capital: float | None = None,
+        window: timedelta | None = None,
+        periods_per_year: int = 365 * 6,
+    ) -> None:
+        if window is not None and window <= timedelta(0):
+            raise ValueError("window must be positive")
+        self.initial_capital = initial_capital
+        self.window = window
+        self.periods_per_year = periods_per_year
+        # (time, equity, return from the previous point)
+        self._points: deque[tuple[datetime, float, float]] = deque()
+        self._trades: deque[Trade] = deque()
+        self._first: tuple[datetime, float] | None = None
+        self._last: tuple[datetime, float] | None = None
+        self._peak = 0.0
+        self._max_drawdown = 0.0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._trade_count = 0
+        self._wins = 0
+        self._losses = 0
+        self._gross_profit = 0.0
+        self._gross_loss = 0.0
+        self._return_sum = 0.0
+
+    def push_equity(self, time: datetime, equity: float) -> None:
+        if self._last is not None:
+            prev = self._last[1]
+            ret = (equity - prev) / prev if prev > 0 else 0.0
+            self._add_return(ret)
+        else:
+            ret = 0.0
+            self._first = (time, equity)
+            self._peak = equity
+        self._last = (time, equity)
+        if self.window is None:
+            if equity > self._peak:
+                self._peak = equity
+            if self._peak > 0:
+                self._max_drawdown = max(self._max_drawdown, (self._peak - equity) / self._peak)
+            return
+        self._points.append((time, equity, ret))
+        self._evict()
+
+    def push_trade(self, trade: Trade) -> None:
+        self._trade_count += 1
+        self._return_sum += trade.net_return
+        if trade.net_pnl > 0:
+            self._wins += 1
+            self._gross_profit += trade.net_pnl
+        elif trade.net_pnl < 0:
+            self._losses += 1
+            self._gross_loss -= trade.net_pnl
+        if self.window is not None:
+            self._trades.append(trade)
+            self._evict()
+
+    def metrics(self) -> dict[str, float]:
+        """Current metrics; O(1) unwindowed, O(points in the window) with ``window``."""
+        if self._last is None:
+            return dict(_EMPTY_METRICS)
+        first = self._first if self.window is None else self._points[0][:2]
+        base = self.initial_capital if self.initial_capital is not None else first[1]
+        total_return = (self._last[1] - base) / base
+        days = (self._last[0] - first[0]).total_seconds() / 86400
+        annual_return = (1 + total_return) ** (365 / days) - 1 if days > 0 else 0.0
+
+        if self.window is None:
+            max_drawdown = self._max_drawdown
+        else:
+            max_drawdown = _max_drawdown_from_equity([item[1] for item in self._points])
+
+        sharpe = 0.0
+        if self._count >= 2:
+            std = math.sqrt(max(self._m2, 0.0) / self._count)
+            if std > 0:
+                sharpe = (self._mean / std) * (self.periods_per_year**0.5)
+
+        trades = self._trade_count
+        return {
+            "total_return": total_return,
+            "annual_return": annual_return,
+            "max_drawdown": max_drawdown,
+            "sharpe": sharpe,
+            "win_rate": self._wins / trades if trades else 0.0,
+            "profit_factor": self._gross_profit / self._gross_loss if self._gross_loss > 0 else 0.0,
+            "expectancy": self._return_sum / trades if trades else 0.0,
+            "trade_count": float(trades),
+        }
+
+    def _add_return(self, value: float) -> None:
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _remove_return(self, value: float) -> None:
+        if self._count <= 1:
+            self._count, self._mean, self._m2 = 0, 0.0, 0.0
+            return
+        mean_after = (self._count * self._mean - value) / (self._count - 1)
+        self._m2 -= (value - self._mean) * (value - mean_after)
+        self._mean = mean_after
+        self._count -= 1
+
+    def _evict(self) -> None:
+        if self._last is None:
+            return
+        cutoff = self._last[0] - self.window
+        points = self._points
+        while points and points[0][0] <= cutoff:
+            points.popleft()
+            # The oldest point held has no return in the window.
+            if points:
+                self._remove_return(points[0][2])
+        trades = self._trades
+        while trades and trades[0].entry_time <= cutoff:
+            trade = trades.popleft()
+            self._trade_count -= 1
+            self._return_sum -= trade.net_return
+            if trade.net_pnl > 0:
+                self._wins -= 1
+                self._gross_profit -= trade.net_pnl
+            elif trade.net_pnl < 0:
+                self._losses -= 1
+                self._gross_loss += trade.net_pnl
+            # Reset emptied sums so subtraction leaves no rounding residue.
+            if not self._trade_count:
+                self._return_sum = 0.0
+            if not self._wins:
+                self._gross_profit = 0.0
+            if not self._losses:
+                self._gross_loss = 0.0
+
+
+class OnlineReportMetrics:
+    """Streaming counterpart of ``calc_report_metrics``.
+
+    Routes each equity point (by time) and trade (by entry time) to the
+    overall, segment and walk-forward ``OnlineMetrics``, so a backtest can
+    report all three without keeping its equity curve.  Calendar segments
+    are opened as their periods arrive; market-state segments are scored on
+    stitched stretches and need the full curve.
+    """
+
+    __slots__ = ("overall", "spec", "segments", "walk_forward")
+
+    def __init__(self, initial_capital: float, segments: SegmentSpec | None = None) -> None:
+        self.spec = segments or DEFAULT_SEGMENTS
+        if self.spec.labels:
+            raise ValueError("Market-state segments need the equity curve; keep_equity_curve must be set")
+        self.overall = OnlineMetrics(initial_capital)
+        self.segments = {name: OnlineMetrics() for name, _, _ in self.spec.ranges}
+        self.walk_forward = {
+            name: (years, OnlineMetrics(None if use_first else initial_capital))
+            for name, (years, use_first) in _WALK_FORWARD.items()
+        }
+
+    def _routes(self, time: datetime) -> Iterable[OnlineMetrics]:
+        yield self.overall
+        name = self.spec.segment_of(time)
+        if name is not None:
+            acc = self.segments.get(name)
+            if acc is None:
+                acc = self.segments[name] = OnlineMetrics()
+            yield acc
+        for (start, end), acc in self.walk_forward.values():
+            if start <= time.year <= end:
+                yield acc
+
+    def push_equity(self, time: datetime, equity: float) -> None:
+        for acc in self._routes(time):
+            acc.push_equity(time, equity)
+
+    def push_trade(self, trade: Trade) -> None:
+        for acc in self._routes(trade.entry_time):
+            acc.push_trade(trade)
+
+    def report(self) -> tuple[dict[str, float], dict[str, dict[str, float]], dict[str, dict[str, float]]]:
+        return (
+            self.overall.metrics(),
+            {name: acc.metrics() for name, acc in self.segments.items()},
+            {name: acc.metrics() for name, (_, acc) in self.walk_forward.items()},
+        )
@@ -0,0 +1,480 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Literal, Sequence
+
+from ai_trader.backtest.engine import (
+    DECISION_STREAM_FIELDS,
+    EVALUATION_WARMUP_BARS,
+    compute_decision_stream,
+    decision_stream_key,
+    run_backtest,
+)
+from ai_trader.backtest.execution import BenchmarkReturnPool
+from ai_trader.backtest.metrics import calc_metrics
+from ai_trader.chan.config import ChanConfig, get_chan_config
+from ai_trader.result_cache import ResultCache
+from ai_trader.types import BacktestConfig, Bar, DecisionStep, parse_utc_time
+
+SearchStrategy = Literal["grid", "random", "successive_halving"]
+
+CHAN_PARAM_PREFIX = "chan."
+
+
+@dataclass(slots=True)
+class WalkForwardFold:
+    name: str
+    train_start: datetime
+    test_start: datetime
+    test_end: datetime
+
+    def __post_init__(self) -> None:
+        self.train_start = parse_utc_time(self.train_start)
+        self.test_start = parse_utc_time(self.test_start)
+        self.test_end = parse_utc_time(self.test_end)
+
+
+@dataclass(slots=True)
+class TrialResult:
+    params: dict[str, Any]
+    structure_key: str
+    score: float
+    train_score: float
+    folds_evaluated: int
+    fold_scores: dict[str, float] = field(default_factory=dict)
+    test_metrics: dict[str, float] = field(default_factory=dict)
+
+    def to_row(self) -> dict[str, Any]:
+        row: dict[str, Any] = {
+            "score": self.score,
+            "train_score": self.train_score,
+            "folds_evaluated": self.folds_evaluated,
+            "structure_key": self.structure_key[:12],
+        }
+        row.update({f"param:{key}": value for key, value in self.params.items()})
+        row.update({f"test:{key}": value for key, value in self.test_metrics.items()})
+        return row
+
+
+@dataclass(slots=True)
+class SearchResult:
+    strategy: SearchStrategy
+    objective: str
+    folds: list[WalkForwardFold]
+    trials: list[TrialResult]
+    structure_builds: int = 0
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        return [{"rank": rank, **item.to_row()} for rank, item in enumerate(self.trials, start=1)]
+
+
+def rolling_walk_forward_folds(
+    start_utc: datetime | str,
+    end_utc: datetime | str,
+    train_days: int,
+    test_days: int,
+    step_days: int | None = None,
+) -> list[WalkForwardFold]:
+    """Split ``[start_utc, end_utc]`` into rolling train/test windows.
+
+    Each fold trains on ``train_days`` and tests on the following
+    ``test_days``; the window then advances by ``step_days`` (defaults to
+    ``test_days`` so test windows tile the range without overlap).
+    """
+    if train_days <= 0 or test_days <= 0:
+        raise ValueError("train_days and test_days must be positive")
+    start = parse_utc_time(start_utc)
+    end = parse_utc_time(end_utc)
+    step = timedelta(days=step_days or test_days)
+
+    folds: list[WalkForwardFold] = []
+    cursor = start
+    while True:
+        test_start = cursor + timedelta(days=train_days)
+        test_end = test_start + timedelta(days=test_days)
+        if test_end > end:
+            break
+        folds.append(
+            WalkForwardFold(
+                name=f"fold_{len(folds):02d}",
+                train_start=cursor,
+                test_start=test_start,
+                test_end=test_end,
+            )
+        )
+        cursor += step
+    return folds
+
+
+def _split_params(params: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    chan_params = {
+        key[len(CHAN_PARAM_PREFIX) :]: value
+        for key, value in params.items()
+        if key.startswith(CHAN_PARAM_PREFIX)
+    }
+    backtest_params = {
+        key: value for key, value in params.items() if not key.startswith(CHAN_PARAM_PREFIX)
+    }
+    return chan_params, backtest_params
+
+
+def _validate_space(space: dict[str, Sequence[Any]]) -> None:
+    chan_fields = {item.name for item in fields(ChanConfig)}
+    backtest_fields = {item.name for item in fields(BacktestConfig)}
+    for key, values in space.items():
+        if not values:
+            raise ValueError(f"search space for {key} is empty")
+        if key.startswith(CHAN_PARAM_PREFIX):
+            if key[len(CHAN_PARAM_PREFIX) :] not in chan_fields:
+                raise ValueError(f"Unknown ChanConfig field: {key}")
+        elif key not in backtest_fields:
+            raise ValueError(f"Unknown BacktestConfig field: {key}")
+
+
+def resolve_trial_configs(
+    config: BacktestConfig, params: dict[str, Any]
+) -> tuple[BacktestConfig, ChanConfig]:
+    chan_params, backtest_params = _split_params(params)
+    trial_config = replace(config, **backtest_params)
+    chan_config = replace(get_chan_config(trial_config.chan_mode), **chan_params)
+    return trial_config, chan_config
+
+
+def structure_key(config: BacktestConfig, chan_config: ChanConfig) -> str:
+    payload = {
+        "backtest": {name: getattr(config, name) for name in DECISION_STREAM_FIELDS},
+        "chan": asdict(chan_config),
+    }
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _grid_candidates(space: dict[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    keys = list(space.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def _random_candidates(
+    space: dict[str, Sequence[Any]], n_trials: int, seed: int
+) -> list[dict[str, Any]]:
+    grid = _grid_candidates(space)
+    if n_trials >= len(grid):
+        return grid
+    rng = random.Random(seed)
+    return rng.sample(grid, n_trials)
+
+
+# ---------------------------------------------------------------------------
+# Fold data and worker tasks
+# ---------------------------------------------------------------------------
+
+_WORKER_BARS: tuple[list[Bar], list[Bar]] | None = None
+# Benchmark pools of the fold slices, keyed by fold bounds.
+_WORKER_BENCHMARKS: dict[tuple[datetime, datetime], BenchmarkReturnPool] = {}
+
+
+def _init_worker(bars_main: list[Bar], bars_sub: list[Bar]) -> None:
+    global _WORKER_BARS
+    _WORKER_BARS = (bars_main, bars_sub)
+    _WORKER_BENCHMARKS.clear()
+
+
+def _fold_benchmark(fold: WalkForwardFold, bars_main: list[Bar]) -> BenchmarkReturnPool:
+    key = (fold.train_start, fold.test_end)
+    pool = _WORKER_BENCHMARKS.get(key)
+    if pool is None:
+        pool = _WORKER_BENCHMARKS[key] = BenchmarkReturnPool.from_bars(bars_main)
+    return pool
+
+
+def _fold_bars(
+    bars_main: list[Bar], bars_sub: list[Bar], fold: WalkForwardFold
+) -> tuple[list[Bar], list[Bar]]:
+    """Slice bars so ``run_backtest`` starts evaluating at ``fold.train_start``."""
+    first_idx = next(
+        (i for i, item in enumerate(bars_main) if item.time >= fold.train_start),
+        len(bars_main),
+    )
+    start_idx = max(0, first_idx - EVALUATION_WARMUP_BARS)
+    main = [item for item in bars_main[start_idx:] if item.time <= fold.test_end]
+    if not main:
+        return [], []
+    sub = [item for item in bars_sub if main[0].time <= item.time <= fold.test_end]
+    return main, sub
+
+
+def _build_stream_task(
+    params: dict[str, Any],
+    base_config: BacktestConfig,
+    fold: WalkForwardFold,
+    cache: ResultCache,
+    key: str,
+) -> str:
+    assert _WORKER_BARS is not None
+    bars_main, bars_sub = _fold_bars(*_WORKER_BARS, fold)
+    trial_config, chan_config = resolve_trial_configs(base_config, params)
+    stream = compute_decision_stream(trial_config, bars_main, bars_sub, chan_config=chan_config)
+    cache.put(key, stream)
+    return key
+
+
+def _fold_metrics(report, fold: WalkForwardFold, initial_capital: float) -> tuple[dict, dict]:
+    train_equity = [item for item in report.equity_curve if item.time < fold.test_start]
+    test_equity = [item for item in report.equity_curve if item.time >= fold.test_start]
+    train_trades = [item for item in report.trades if item.entry_time < fold.test_start]
+    test_trades = [item for item in report.trades if item.entry_time >= fold.test_start]
+    train = calc_metrics(train_equity, train_trades, initial_capital)
+    test = calc_metrics(
+        test_equity,
+        test_trades,
+        test_equity[0].equity if test_equity else initial_capital,
+    )
+    return train, test
+
+
+def _execute_trial_task(
+    params: dict[str, Any],
+    base_config: BacktestConfig,
+    fold: WalkForwardFold,
+    cache: ResultCache,
+    key: str,
+) -> tuple[dict, dict]:
+    assert _WORKER_BARS is not None
+    bars_main, bars_sub = _fold_bars(*_WORKER_BARS, fold)
+    trial_config, chan_config = resolve_trial_configs(base_config, params)
+    # A stream evicted since stage 1 comes back as None and run_backtest
+    # rebuilds the structure inline.
+    stream: list[DecisionStep] | None = cache.get(key)
+    report = run_backtest(
+        trial_config,
+        bars_main=bars_main,
+        bars_sub=bars_sub,
+        chan_config=chan_config,
+        decision_stream=stream,
+        benchmark_pool=_fold_benchmark(fold, bars_main),
+    )
+    return _fold_metrics(report, fold, trial_config.initial_capital)
+
+
+class _InlineExecutor:
+    """Sequential stand-in for a process pool when ``workers <= 1``."""
+
+    def map(self, fn: Callable, *iterables):
+        return map(fn, *iterables)
+
+
+# ---------------------------------------------------------------------------
+# Search driver
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class _Candidate:
+    params: dict[str, Any]
+    structure_key: str
+    train: dict[str, dict[str, float]] = field(default_factory=dict)
+    test: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+class _Evaluator:
+    def __init__(
+        self,
+        config: BacktestConfig,
+        bars_main: list[Bar],
+        bars_sub: list[Bar],
+        folds: list[WalkForwardFold],
+        cache: ResultCache,
+        executor: Executor | _InlineExecutor,
+    ) -> None:
+        self.config = config
+        self.bars_main = bars_main
+        self.bars_sub = bars_sub
+        self.folds = folds
+        self.cache = cache
+        self.executor = executor
+        self.structure_builds = 0
+        self._stream_keys: dict[tuple[str, str], str] = {}
+
+    def _stream_key(self, candidate: _Candidate, fold: WalkForwardFold) -> str:
+        memo_key = (candidate.structure_key, fold.name)
+        key = self._stream_keys.get(memo_key)
+        if key is None:
+            trial_config, chan_config = resolve_trial_configs(self.config, candidate.params)
+            fold_main, fold_sub = _fold_bars(self.bars_main, self.bars_sub, fold)
+            key = decision_stream_key(trial_config, fold_main, fold_sub, chan_config=chan_config)
+            self._stream_keys[memo_key] = key
+        return key
+
+    def evaluate(self, candidates: list[_Candidate], fold_count: int) -> None:
+        folds = self.folds[:fold_count]
+
+        # Stage 1: one decision stream per distinct structure key and fold.
+        pending_streams: dict[str, tuple[dict[str, Any], WalkForwardFold]] = {}
+        for candidate in candidates:
+            for fold in folds:
+                if fold.name in candidate.test:
+                    continue
+                key = self._stream_key(candidate, fold)
+                if key not in pending_streams and key not in self.cache:
+                    pending_streams[key] = (candidate.params, fold)
+        if pending_streams:
+            keys = list(pending_streams.keys())
+            list(
+                self.executor.map(
+                    _build_stream_task,
+                    [pending_streams[key][0] for key in keys],
+                    itertools.repeat(self.config),
+                    [pending_streams[key][1] for key in keys],
+                    itertools.repeat(self.cache),
+                    keys,
+                )
+            )
+            self.structure_builds += len(keys)
+
+        # Stage 2: cheap execution replay of every trial on its shared stream.
+        jobs = [
+            (candidate, fold)
+            for candidate in candidates
+            for fold in folds
+            if fold.name not in candidate.test
+        ]
+        results = self.executor.map(
+            _execute_trial_task,
+            [candidate.params for candidate, _ in jobs],
+            itertools.repeat(self.config),
+            [fold for _, fold in jobs],
+            itertools.repeat(self.cache),
+            [self._stream_key(candidate, fold) for candidate, fold in jobs],
+        )
+        for (candidate, fold), (train, test) in zip(jobs, results):
+            candidate.train[fold.name] = train
+            candidate.test[fold.name] = test
+
+
+def _objective_value(metrics: dict[str, float], objective: str) -> float:
+    value = float(metrics.get(objective, 0.0))
+    # Drawdown is a cost: rank lower drawdowns first.
+    return -value if objective == "max_drawdown" else value
+
+
+def _score(candidate: _Candidate, objective: str) -> float:
+    if not candidate.test:
+        return -math.inf
+    return mean(_objective_value(item, objective) for item in candidate.test.values())
+
+
+def _trial_result(candidate: _Candidate, objective: str) -> TrialResult:
+    test_metrics: dict[str, float] = {}
+    if candidate.test:
+        keys = next(iter(candidate.test.values())).keys()
+        test_metrics = {
+            key: mean(float(item.get(key, 0.0)) for item in candidate.test.values()) for key in keys
+        }
+    return TrialResult(
+        params=dict(candidate.params),
+        structure_key=candidate.structure_key,
+        score=_score(candidate, objective),
+        train_score=(
+            mean(_objective_value(item, objective) for item in candidate.train.values())
+            if candidate.train
+            else 0.0
+        ),
+        folds_evaluated=len(candidate.test),
+        fold_scores={
+            name: _objective_value(item, objective) for name, item in candidate.test.items()
+        },
+        test_metrics=test_metrics,
+    )
+
+
+def run_parameter_search(
+    config: BacktestConfig,
+    space: dict[str, Sequence[Any]],
+    bars_main: list[Bar],
+    bars_sub: list[Bar],
+    folds: list[WalkForwardFold],
+    strategy: SearchStrategy = "grid",
+    objective: str = "sharpe",
+    n_trials: int = 20,
+    eta: int = 3,
+    seed: int = 7,
+    workers: int = 1,
+    cache_dir: str | Path | None = None,
+) -> SearchResult:
+    """Search ``ChanConfig``/``BacktestConfig`` parameters over walk-forward folds.
+
+    ``space`` maps ``BacktestConfig`` field names, or ``ChanConfig`` field
+    names prefixed with ``chan.``, to candidate values.  Trials are scored
+    by the mean out-of-sample ``objective`` over the folds they were
+    evaluated on and returned best first.  ``successive_halving`` starts
+    with ``n_trials`` random candidates on the first fold and keeps the best
+    ``1/eta`` while widening to ``eta`` times as many folds per rung.
+    """
+    if not folds:
+        raise ValueError("at least one walk-forward fold is required")
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    _validate_space(space)
+
+    bars_main = sorted(bars_main, key=lambda x: x.time)
+    bars_sub = sorted(bars_sub, key=lambda x: x.time)
+
+    if strategy == "grid":
+        params_list = _grid_candidates(space)
+    elif strategy in {"random", "successive_halving"}:
+        params_list = _random_candidates(space, n_trials, seed)
+    else:
+        raise ValueError(f"Unsupported search strategy: {strategy}")
+
+    candidates = []
+    for params in params_list:
+        trial_config, chan_config = resolve_trial_configs(config, params)
+        candidates.append(_Candidate(params=params, structure_key=structure_key(trial_config, chan_config)))
+
+    cache = ResultCache(cache_dir)
+    if workers > 1:
+        executor: Executor | _InlineExecutor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(bars_main, bars_sub),
+        )
+    else:
+        _init_worker(bars_main, bars_sub)
+        executor = _InlineExecutor()
+
+    try:
+        evaluator = _Evaluator(config, bars_main, bars_sub, folds, cache, executor)
+        if strategy == "successive_halving":
+            survivors = candidates
+            fold_count = 1
+            while True:
+                evaluator.evaluate(survivors, fold_count)
+                if len(survivors) <= 1 or fold_count >= len(folds):
+                    break
+                survivors = sorted(survivors, key=lambda item: _score(item, objective), reverse=True)
+                survivors = survivors[: max(1, math.ceil(len(survivors) / eta))]
+                fold_count = min(len(folds), fold_count * eta)
+        else:
+            evaluator.evaluate(candidates, len(folds))
+    finally:
+        if isinstance(executor, ProcessPoolExecutor):
+            executor.shutdown()
+
+    trials = [_trial_result(item, objective) for item in candidates]
+    trials.sort(key=lambda item: (item.folds_evaluated, item.score), reverse=True)
+    return SearchResult(
+        strategy=strategy,
+        objective=objective,
+        folds=list(folds),
+        trials=trials,
+        structure_builds=evaluator.structure_builds,
+    )
@@ -1,3 +1,4 @@
-from .engine import build_chan_state, generate_signal
+from .cascade import LevelCascade
+from .engine import LevelAnalysis, analyze_level, build_chan_state, generate_signal
 
-__all__ = ["build_chan_state", "generate_signal"]
+__all__ = ["LevelAnalysis", "LevelCascade", "analyze_level", "build_chan_state", "generate_signal"]
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.chan.config import ChanConfig, get_chan_config
+from ai_trader.chan.core.center import ZhongshuBuilder
+from ai_trader.chan.core.trend_phase import OscillationTracker
+from ai_trader.chan.engine import (
+    _insufficient_snapshot,
+    apply_snapshot_mode,
+    build_level_structure,
+    generate_signal,
+    snapshot_from_levels,
+)
+from ai_trader.data.binance_ohlcv import timeframe_to_timedelta
+from ai_trader.indicators import MACDAccumulator
+from ai_trader.types import Bar, ChanSnapshot, LevelStructure, MACDPoint, SignalDecision
+
+DEFAULT_CASCADE_TIMEFRAMES = ("1d", "4h", "1h", "15m")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class _Level:
+    """Closed bars of one timeframe plus its lazily built structure."""
+
+    def __init__(self, timeframe: str, max_bars: int | None) -> None:
+        self.timeframe = timeframe
+        self.step = timeframe_to_timedelta(timeframe)
+        self.max_bars = max_bars
+        self.bars: list[Bar] = []
+        self.macd: list[MACDPoint] = []
+        self.pending: Bar | None = None
+        self.structure_builds = 0
+        self._macd_acc = MACDAccumulator()
+        self._zhongshus = ZhongshuBuilder()
+        self._structure: LevelStructure | None = None
+        # The level's Zn windows as the main and as the sub level of a pair.
+        self.oscillation = {"main": OscillationTracker(), "sub": OscillationTracker()}
+
+    def bucket_end(self, close_time: datetime) -> datetime:
+        # ``close_time`` is a base bar's available time; it belongs to the
+        # bucket whose close is the next multiple of ``step`` at or after it.
+        offset = (close_time - _EPOCH) % self.step
+        if offset == timedelta(0):
+            return close_time
+        return close_time + (self.step - offset)
+
+    def append(self, bar: Bar) -> None:
+        self.bars.append(bar)
+        self.macd.append(self._macd_acc.push(bar))
+        if self.max_bars is not None and len(self.bars) > self.max_bars:
+            excess = len(self.bars) - self.max_bars
+            del self.bars[:excess]
+            del self.macd[:excess]
+        self._structure = None
+
+    def absorb(self, bar: Bar) -> bool:
+        """Aggregate a lower-level bar; return True when this level's bar closed."""
+        end = self.bucket_end(bar.time)
+        closed = False
+        if self.pending is not None and self.pending.time != end:
+            # The lower level skipped this bucket's last bar; close it anyway.
+            self.append(self.pending)
+            self.pending = None
+            closed = True
+
+        if self.pending is None:
+            self.pending = Bar(
+                time=end,
+                open=bar.open,
+                high=bar.high,
+                low=bar.low,
+                close=bar.close,
+                volume=bar.volume,
+            )
+        else:
+            self.pending.high = max(self.pending.high, bar.high)
+            self.pending.low = min(self.pending.low, bar.low)
+            self.pending.close = bar.close
+            self.pending.volume += bar.volume
+
+        if bar.time == end:
+            self.append(self.pending)
+            self.pending = None
+            closed = True
+        return closed
+
+    @property
+    def dirty(self) -> bool:
+        return self._structure is None
+
+    def structure(self, cfg: ChanConfig) -> LevelStructure:
+        if self._structure is None:
+            macd = self.macd if self._macd_acc.count >= 2 else []
+            self._structure = build_level_structure(self.timeframe, self.bars, macd, cfg, self._zhongshus)
+            self.structure_builds += 1
+        return self._structure
+
+
+class LevelCascade:
+    """Incremental Chan structure over several nested timeframes.
+
+    Bars of the lowest timeframe are pushed one at a time and aggregated
+    upward; a level's bars only change when one of its bars closes.  Each
+    level's structure is built lazily on first use after a change and is
+    shared by the snapshots of both adjacent level pairs, so e.g. the 1h
+    structure serves the 4h/1h and 1h/15m pairs from a single build.
+    """
+
+    def __init__(
+        self,
+        timeframes: Sequence[str] = DEFAULT_CASCADE_TIMEFRAMES,
+        chan_config: ChanConfig | None = None,
+        exchange: str = "binance",
+        symbol: str = "BTC/USDT",
+        max_bars: int | Mapping[str, int] | None = None,
+    ) -> None:
+        if len(timeframes) < 2:
+            raise ValueError("a cascade needs at least two timeframes")
+        ordered = sorted(timeframes, key=timeframe_to_timedelta, reverse=True)
+        for higher, lower in zip(ordered, ordered[1:]):
+            higher_step = timeframe_to_timedelta(higher)
+            lower_step = timeframe_to_timedelta(lower)
+            if higher_step == lower_step or higher_step % lower_step:
+                raise ValueError(f"{higher} is not a multiple of {lower}")
+
+        self.chan_config = chan_config or get_chan_config("orthodox_chan")
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframes: tuple[str, ...] = tuple(ordered)
+        self._levels = {
+            tf: _Level(tf, max_bars.get(tf) if isinstance(max_bars, Mapping) else max_bars)
+            for tf in self.timeframes
+        }
+        self._base = self._levels[self.timeframes[-1]]
+        self._higher = [self._levels[tf] for tf in reversed(self.timeframes[:-1])]
+        self.asof_time: datetime | None = None
+
+    @property
+    def base_timeframe(self) -> str:
+        return self.timeframes[-1]
+
+    def push(self, bar: Bar) -> list[str]:
+        """Add one closed base-timeframe bar; return the timeframes that closed a bar."""
+        if self.asof_time is not None and bar.time <= self.asof_time:
+            raise ValueError(
+                f"bars must be pushed in time order: {bar.time} <= {self.asof_time}"
+            )
+        self._base.append(bar)
+        self.asof_time = bar.time
+        closed = [self.base_timeframe]
+        for level in self._higher:
+            if level.absorb(bar):
+                closed.append(level.timeframe)
+        return closed
+
+    def extend(self, bars: Iterable[Bar]) -> None:
+        for bar in bars:
+            self.push(bar)
+
+    def bars(self, timeframe: str) -> list[Bar]:
+        return self._level(timeframe).bars
+
+    def structure(self, timeframe: str) -> LevelStructure:
+        return self._level(timeframe).structure(self.chan_config)
+
+    def structure_builds(self) -> dict[str, int]:
+        return {tf: self._levels[tf].structure_builds for tf in self.timeframes}
+
+    def lower_of(self, timeframe: str) -> str:
+        idx = self.timeframes.index(self._level(timeframe).timeframe)
+        if idx + 1 >= len(self.timeframes):
+            raise ValueError(f"{timeframe} is the lowest level of the cascade")
+        return self.timeframes[idx + 1]
+
+    def snapshot(self, timeframe_main: str, timeframe_sub: str | None = None) -> ChanSnapshot:
+        """``ChanSnapshot`` for a level pair as of the last pushed bar."""
+        timeframe_sub = timeframe_sub or self.lower_of(timeframe_main)
+        main = self._level(timeframe_main)
+        sub = self._level(timeframe_sub)
+        if main.step <= sub.step:
+            raise ValueError(f"{timeframe_main} must be a higher level than {timeframe_sub}")
+        if self.asof_time is None:
+            raise ValueError("no bars pushed yet")
+
+        cfg = self.chan_config
+        if len(main.bars) < cfg.min_main_bars or len(sub.bars) < cfg.min_sub_bars:
+            return _insufficient_snapshot(
+                exchange=self.exchange,
+                symbol=self.symbol,
+                timeframe_main=timeframe_main,
+                timeframe_sub=timeframe_sub,
+                asof_time=self.asof_time,
+                bars_main=list(main.bars),
+                bars_sub=list(sub.bars),
+                notes=(
+                    f"bars_main={len(main.bars)} (<{cfg.min_main_bars}) 或 "
+                    f"bars_sub={len(sub.bars)} (<{cfg.min_sub_bars})"
+                ),
+            )
+        snapshot = snapshot_from_levels(
+            main.structure(cfg),
+            sub.structure(cfg),
+            self.asof_time,
+            exchange=self.exchange,
+            symbol=self.symbol,
+            oscillation_trackers={"main": main.oscillation["main"], "sub": sub.oscillation["sub"]},
+        )
+        return apply_snapshot_mode(snapshot, cfg)
+
+    def decision(
+        self,
+        timeframe_main: str,
+        timeframe_sub: str | None = None,
+        macd_divergence_threshold: float = 0.10,
+        min_confidence: float = 0.60,
+    ) -> SignalDecision:
+        return generate_signal(
+            self.snapshot(timeframe_main, timeframe_sub),
+            macd_divergence_threshold=macd_divergence_threshold,
+            min_confidence=min_confidence,
+            chan_config=self.chan_config,
+        )
+
+    def _level(self, timeframe: str) -> _Level:
+        level = self._levels.get(timeframe)
+        if level is None:
+            raise ValueError(f"timeframe {timeframe} is not part of the cascade {self.timeframes}")
+        return level
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Literal
 
 Mode = Literal["strict_kline8", "orthodox_chan", "pragmatic"]
+SnapshotMode = Literal["full", "summary"]
 
 
 @dataclass(slots=True)
@@ -28,6 +29,10 @@ class ChanConfig:
     prefer_first_class_signals: bool = False
     require_sub_interval_confirmation: bool = True
     include_consolidation_divergence_hint: bool = False
+    # "summary" snapshots keep only the structure from the last
+    # ``snapshot_tail_depth`` zhongshus (or bis/segments) of each level on.
+    snapshot_mode: SnapshotMode = "full"
+    snapshot_tail_depth: int = 6
 
 
 STRICT_KLINE8 = ChanConfig(
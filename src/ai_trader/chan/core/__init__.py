@@ -1,5 +1,6 @@
+from .batch import detect_fractal_arrays, merge_inclusion_arrays
 from .buy_sell_points import decide_action, generate_signals
-from .center import build_zhongshus, build_zhongshus_from_bis
+from .center import ZhongshuBuilder, build_zhongshus, build_zhongshus_from_bis
 from .divergence import detect_divergence_candidates
 from .fractal import detect_fractals
 from .include import merge_inclusions
@@ -8,14 +9,17 @@ from .stroke import build_bis
 from .trend_phase import infer_market_state
 
 __all__ = [
+    "ZhongshuBuilder",
     "build_bis",
     "build_segments",
     "build_zhongshus",
     "build_zhongshus_from_bis",
     "decide_action",
+    "detect_fractal_arrays",
     "detect_divergence_candidates",
     "detect_fractals",
     "generate_signals",
     "infer_market_state",
+    "merge_inclusion_arrays",
     "merge_inclusions",
 ]
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from ai_trader.types import Bar, Fractal
+
+FRACTAL_TOP = 1
+FRACTAL_BOTTOM = -1
+
+
+@dataclass(slots=True)
+class FractalArrays:
+    """Fractals of a merged bar series as parallel arrays.
+
+    ``top``/``bottom`` are boolean masks over all bars (the first and last
+    bar are never fractals); ``index``, ``kind`` (``FRACTAL_TOP`` or
+    ``FRACTAL_BOTTOM``) and ``price`` list the fractals in bar order.
+    """
+
+    top: np.ndarray
+    bottom: np.ndarray
+    index: np.ndarray
+    kind: np.ndarray
+    price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+@dataclass(slots=True)
+class MergedArrays:
+    """Inclusion-merged bars as parallel arrays.
+
+    ``last_raw`` is the raw index of the last bar absorbed into each merged
+    bar (whose time the merged bar takes), ``direction`` the merge direction
+    recorded by ``merge_inclusions_with_trace`` and ``raw_to_merged`` maps
+    every raw bar to its merged bar.
+    """
+
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    direction: np.ndarray
+    last_raw: np.ndarray
+    raw_to_merged: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.high)
+
+
+def bar_arrays(bars: Sequence[Bar]) -> tuple[np.ndarray, np.ndarray]:
+    """High and low prices of ``bars`` as float64 arrays."""
+    count = len(bars)
+    high = np.fromiter((item.high for item in bars), dtype=np.float64, count=count)
+    low = np.fromiter((item.low for item in bars), dtype=np.float64, count=count)
+    return high, low
+
+
+def fractal_masks(high: np.ndarray, low: np.ndarray, allow_equal: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``_is_top``/``_is_bottom`` over every interior bar.
+
+    A bar satisfying both tests is a top, as in ``detect_fractals``.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    if high.shape != low.shape or high.ndim != 1:
+        raise ValueError("high and low must be 1-d arrays of the same length")
+
+    n = len(high)
+    top = np.zeros(n, dtype=bool)
+    bottom = np.zeros(n, dtype=bool)
+    if n < 3:
+        return top, bottom
+
+    lh, mh, rh = high[:-2], high[1:-1], high[2:]
+    ll, ml, rl = low[:-2], low[1:-1], low[2:]
+    if allow_equal:
+        is_top = (mh >= lh) & (mh >= rh) & (ml >= ll) & (ml >= rl)
+        is_top &= (mh > lh) | (mh > rh) | (ml > ll) | (ml > rl)
+        is_bottom = (ml <= ll) & (ml <= rl) & (mh <= lh) & (mh <= rh)
+        is_bottom &= (ml < ll) | (ml < rl) | (mh < lh) | (mh < rh)
+    else:
+        is_top = (mh > lh) & (mh > rh) & (ml > ll) & (ml > rl)
+        is_bottom = (ml < ll) & (ml < rl) & (mh < lh) & (mh < rh)
+
+    top[1:-1] = is_top
+    bottom[1:-1] = is_bottom & ~is_top
+    return top, bottom
+
+
+def detect_fractal_arrays(high: np.ndarray, low: np.ndarray, allow_equal: bool = False) -> FractalArrays:
+    """Batch counterpart of ``detect_fractals`` over merged high/low arrays."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    top, bottom = fractal_masks(high, low, allow_equal=allow_equal)
+    index = np.flatnonzero(top | bottom)
+    is_top = top[index]
+    kind = np.where(is_top, FRACTAL_TOP, FRACTAL_BOTTOM).astype(np.int8)
+    price = np.where(is_top, high[index], low[index])
+    return FractalArrays(top=top, bottom=bottom, index=index, kind=kind, price=price)
+
+
+def fractals_from_arrays(bars: Sequence[Bar], arrays: FractalArrays) -> list[Fractal]:
+    """Materialize ``Fractal`` records for ``arrays`` computed over ``bars``."""
+    return [
+        Fractal(
+            kind="top" if kind == FRACTAL_TOP else "bottom",
+            index=idx,
+            price=price,
+            event_time=bars[idx].time,
+            available_time=bars[idx + 1].time,
+            status="confirmed",
+        )
+        for idx, kind, price in zip(arrays.index.tolist(), arrays.kind.tolist(), arrays.price.tolist())
+    ]
+
+
+def ohlcv_arrays(bars: Sequence[Bar]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Open, high, low, close and volume of ``bars`` as float64 arrays."""
+    table = np.array([(item.open, item.high, item.low, item.close, item.volume) for item in bars], dtype=np.float64)
+    table = table.reshape(len(bars), 5)
+    return table[:, 0], table[:, 1], table[:, 2], table[:, 3], table[:, 4]
+
+
+def merge_inclusion_arrays(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+) -> MergedArrays:
+    """Batch counterpart of ``merge_inclusions_with_trace`` over raw OHLCV arrays.
+
+    The merge is sequential by nature, so this is a single tight loop over
+    plain floats that writes into output buffers sized for the worst case
+    up front; no per-bar objects are created.
+    """
+    n = len(high)
+    if not (len(open_) == len(low) == len(close) == len(volume) == n):
+        raise ValueError("open, high, low, close and volume must have the same length")
+
+    out_open = array("d", bytes(8 * n))
+    out_high = array("d", bytes(8 * n))
+    out_low = array("d", bytes(8 * n))
+    out_close = array("d", bytes(8 * n))
+    out_volume = array("d", bytes(8 * n))
+    out_direction = array("b", bytes(n))
+    out_last = array("q", bytes(8 * n))
+    raw_to_merged = array("q", bytes(8 * n))
+
+    count = 0
+    if n:
+        opens = np.asarray(open_, dtype=np.float64).tolist()
+        highs = np.asarray(high, dtype=np.float64).tolist()
+        lows = np.asarray(low, dtype=np.float64).tolist()
+        closes = np.asarray(close, dtype=np.float64).tolist()
+        volumes = np.asarray(volume, dtype=np.float64).tolist()
+
+        m = 0
+        prev_high = highs[0]
+        prev_low = lows[0]
+        out_open[0] = opens[0]
+        out_high[0] = prev_high
+        out_low[0] = prev_low
+        out_close[0] = closes[0]
+        out_volume[0] = volumes[0]
+        direction = 0
+        for i in range(1, n):
+            cur_high = highs[i]
+            cur_low = lows[i]
+            if (prev_high >= cur_high and prev_low <= cur_low) or (prev_high <= cur_high and prev_low >= cur_low):
+                # Inclusion never has a strict trend between the pair, so an
+                # undecided direction defaults to up as in the reference.
+                if direction == 0:
+                    direction = 1
+                if direction > 0:
+                    prev_high = prev_high if prev_high >= cur_high else cur_high
+                    prev_low = prev_low if prev_low >= cur_low else cur_low
+                else:
+                    prev_high = prev_high if prev_high <= cur_high else cur_high
+                    prev_low = prev_low if prev_low <= cur_low else cur_low
+                out_high[m] = prev_high
+                out_low[m] = prev_low
+                out_close[m] = closes[i]
+                out_volume[m] += volumes[i]
+            else:
+                if cur_high > prev_high and cur_low > prev_low:
+                    direction = 1
+                elif cur_high < prev_high and cur_low < prev_low:
+                    direction = -1
+                m += 1
+                prev_high = cur_high
+                prev_low = cur_low
+                out_open[m] = opens[i]
+                out_high[m] = cur_high
+                out_low[m] = cur_low
+                out_close[m] = closes[i]
+                out_volume[m] = volumes[i]
+            out_direction[m] = direction
+            out_last[m] = i
+            raw_to_merged[i] = m
+        count = m + 1
+
+    return MergedArrays(
+        open=np.frombuffer(out_open, dtype=np.float64)[:count],
+        high=np.frombuffer(out_high, dtype=np.float64)[:count],
+        low=np.frombuffer(out_low, dtype=np.float64)[:count],
+        close=np.frombuffer(out_close, dtype=np.float64)[:count],
+        volume=np.frombuffer(out_volume, dtype=np.float64)[:count],
+        direction=np.frombuffer(out_direction, dtype=np.int8)[:count],
+        last_raw=np.frombuffer(out_last, dtype=np.int64)[:count],
+        raw_to_merged=np.frombuffer(raw_to_merged, dtype=np.int64),
+    )
+
+
+def bars_from_merged_arrays(raw_bars: Sequence[Bar], merged: MergedArrays) -> list[Bar]:
+    """Materialize ``Bar`` records for ``merged`` computed over ``raw_bars``."""
+    return [
+        Bar(time=raw_bars[last].time, open=o, high=h, low=lo, close=c, volume=v)
+        for last, o, h, lo, c, v in zip(
+            merged.last_raw.tolist(),
+            merged.open.tolist(),
+            merged.high.tolist(),
+            merged.low.tolist(),
+            merged.close.tolist(),
+            merged.volume.tolist(),
+        )
+    ]
@@ -4,6 +4,7 @@ from typing import Iterable
 
 from ai_trader.chan.config import ChanConfig
 from ai_trader.chan.core.divergence import DivergenceCandidate
+from ai_trader.chan.core.time_index import TimeOrdered, center_time
 from ai_trader.types import Action, Bi, MarketState, Risk, Segment, Signal, Zhongshu
 
 
@@ -29,11 +30,23 @@ def allow_high_conflict_reversal(
     return False
 
 
+def _available_since(items, time, inclusive: bool = False) -> list:
+    """Items of a bi/segment list available after ``time``, in list order."""
+    if isinstance(items, TimeOrdered):
+        return items.after(time, inclusive)
+    if inclusive:
+        return [item for item in items if item.available_time >= time]
+    return [item for item in items if item.available_time > time]
+
+
 def _confirmed_bis_in_b2_window(
     bis_sub: list[Bi],
     anchor_time,
     cutoff_time,
 ) -> list[Bi]:
+    if isinstance(bis_sub, TimeOrdered):
+        window = bis_sub.between(anchor_time, cutoff_time)
+        return [item for item in window if item.status == "confirmed"]
     return [
         item
         for item in bis_sub
@@ -47,6 +60,8 @@ def _first_new_sub_center_after(
     zhongshus_sub: list[Zhongshu],
     anchor_time,
 ):
+    if isinstance(zhongshus_sub, TimeOrdered):
+        return zhongshus_sub.first_time_after(anchor_time)
     times = [
         item.origin_available_time or item.available_time
         for item in zhongshus_sub
@@ -71,11 +86,7 @@ def _first_pullback_after_departure(
     departure_direction: str,
 ) -> tuple[Segment, Segment] | None:
     center_confirmed_at = zhongshu.origin_available_time or zhongshu.available_time
-    confirmed = [
-        item
-        for item in _confirmed_segments(segments_sub)
-        if item.available_time >= center_confirmed_at
-    ]
+    confirmed = _confirmed_segments(_available_since(segments_sub, center_confirmed_at, inclusive=True))
     if len(confirmed) < 3:
         return None
 
@@ -128,8 +139,8 @@ def _first_bi_pullback_after_departure(
     center_confirmed_at = zhongshu.origin_available_time or zhongshu.available_time
     confirmed = [
         item
-        for item in bis_context
-        if item.status == "confirmed" and item.available_time >= center_confirmed_at
+        for item in _available_since(bis_context, center_confirmed_at, inclusive=True)
+        if item.status == "confirmed"
     ]
     if len(confirmed) < 3:
         return None
@@ -399,8 +410,21 @@ def generate_signals(
     transitional_confidence_cap: float,
     zhongshus_sub: list[Zhongshu] | None = None,
     bis_context: list[Bi] | None = None,
+    time_ordered: bool = False,
 ) -> list[Signal]:
+    """Main-level signals from ``divergence_candidates`` plus derived B2/S2/B3/S3.
+
+    With ``time_ordered`` the sub-level lists are taken to be in
+    availability order, as the pipeline builds them, and are windowed by
+    bisection instead of filtered.
+    """
     zhongshus_sub = zhongshus_sub or []
+    if time_ordered:
+        bis_sub = TimeOrdered(bis_sub)
+        segments_sub = TimeOrdered(segments_sub)
+        zhongshus_sub = TimeOrdered(zhongshus_sub, key=center_time)
+        if bis_context is not None:
+            bis_context = TimeOrdered(bis_context)
     signals: list[Signal] = []
 
     for item in divergence_candidates:
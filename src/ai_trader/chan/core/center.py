@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import copy
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Literal, cast
 
-from ai_trader.types import Bi, Segment, Zhongshu, ZhongshuEvolution
+from ai_trader.types import Bi, BiColumns, Segment, Zhongshu, ZhongshuEvolution
 
 CenterRelation = Literal[
     "extension",
@@ -12,6 +16,11 @@ CenterRelation = Literal[
     "separate",
 ]
 
+ZhongshuEventKind = Literal["created", "extended", "expanded", "removed"]
+
+# Tail bis ``ZhongshuBuilder`` can rewind after rebuilding from a full list.
+_REWIND_BIS = 8
+
 
 def _build_center_from_three_segments(
     s1: Segment, s2: Segment, s3: Segment
@@ -41,33 +50,6 @@ def _build_center_from_three_segments(
     )
 
 
-def _build_center_from_three_bis(b1: Bi, b2: Bi, b3: Bi) -> Zhongshu | None:
-    """Build a zhongshu from three consecutive bis (the minimal level)."""
-    zd = max(b1.low, b2.low, b3.low)
-    zg = min(b1.high, b2.high, b3.high)
-    if zd > zg:
-        return None
-
-    highs = [b1.high, b2.high, b3.high]
-    lows = [b1.low, b2.low, b3.low]
-
-    return Zhongshu(
-        zd=zd,
-        zg=zg,
-        gg=max(highs),
-        dd=min(lows),
-        g=min(highs),
-        d=max(lows),
-        start_index=b1.start_index,
-        end_index=b3.end_index,
-        event_time=b3.event_time,
-        available_time=max(b1.available_time, b2.available_time, b3.available_time),
-        origin_available_time=max(b1.available_time, b2.available_time, b3.available_time),
-        evolution="newborn",
-        status="confirmed",
-    )
-
-
 def _overlap_center(a: Zhongshu, b: Zhongshu) -> bool:
     """Check if two centers' 中枢区间 (zd/zg) overlap."""
     return max(a.zd, b.zd) <= min(a.zg, b.zg)
@@ -173,48 +155,255 @@ def build_zhongshus(segments: list[Segment]) -> list[Zhongshu]:
     return out
 
 
-def build_zhongshus_from_bis(bis: list[Bi]) -> list[Zhongshu]:
+def build_zhongshus_from_bis(bis: list[Bi] | BiColumns) -> list[Zhongshu]:
     """Build zhongshus from bis (bi-level centers).
 
     This is the correct minimal-level center construction per kline8-18:
     "被至少三个连续次级别走势类型所重叠的部分".
     At the lowest level, bis are the elementary sub-level moves.
     """
-    out: list[Zhongshu] = []
-    if len(bis) < 3:
-        return out
+    builder = ZhongshuBuilder()
+    builder._fill(bis if isinstance(bis, BiColumns) else BiColumns.from_bis(bis))
+    return builder.zhongshus
 
-    i = 0
-    while i + 2 < len(bis):
-        candidate = _build_center_from_three_bis(bis[i], bis[i + 1], bis[i + 2])
-        if candidate is None:
-            i += 1
-            continue
 
-        # Keep extending while the next bi overlaps the current center.
+@dataclass(slots=True)
+class ZhongshuEvent:
+    """Change of the center at ``index`` of ``ZhongshuBuilder.zhongshus``."""
+
+    kind: ZhongshuEventKind
+    index: int
+    zhongshu: Zhongshu
+
+
+class ZhongshuBuilder:
+    """Incremental ``build_zhongshus_from_bis`` for a growing bi sequence.
+
+    The builder keeps the scan state (the next bi to examine and the open
+    candidate still being extended), so after every update ``zhongshus``
+    equals ``build_zhongshus_from_bis`` on the bis seen so far.  Closed
+    centers are never rebuilt: a new bi can only extend the open candidate,
+    close it, or start the next one, and only the last closed center can
+    still change through its extension relation with the open one.  Each
+    update returns the resulting ``ZhongshuEvent`` list.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    @property
+    def bis(self) -> list[Bi]:
+        return self._bis
+
+    @property
+    def zhongshus(self) -> list[Zhongshu]:
+        start = max(0, len(self._closed) - 1)
+        return self._closed[:start] + self._tail(start)
+
+    def push(self, bi: Bi) -> list[ZhongshuEvent]:
+        return self.extend((bi,))
+
+    def extend(self, bis: Sequence[Bi]) -> list[ZhongshuEvent]:
+        start = max(0, len(self._closed) - 1)
+        before = self._tail(start)
+        for bi in bis:
+            self._append(bi)
+        return self._events(start, before)
+
+    def sync(self, bis: Sequence[Bi]) -> list[ZhongshuEvent]:
+        """Bring the builder to ``bis``, rewinding past revised tail bis.
+
+        Bis are compared from the end; everything before the last unchanged
+        bi is assumed unchanged, which holds for bis of a bar series that
+        only grows.  A different first bi (e.g. a trimmed window, whose bar
+        indices all shift) or a revision reaching back into the frozen
+        centers rebuilds from scratch.
+        """
+        known = self._bis
+        keep = min(len(known), len(bis))
+        if keep and bis[0] != known[0]:
+            keep = 0
+        while keep and bis[keep - 1] != known[keep - 1]:
+            keep -= 1
+
+        if keep == len(known):
+            return self.extend(bis[keep:])
+
+        if keep < self._checkpoint_base:
+            before = self._tail(0)
+            self._reset()
+            self._fill(BiColumns.from_bis(bis), bis)
+            return self._events(0, before)
+
+        cursor, closed_count, last_closed, open_center = self._checkpoints[keep - self._checkpoint_base]
+        start = max(0, closed_count - 1)
+        before = self._tail(start)
+
+        self._truncate(keep)
+        del self._checkpoints[keep - self._checkpoint_base :]
+        del self._closed[closed_count:]
+        if last_closed is not None:
+            self._closed[-1] = copy.copy(last_closed)
+        self._open = copy.copy(open_center)
+        self._cursor = cursor
+
+        for bi in bis[keep:]:
+            self._append(bi)
+        return self._events(start, before)
+
+    def _reset(self) -> None:
+        self._bis: list[Bi] = []
+        self._high: list[float] = []
+        self._low: list[float] = []
+        self._start: list[int] = []
+        self._end: list[int] = []
+        self._event: list[datetime] = []
+        self._available: list[datetime] = []
+        self._closed: list[Zhongshu] = []
+        self._open: Zhongshu | None = None
+        self._cursor = 0
+        # State before each pushed bi from ``_checkpoint_base`` on, to rewind
+        # when a tail bi is revised.  Checkpoints that would reopen a frozen
+        # center are pruned; rewinding past them rebuilds from scratch.
+        self._checkpoints: list[tuple[int, int, Zhongshu | None, Zhongshu | None]] = []
+        self._checkpoint_base = 0
+
+    def _truncate(self, count: int) -> None:
+        for column in (self._bis, self._high, self._low, self._start, self._end, self._event, self._available):
+            del column[count:]
+
+    def _fill(self, cols: BiColumns, bis: Sequence[Bi] | None = None) -> None:
+        """Scan ``cols`` in bulk; with ``bis``, the last ``_REWIND_BIS`` are
+        pushed one by one so a revised tail can still be rewound."""
+        bulk = len(cols) if bis is None else max(0, len(cols) - _REWIND_BIS)
+        self._high.extend(cols.high[:bulk])
+        self._low.extend(cols.low[:bulk])
+        self._start.extend(cols.start_index[:bulk])
+        self._end.extend(cols.end_index[:bulk])
+        self._event.extend(cols.event_time[:bulk])
+        self._available.extend(cols.available_time[:bulk])
+        self._drain()
+        if bis is None:
+            return
+        self._bis.extend(bis[:bulk])
+        self._checkpoint_base = bulk
+        for bi in bis[bulk:]:
+            self._append(bi)
+
+    def _append(self, bi: Bi) -> None:
+        self._checkpoints.append(
+            (
+                self._cursor,
+                len(self._closed),
+                copy.copy(self._closed[-1]) if self._closed else None,
+                copy.copy(self._open),
+            )
+        )
+        self._bis.append(bi)
+        self._high.append(bi.high)
+        self._low.append(bi.low)
+        self._start.append(bi.start_index)
+        self._end.append(bi.end_index)
+        self._event.append(bi.event_time)
+        self._available.append(bi.available_time)
+        self._drain()
+        self._prune()
+
+    def _drain(self) -> None:
         # Zn 超过 9 的监视规则属于震荡监控层，不应在中枢生成层截断
         # 正在延伸的中枢。
-        j = i + 3
-        while j < len(bis):
-            bi = bis[j]
-            if bi.low <= candidate.zg and bi.high >= candidate.zd:
-                # This bi overlaps the center → extend
-                candidate.zd = max(candidate.zd, bi.low)
-                candidate.zg = min(candidate.zg, bi.high)
-                candidate.gg = max(candidate.gg, bi.high)
-                candidate.dd = min(candidate.dd, bi.low)
-                candidate.g = min(candidate.g, bi.high)
-                candidate.d = max(candidate.d, bi.low)
-                candidate.end_index = bi.end_index
-                candidate.event_time = bi.event_time
-                candidate.available_time = max(
-                    candidate.available_time, bi.available_time
-                )
-                j += 1
-            else:
+        highs = self._high
+        lows = self._low
+        available = self._available
+        count = len(highs)
+        i = self._cursor
+        center = self._open
+        while True:
+            if center is not None:
+                if i >= count:
+                    break
+                high = highs[i]
+                low = lows[i]
+                if low <= center.zg and high >= center.zd:
+                    # This bi overlaps the center → extend
+                    center.zd = max(center.zd, low)
+                    center.zg = min(center.zg, high)
+                    center.gg = max(center.gg, high)
+                    center.dd = min(center.dd, low)
+                    center.g = min(center.g, high)
+                    center.d = max(center.d, low)
+                    center.end_index = self._end[i]
+                    center.event_time = self._event[i]
+                    center.available_time = max(center.available_time, available[i])
+                    i += 1
+                    continue
+                _evolve_and_append(self._closed, center)
+                center = None
+                continue
+
+            if i + 2 >= count:
                 break
-
-        _evolve_and_append(out, candidate)
-        i = j  # skip past the consumed bis
-
-    return out
+            zd = max(lows[i], lows[i + 1], lows[i + 2])
+            zg = min(highs[i], highs[i + 1], highs[i + 2])
+            if zd > zg:
+                i += 1
+                continue
+            origin = max(available[i], available[i + 1], available[i + 2])
+            center = Zhongshu(
+                zd=zd,
+                zg=zg,
+                gg=max(highs[i], highs[i + 1], highs[i + 2]),
+                dd=min(lows[i], lows[i + 1], lows[i + 2]),
+                g=zg,
+                d=zd,
+                start_index=self._start[i],
+                end_index=self._end[i + 2],
+                event_time=self._event[i + 2],
+                available_time=origin,
+                origin_available_time=origin,
+                evolution="newborn",
+                status="confirmed",
+            )
+            i += 3
+        self._cursor = i
+        self._open = center
+
+    def _prune(self) -> None:
+        # A checkpoint taken with fewer than ``len(closed) - 1`` closed
+        # centers would reopen a frozen one.
+        frozen = len(self._closed) - 1
+        drop = 0
+        for _, closed_count, _, _ in self._checkpoints:
+            if closed_count >= frozen:
+                break
+            drop += 1
+        if drop:
+            del self._checkpoints[:drop]
+            self._checkpoint_base += drop
+
+    def _tail(self, start: int) -> list[Zhongshu]:
+        """``zhongshus[start:]`` with private copies of the mutable tail."""
+        closed = self._closed
+        if not closed:
+            tail: list[Zhongshu] = []
+        else:
+            tail = closed[start:-1] + [copy.copy(closed[-1])]
+        if self._open is not None:
+            _evolve_and_append(tail, copy.copy(self._open))
+        return tail
+
+    def _events(self, start: int, before: list[Zhongshu]) -> list[ZhongshuEvent]:
+        after = self._tail(start)
+        events: list[ZhongshuEvent] = []
+        for offset in range(max(len(before), len(after))):
+            index = start + offset
+            if offset >= len(after):
+                events.append(ZhongshuEvent("removed", index, before[offset]))
+                continue
+            center = after[offset]
+            if offset >= len(before):
+                kind: ZhongshuEventKind = "expanded" if center.evolution == "expansion" else "created"
+                events.append(ZhongshuEvent(kind, index, center))
+            elif center != before[offset]:
+                events.append(ZhongshuEvent("extended", index, center))
+        return events
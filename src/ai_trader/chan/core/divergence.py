@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 from ai_trader.chan.core.center import classify_center_relation
+from ai_trader.indicators import MACDView, as_macd_view
 from ai_trader.types import Bi, MACDPoint, TrendType, Zhongshu
 
 
@@ -27,7 +29,7 @@ class DivergenceCandidate:
 
 
 def _macd_area_directed(
-    macd: list[MACDPoint], start_time, end_time, direction: str
+    macd: MACDView, start_time, end_time, direction: str
 ) -> float:
     """Sum MACD histogram bars that match *direction*.
 
@@ -36,9 +38,7 @@ def _macd_area_directed(
     the absolute value of negative hist values.
     """
     total = 0.0
-    for pt in macd:
-        if pt.time < start_time or pt.time > end_time:
-            continue
+    for pt in macd.window(start_time, end_time):
         if direction == "up" and pt.hist > 0:
             total += pt.hist
         elif direction == "down" and pt.hist < 0:
@@ -47,7 +47,7 @@ def _macd_area_directed(
 
 
 def _zero_axis_pullback(
-    macd: list[MACDPoint], start_time, end_time, tolerance: float = 0.15
+    macd: MACDView, start_time, end_time, tolerance: float = 0.15
 ) -> bool:
     """Check that DIF (or DEA) returned close to the zero axis between
     two segments of the trend.
@@ -56,7 +56,7 @@ def _zero_axis_pullback(
     We consider the pullback satisfied if either DIF or DEA crossed zero
     or came within *tolerance* fraction of the recent peak DIF amplitude.
     """
-    points = [pt for pt in macd if start_time <= pt.time <= end_time]
+    points = macd.window(start_time, end_time)
     if not points:
         # If there are no MACD points in the gap we cannot verify – be lenient
         return True
@@ -72,9 +72,9 @@ def _zero_axis_pullback(
     # Fallback: if the minimum |DIF| in the window is small relative to
     # the peak |DIF| in the surrounding MACD, treat as pullback.
     min_abs_dif = min(abs(pt.dif) for pt in points)
-    all_before = [abs(pt.dif) for pt in macd if pt.time < start_time]
-    if all_before:
-        peak_dif = max(all_before[-50:]) if len(all_before) > 50 else max(all_before)
+    recent_before = macd.before(start_time, 50)
+    if recent_before:
+        peak_dif = max(abs(pt.dif) for pt in recent_before)
         if peak_dif > 0 and min_abs_dif / peak_dif <= tolerance:
             return True
 
@@ -294,7 +294,7 @@ def detect_divergence_candidates(
     bis: list[Bi],
     zhongshu_count: int,
     trend_type: TrendType,
-    macd: list[MACDPoint],
+    macd: Sequence[MACDPoint],
     threshold: float,
     zhongshus: list[Zhongshu] | None = None,
     include_consolidation_divergence_hint: bool = True,
@@ -315,6 +315,9 @@ def detect_divergence_candidates(
     out: list[DivergenceCandidate] = []
     if zhongshus is None:
         zhongshus = []
+    # MACD points are sorted by time, so every time window below is a
+    # bisected range of the shared view rather than a scan.
+    macd = as_macd_view(macd)
 
     for direction in ("down", "up"):
         is_trend = (
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from ai_trader.types import Bi, Segment
+from ai_trader.types import Bi, BiColumns, Segment, StructureStatus
 
 
 @dataclass(slots=True)
@@ -16,33 +16,47 @@ def _overlap(low1: float, high1: float, low2: float, high2: float) -> bool:
     return max(low1, low2) <= min(high1, high2)
 
 
-def _has_three_overlap(b1: Bi, b2: Bi, b3: Bi) -> bool:
-    low = max(b1.low, b2.low, b3.low)
-    high = min(b1.high, b2.high, b3.high)
+def _has_three_overlap(cols: BiColumns, i: int) -> bool:
+    lows = cols.low
+    highs = cols.high
+    low = max(lows[i], lows[i + 1], lows[i + 2])
+    high = min(highs[i], highs[i + 1], highs[i + 2])
     return low <= high
 
 
-def _merge_feature_bars(bars: list[FeatureBar]) -> list[FeatureBar]:
-    if len(bars) < 2:
-        return bars[:]
+class _FeatureMerger:
+    """Inclusion merge of feature bars, extended one bar at a time.
 
-    merged = [bars[0]]
-    direction = 0
+    The merge is sequential, so after every ``push`` ``std`` equals the
+    batch merge of all bars pushed so far; only its last element can still
+    change.
+    """
 
-    for cur in bars[1:]:
-        prev = merged[-1]
+    __slots__ = ("std", "direction")
+
+    def __init__(self) -> None:
+        self.std: list[FeatureBar] = []
+        self.direction = 0
+
+    def push(self, cur: FeatureBar) -> None:
+        std = self.std
+        if not std:
+            std.append(cur)
+            return
+
+        prev = std[-1]
         include = (prev.high >= cur.high and prev.low <= cur.low) or (
             prev.high <= cur.high and prev.low >= cur.low
         )
         if not include:
             if cur.high > prev.high and cur.low > prev.low:
-                direction = 1
+                self.direction = 1
             elif cur.high < prev.high and cur.low < prev.low:
-                direction = -1
-            merged.append(cur)
-            continue
+                self.direction = -1
+            std.append(cur)
+            return
 
-        use_dir = direction
+        use_dir = self.direction
         if use_dir == 0:
             if cur.high >= prev.high and cur.low >= prev.low:
                 use_dir = 1
@@ -58,162 +72,167 @@ def _merge_feature_bars(bars: list[FeatureBar]) -> list[FeatureBar]:
             high = min(prev.high, cur.high)
             low = min(prev.low, cur.low)
 
-        merged[-1] = FeatureBar(
+        std[-1] = FeatureBar(
             high=high, low=low, source_idx=prev.source_idx + cur.source_idx
         )
 
-    return merged
-
 
-def _find_feature_fractal(std: list[FeatureBar], want: str) -> int | None:
-    for i in range(1, len(std) - 1):
-        left, mid, right = std[i - 1], std[i], std[i + 1]
-        is_top = (
+def _is_feature_fractal(std: list[FeatureBar], i: int, want: str) -> bool:
+    left, mid, right = std[i - 1], std[i], std[i + 1]
+    if want == "top":
+        return (
             mid.high > left.high
             and mid.high > right.high
             and mid.low > left.low
             and mid.low > right.low
         )
-        is_bottom = (
-            mid.low < left.low
-            and mid.low < right.low
-            and mid.high < left.high
-            and mid.high < right.high
-        )
-        if want == "top" and is_top:
-            return i
-        if want == "bottom" and is_bottom:
-            return i
-    return None
+    return (
+        mid.low < left.low
+        and mid.low < right.low
+        and mid.high < left.high
+        and mid.high < right.high
+    )
 
 
-def _feature_peak_index(mid: FeatureBar, bis: list[Bi], want: str) -> int:
+def _feature_peak_index(mid: FeatureBar, cols: BiColumns, want: str) -> int:
     peak_idx = mid.source_idx[0]
     if want == "top":
-        peak_val = bis[peak_idx].high
+        highs = cols.high
+        peak_val = highs[peak_idx]
         for idx in mid.source_idx[1:]:
-            if bis[idx].high >= peak_val:
-                peak_val = bis[idx].high
+            if highs[idx] >= peak_val:
+                peak_val = highs[idx]
                 peak_idx = idx
         return peak_idx
 
-    peak_val = bis[peak_idx].low
+    lows = cols.low
+    peak_val = lows[peak_idx]
     for idx in mid.source_idx[1:]:
-        if bis[idx].low <= peak_val:
-            peak_val = bis[idx].low
+        if lows[idx] <= peak_val:
+            peak_val = lows[idx]
             peak_idx = idx
     return peak_idx
 
 
-def _reverse_confirm(bis: list[Bi], peak_idx: int, seg_dir: str) -> bool:
+def _reverse_confirm(cols: BiColumns, peak_idx: int, seg_dir: str) -> bool:
+    """Whether the bis after the peak form a reverse feature fractal."""
     reverse_seg_dir = "down" if seg_dir == "up" else "up"
     feature_dir = seg_dir
-    feature = [
-        FeatureBar(high=bi.high, low=bi.low, source_idx=[i])
-        for i, bi in enumerate(bis)
-        if i > peak_idx and bi.direction == feature_dir
-    ]
-    if len(feature) < 3:
-        return False
-
-    std = _merge_feature_bars(feature)
     want = "bottom" if reverse_seg_dir == "down" else "top"
-    return _find_feature_fractal(std, want) is not None
+    directions = cols.direction
+    merger = _FeatureMerger()
+    count = 0
+    for i in range(peak_idx + 1, len(cols)):
+        if directions[i] != feature_dir:
+            continue
+        merger.push(FeatureBar(high=cols.high[i], low=cols.low[i], source_idx=[i]))
+        count += 1
+        # std[-3] is final once a later bar exists: a fractal there is a
+        # fractal of the full merge, so stop scanning.
+        k = len(merger.std) - 3
+        if k >= 1 and _is_feature_fractal(merger.std, k, want):
+            return True
+
+    k = len(merger.std) - 2
+    return count >= 3 and k >= 1 and _is_feature_fractal(merger.std, k, want)
 
 
 def _find_segment_end(
-    bis: list[Bi],
+    cols: BiColumns,
     start_idx: int,
     require_case2_confirmation: bool,
 ) -> tuple[int | None, str | None]:
-    seg_dir = bis[start_idx].direction
+    directions = cols.direction
+    seg_dir = directions[start_idx]
     feature_dir = "down" if seg_dir == "up" else "up"
     want_fx = "top" if seg_dir == "up" else "bottom"
 
-    feature: list[FeatureBar] = []
+    # Each step looks for the first fractal of the merged feature sequence
+    # so far.  Earlier positions were already rejected with final values, so
+    # only the two windows touching the still-open tail can change.
+    merger = _FeatureMerger()
+    std = merger.std
 
-    for idx in range(start_idx, len(bis)):
-        bi = bis[idx]
-        if bi.direction != feature_dir:
+    for idx in range(start_idx, len(cols)):
+        if directions[idx] != feature_dir:
             continue
 
-        feature.append(FeatureBar(high=bi.high, low=bi.low, source_idx=[idx]))
-        if len(feature) < 3:
+        merger.push(FeatureBar(high=cols.high[idx], low=cols.low[idx], source_idx=[idx]))
+        if len(std) < 3:
             continue
 
-        std = _merge_feature_bars(feature)
-        fx_idx = _find_feature_fractal(std, want_fx)
+        fx_idx = None
+        for i in (len(std) - 3, len(std) - 2):
+            if i >= 1 and _is_feature_fractal(std, i, want_fx):
+                fx_idx = i
+                break
         if fx_idx is None:
             continue
 
         first = std[fx_idx - 1]
         second = std[fx_idx]
-        peak_idx = _feature_peak_index(second, bis, want_fx)
+        peak_idx = _feature_peak_index(second, cols, want_fx)
 
         has_gap = not _overlap(first.low, first.high, second.low, second.high)
         if not has_gap:
             return peak_idx, "case1"
 
-        if not require_case2_confirmation or _reverse_confirm(bis, peak_idx, seg_dir):
+        if not require_case2_confirmation or _reverse_confirm(cols, peak_idx, seg_dir):
             return peak_idx, "case2"
 
+        if fx_idx == len(std) - 3:
+            # A final fractal stays the first one for every longer prefix,
+            # so the unconfirmed case2 can never resolve.
+            return None, None
+
     return None, None
 
 
-def _provisional_segment(sl: list[Bi]) -> Segment:
-    tail = sl[-1]
+def _segment_from_range(
+    cols: BiColumns, first: int, last: int, status: StructureStatus
+) -> Segment:
     return Segment(
-        direction=sl[0].direction,
-        start_index=sl[0].start_index,
-        end_index=tail.end_index,
-        high=max(item.high for item in sl),
-        low=min(item.low for item in sl),
-        event_time=tail.event_time,
-        available_time=max(item.available_time for item in sl),
-        status="provisional",
+        direction=cols.direction[first],  # type: ignore[arg-type]
+        start_index=cols.start_index[first],
+        end_index=cols.end_index[last],
+        high=max(cols.high[first : last + 1]),
+        low=min(cols.low[first : last + 1]),
+        event_time=cols.event_time[last],
+        available_time=max(cols.available_time[first : last + 1]),
+        status=status,
     )
 
 
 def build_segments(
-    bis: list[Bi], require_case2_confirmation: bool = True
+    bis: list[Bi] | BiColumns, require_case2_confirmation: bool = True
 ) -> list[Segment]:
+    cols = bis if isinstance(bis, BiColumns) else BiColumns.from_bis(bis)
     segments: list[Segment] = []
-    if len(bis) < 3:
+    count = len(cols)
+    if count < 3:
         return segments
 
+    directions = cols.direction
     cursor = 0
     first_unconfirmed_start: int | None = None
     last_confirmed_end_idx: int | None = None
-    while cursor + 2 < len(bis):
-        if segments and bis[cursor].direction == segments[-1].direction:
+    while cursor + 2 < count:
+        if segments and directions[cursor] == segments[-1].direction:
             cursor += 1
             continue
 
-        if not _has_three_overlap(bis[cursor], bis[cursor + 1], bis[cursor + 2]):
+        if not _has_three_overlap(cols, cursor):
             cursor += 1
             continue
 
-        end_idx, _ = _find_segment_end(bis, cursor, require_case2_confirmation)
+        end_idx, _ = _find_segment_end(cols, cursor, require_case2_confirmation)
         if end_idx is None or end_idx <= cursor:
             if not segments and first_unconfirmed_start is None:
                 first_unconfirmed_start = cursor
             cursor += 1
             continue
 
-        sl = bis[cursor : end_idx + 1]
-        last = sl[-1]
-        segments.append(
-            Segment(
-                direction=bis[cursor].direction,
-                start_index=sl[0].start_index,
-                end_index=last.end_index,
-                high=max(item.high for item in sl),
-                low=min(item.low for item in sl),
-                event_time=last.event_time,
-                available_time=max(item.available_time for item in sl),
-                status="confirmed",
-            )
-        )
+        segments.append(_segment_from_range(cols, cursor, end_idx, "confirmed"))
         # Consecutive segments share the boundary bi; advancing past it can
         # incorrectly emit multiple same-direction segments.
         last_confirmed_end_idx = end_idx
@@ -222,12 +241,12 @@ def build_segments(
     if not segments:
         if first_unconfirmed_start is None:
             return segments
-        return [_provisional_segment(bis[first_unconfirmed_start:])]
+        return [_segment_from_range(cols, first_unconfirmed_start, count - 1, "provisional")]
 
     if (
         last_confirmed_end_idx is not None
-        and last_confirmed_end_idx + 2 < len(bis)
+        and last_confirmed_end_idx + 2 < count
     ):
-        segments.append(_provisional_segment(bis[last_confirmed_end_idx:]))
+        segments.append(_segment_from_range(cols, last_confirmed_end_idx, count - 1, "provisional"))
 
     return segments
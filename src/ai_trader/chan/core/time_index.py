@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator, Sequence
+from operator import attrgetter
+from typing import Any, Generic, TypeVar, overload
+
+T = TypeVar("T")
+
+available_time = attrgetter("available_time")
+
+
+def center_time(item) -> Any:
+    """When a zhongshu was first confirmed, before any extension."""
+    return item.origin_available_time or item.available_time
+
+
+class TimeOrdered(Sequence[T], Generic[T]):
+    """A structure list known to be ordered by availability time.
+
+    The pipeline appends bis, segments and zhongshus in the order they
+    become available, so its lists can be wrapped as they are (no copy,
+    no sort) and windowed by bisecting ``key``.  Signal derivation
+    accepts plain lists too and filters those linearly.
+    """
+
+    __slots__ = ("items", "key")
+
+    def __init__(self, items: list[T], key: Callable[[T], Any] = available_time) -> None:
+        self.items: list[T] = items.items if isinstance(items, TimeOrdered) else items
+        self.key = key
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[T]: ...
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __repr__(self) -> str:
+        return f"TimeOrdered(size={len(self.items)})"
+
+    def after(self, time, inclusive: bool = False) -> list[T]:
+        """Items with ``key > time`` (``>=`` when ``inclusive``)."""
+        find = bisect_left if inclusive else bisect_right
+        return self.items[find(self.items, time, key=self.key) :]
+
+    def between(self, after, before=None) -> list[T]:
+        """Items with ``after < key < before``; ``before=None`` is open."""
+        lo = bisect_right(self.items, after, key=self.key)
+        hi = len(self.items) if before is None else bisect_left(self.items, before, lo, key=self.key)
+        return self.items[lo:hi]
+
+    def first_time_after(self, time):
+        """Smallest ``key`` greater than ``time``, or ``None``."""
+        pos = bisect_right(self.items, time, key=self.key)
+        return self.key(self.items[pos]) if pos < len(self.items) else None
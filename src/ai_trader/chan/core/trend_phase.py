@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from operator import attrgetter
+
 from ai_trader.types import Bi, MarketState, Segment, TrendType, Zhongshu
 
 
@@ -7,37 +13,30 @@ def _segment_overlaps_center(segment: Segment, zhongshu: Zhongshu) -> bool:
     return segment.high >= zhongshu.zd and segment.low <= zhongshu.zg
 
 
-def _build_oscillation_state(
-    segments: list[Segment],
-    center: Zhongshu | None,
+_OSCILLATION_WINDOW = 9
+
+_NO_OSCILLATION: dict[str, float | int | str | bool] = {
+    "anchor_source": "none",
+    "anchor_start_index": -1,
+    "z": 0.0,
+    "latest_zn": 0.0,
+    "count": 0,
+    "total_count": 0,
+    "bias": "none",
+    "direction": "none",
+    "breakout": "none",
+    "first_breakout": False,
+    "limit_reached": False,
+}
+
+
+def _oscillation_payload(
+    center: Zhongshu,
     anchor_source: str,
+    zn_values: Sequence[float],
+    total_count: int,
 ) -> dict[str, float | int | str | bool]:
-    if center is None:
-        return {
-            "anchor_source": "none",
-            "anchor_start_index": -1,
-            "z": 0.0,
-            "latest_zn": 0.0,
-            "count": 0,
-            "total_count": 0,
-            "bias": "none",
-            "direction": "none",
-            "breakout": "none",
-            "first_breakout": False,
-            "limit_reached": False,
-        }
-
-    center_confirmed_at = center.origin_available_time or center.available_time
-    oscillation_segments = [
-        item
-        for item in segments
-        if item.status == "confirmed"
-        and item.available_time >= center_confirmed_at
-        and _segment_overlaps_center(item, center)
-    ]
-    tracked_segments = oscillation_segments[-9:]
     z_value = (center.zd + center.zg) / 2
-    zn_values = [(item.high + item.low) / 2 for item in tracked_segments]
     latest_zn = zn_values[-1] if zn_values else z_value
 
     if not zn_values:
@@ -71,7 +70,8 @@ def _build_oscillation_state(
             breakout = "inside"
 
         earlier_breakouts = any(
-            value > center.zg or value < center.zd for value in zn_values[:-1]
+            value > center.zg or value < center.zd
+            for value in islice(zn_values, len(zn_values) - 1)
         )
         first_breakout = breakout in {"above_zg", "below_zd"} and not earlier_breakouts
 
@@ -80,16 +80,108 @@ def _build_oscillation_state(
         "anchor_start_index": center.start_index,
         "z": float(z_value),
         "latest_zn": float(latest_zn),
-        "count": len(tracked_segments),
-        "total_count": len(oscillation_segments),
+        "count": len(zn_values),
+        "total_count": total_count,
         "bias": bias,
         "direction": direction,
         "breakout": breakout,
         "first_breakout": first_breakout,
-        "limit_reached": len(oscillation_segments) > 9,
+        "limit_reached": total_count > _OSCILLATION_WINDOW,
     }
 
 
+def _segment_identity(segment: Segment) -> tuple:
+    # Indices shift with the structure window; these fields do not.
+    return (segment.available_time, segment.event_time, segment.direction, segment.high, segment.low)
+
+
+class OscillationTracker:
+    """Zn window of one level's oscillation anchor, kept across bars.
+
+    ``infer_market_state`` otherwise refilters every segment on each call.
+    The tracker is keyed by the anchor center's zd/zg and confirmation time
+    and only reads the confirmed segments appended since the last update,
+    keeping the latest nine Zn values in a deque.  It relies on the
+    pipeline's segment lists being in availability order: the anchor's
+    first segment is found by bisection, and if the first or last segment
+    already consumed is no longer where it was (the structure window
+    moved past it, or the segmentation changed) the tracker rescans from
+    the anchor.  One tracker serves one level of one symbol.
+    """
+
+    __slots__ = ("zn_values", "total_count", "_anchor", "_head", "_tail", "_consumed")
+
+    def __init__(self) -> None:
+        self._reset(None)
+
+    def _reset(self, anchor: tuple | None) -> None:
+        self.zn_values: deque[float] = deque(maxlen=_OSCILLATION_WINDOW)
+        self.total_count = 0
+        self._anchor = anchor
+        self._head: tuple | None = None
+        self._tail: tuple | None = None
+        self._consumed = 0
+
+    def _matches(self, segments: list[Segment], start: int) -> bool:
+        if self._consumed == 0:
+            return True
+        end = start + self._consumed
+        return (
+            end <= len(segments)
+            and _segment_identity(segments[start]) == self._head
+            and _segment_identity(segments[end - 1]) == self._tail
+        )
+
+    def update(self, segments: list[Segment], center: Zhongshu) -> None:
+        confirmed_at = center.origin_available_time or center.available_time
+        anchor = (confirmed_at, center.zd, center.zg)
+        start = bisect_left(segments, confirmed_at, key=attrgetter("available_time"))
+        if anchor != self._anchor or not self._matches(segments, start):
+            self._reset(anchor)
+
+        pos = start + self._consumed
+        # Only the last segment can still be unconfirmed; it is read again
+        # once it confirms.
+        while pos < len(segments) and segments[pos].status == "confirmed":
+            segment = segments[pos]
+            if _segment_overlaps_center(segment, center):
+                self.zn_values.append((segment.high + segment.low) / 2)
+                self.total_count += 1
+            if self._consumed == 0:
+                self._head = _segment_identity(segment)
+            self._tail = _segment_identity(segment)
+            self._consumed += 1
+            pos += 1
+
+    def state(self, center: Zhongshu, anchor_source: str) -> dict[str, float | int | str | bool]:
+        return _oscillation_payload(center, anchor_source, self.zn_values, self.total_count)
+
+
+def _build_oscillation_state(
+    segments: list[Segment],
+    center: Zhongshu | None,
+    anchor_source: str,
+    tracker: OscillationTracker | None = None,
+) -> dict[str, float | int | str | bool]:
+    if center is None:
+        return dict(_NO_OSCILLATION)
+
+    if tracker is not None:
+        tracker.update(segments, center)
+        return tracker.state(center, anchor_source)
+
+    center_confirmed_at = center.origin_available_time or center.available_time
+    oscillation_segments = [
+        item
+        for item in segments
+        if item.status == "confirmed"
+        and item.available_time >= center_confirmed_at
+        and _segment_overlaps_center(item, center)
+    ]
+    zn_values = [(item.high + item.low) / 2 for item in oscillation_segments[-_OSCILLATION_WINDOW:]]
+    return _oscillation_payload(center, anchor_source, zn_values, len(oscillation_segments))
+
+
 def find_latest_trend_center_pair(
     zhongshus: list[Zhongshu],
 ) -> tuple[TrendType, int, int] | None:
@@ -118,7 +210,13 @@ def infer_market_state(
     bis: list[Bi],
     segments: list[Segment],
     zhongshus: list[Zhongshu],
+    oscillation_tracker: OscillationTracker | None = None,
 ) -> MarketState:
+    """Trend, walk type and phase of one level, plus its oscillation state.
+
+    ``oscillation_tracker`` carries the Zn window over from earlier calls
+    on the same level instead of rebuilding it from all segments.
+    """
     trend_pair = find_latest_trend_center_pair(zhongshus)
     trend_type = trend_pair[0] if trend_pair is not None else "range"
     walk_type = "consolidation"
@@ -164,6 +262,7 @@ def infer_market_state(
         segments=segments,
         center=oscillation_anchor,
         anchor_source=oscillation_anchor_source,
+        tracker=oscillation_tracker,
     )
 
     last_zs_payload = {
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+
+
+class SignalEventStore:
+    """Seen signal-event keys with optional eviction for long-running processes.
+
+    Takes the place of the plain ``set`` ``suppress_seen_signal_events``
+    accepts and, with the default arguments, behaves exactly like one.
+    Every add and every hit stamps the key with the signal's available time.
+
+    - ``keep_centers``: keys anchored to a center (B3/S3 keys, which carry
+      no time) are grouped by that center's available time per level; once
+      ``keep_centers`` newer centers have been seen at the level, the keys
+      of the superseded center are dropped.
+    - ``max_age``: keys carrying their event time are dropped once their
+      last stamp is more than ``max_age`` before the newest stamp.
+
+    An evicted key that comes back is emitted again where a set would
+    have suppressed it, so ``run_backtest`` keeps the defaults and only
+    processes that run indefinitely bound the store.
+    """
+
+    __slots__ = ("max_age", "keep_centers", "_stamps", "_expiry", "_seq", "_newest", "_centers", "_center_of")
+
+    def __init__(self, max_age: timedelta | None = None, keep_centers: int | None = None) -> None:
+        if keep_centers is not None and keep_centers < 1:
+            raise ValueError("keep_centers must be >= 1")
+        self.max_age = max_age
+        self.keep_centers = keep_centers
+        self._stamps: dict[tuple, datetime | None] = {}
+        # (stamp, seq, key) of time-keyed keys; entries whose key has been
+        # stamped again since are skipped when popped.
+        self._expiry: list[tuple[datetime, int, tuple]] = []
+        self._seq = 0
+        self._newest: datetime | None = None
+        # level -> center available time -> keys anchored to that center
+        self._centers: dict[str, dict[datetime, set[tuple]]] = {}
+        self._center_of: dict[tuple, tuple[str, datetime]] = {}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._stamps
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self._stamps)
+
+    def add(self, key: tuple, time: datetime | None = None, center: tuple[str, datetime] | None = None) -> None:
+        """Record or refresh ``key`` seen at ``time``.
+
+        ``center`` is ``(level, center available time)`` for keys anchored
+        to a center; other keys with a ``time`` age out under ``max_age``.
+        """
+        if time is not None and (self._newest is None or time > self._newest):
+            self._newest = time
+        self._stamps[key] = time if time is not None else self._stamps.get(key)
+        if center is not None:
+            self._anchor(key, center)
+        elif time is not None and self.max_age is not None and key not in self._center_of:
+            self._seq += 1
+            heappush(self._expiry, (time, self._seq, key))
+        self._evict_aged()
+
+    def _anchor(self, key: tuple, center: tuple[str, datetime]) -> None:
+        previous = self._center_of.get(key)
+        if previous == center:
+            return
+        if previous is not None:
+            self._release(key, previous)
+        level, center_time = center
+        buckets = self._centers.setdefault(level, {})
+        buckets.setdefault(center_time, set()).add(key)
+        self._center_of[key] = center
+        if self.keep_centers is None or len(buckets) <= self.keep_centers:
+            return
+        for superseded in sorted(buckets)[: len(buckets) - self.keep_centers]:
+            for stale in buckets.pop(superseded):
+                del self._stamps[stale]
+                del self._center_of[stale]
+
+    def _release(self, key: tuple, center: tuple[str, datetime]) -> None:
+        level, center_time = center
+        buckets = self._centers[level]
+        bucket = buckets[center_time]
+        bucket.discard(key)
+        if not bucket:
+            del buckets[center_time]
+
+    def _evict_aged(self) -> None:
+        if self.max_age is None or self._newest is None:
+            return
+        cutoff = self._newest - self.max_age
+        while self._expiry and self._expiry[0][0] < cutoff:
+            stamp, _, key = heappop(self._expiry)
+            if key not in self._center_of and key in self._stamps and self._stamps[key] == stamp:
+                del self._stamps[key]
+
+
+class TurningGuardBook(dict):
+    """Turning-signal guards indexed by invalid price.
+
+    The ``dict`` of guard states ``suppress_seen_signal_events`` accepts,
+    plus a max-heap of buy and a min-heap of sell invalid prices, so
+    ``expire`` pops only the guards a bar crossed instead of scanning all
+    of them.  Heap entries are checked against the guard's current price
+    when popped; entries left behind by price updates are skipped.
+    """
+
+    __slots__ = ("_buys", "_sells", "_seq")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buys: list[tuple[float, int, tuple]] = []
+        self._sells: list[tuple[float, int, tuple]] = []
+        self._seq = 0
+
+    def track(self, key: tuple) -> None:
+        """Index ``key``'s current invalid price; call after setting it."""
+        state = self.get(key)
+        price = state.get("invalid_price") if state is not None else None
+        if price is None:
+            return
+        self._seq += 1
+        if key[0] == "buy":
+            heappush(self._buys, (-float(price), self._seq, key))
+        else:
+            heappush(self._sells, (float(price), self._seq, key))
+
+    def expire(self, asof_low: float | None, asof_high: float | None) -> None:
+        """Drop buy guards at or above ``asof_low`` and sell guards at or below ``asof_high``."""
+        if asof_low is not None:
+            while self._buys and -self._buys[0][0] >= asof_low:
+                price, _, key = heappop(self._buys)
+                self._drop_if_current(key, -price)
+        if asof_high is not None:
+            while self._sells and self._sells[0][0] <= asof_high:
+                price, _, key = heappop(self._sells)
+                self._drop_if_current(key, price)
+
+    def _drop_if_current(self, key: tuple, price: float) -> None:
+        state = self.get(key)
+        if state is not None and state.get("invalid_price") is not None and float(state["invalid_price"]) == price:
+            del self[key]
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, MutableMapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from ai_trader.types import Bar, Bi, ChanSnapshot, Fractal, Segment, Zhongshu, iso_utc
+
+StructureItem = Fractal | Bi | Segment | Zhongshu
+
+# (snapshot list field, level) in output order.
+DELTA_FIELDS: tuple[tuple[str, str], ...] = (
+    ("fractals_main", "main"),
+    ("bis_main", "main"),
+    ("segments_main", "main"),
+    ("zhongshus_main", "main"),
+    ("fractals_sub", "sub"),
+    ("bis_sub", "sub"),
+    ("segments_sub", "sub"),
+    ("zhongshus_sub", "sub"),
+)
+
+# Item indices are positions in the merged-bar window and shift
+# whenever the window is trimmed, so keys and states use bar times instead.
+_Key = tuple
+_State = tuple
+
+
+def _bar_time(bars: list[Bar], index: int, offset: int) -> datetime:
+    # A negative position would silently wrap to the window's far end.
+    position = index - offset
+    if not 0 <= position < len(bars):
+        raise ValueError(f"bar index {index} outside the snapshot window [{offset}, {offset + len(bars)})")
+    return bars[position].time
+
+
+def _fractal_entry(item: Fractal, bars: list[Bar], offset: int) -> tuple[_Key, _State]:
+    key = (item.kind, item.event_time)
+    return key, (item.price, item.available_time, item.status)
+
+
+def _bi_entry(item: Bi, bars: list[Bar], offset: int) -> tuple[_Key, _State]:
+    key = (item.direction, _bar_time(bars, item.start_index, offset))
+    state = (item.start_price, item.end_price, item.event_time, item.available_time, item.status)
+    return key, state
+
+
+def _segment_entry(item: Segment, bars: list[Bar], offset: int) -> tuple[_Key, _State]:
+    key = (item.direction, _bar_time(bars, item.start_index, offset))
+    state = (item.high, item.low, item.event_time, item.available_time, item.status)
+    return key, state
+
+
+def _zhongshu_entry(item: Zhongshu, bars: list[Bar], offset: int) -> tuple[_Key, _State]:
+    key = ("center", _bar_time(bars, item.start_index, offset))
+    state = (
+        item.zd,
+        item.zg,
+        item.gg,
+        item.dd,
+        item.g,
+        item.d,
+        _bar_time(bars, item.end_index, offset),
+        item.event_time,
+        item.available_time,
+        item.origin_available_time,
+        item.evolution,
+        item.status,
+    )
+    return key, state
+
+
+_ENTRY: dict[str, Callable[[Any, list[Bar], int], tuple[_Key, _State]]] = {
+    "fractals": _fractal_entry,
+    "bis": _bi_entry,
+    "segments": _segment_entry,
+    "zhongshus": _zhongshu_entry,
+}
+
+
+def structure_id(key: _Key) -> str:
+    """Stable id of a structure item: ``<kind or direction>@<start time>``."""
+    return f"{key[0]}@{iso_utc(key[1])}"
+
+
+def structure_item_dict(item: StructureItem, bars: list[Bar], offset: int = 0) -> dict[str, Any]:
+    """Window-independent dict of ``item``: bar indices become bar times.
+
+    ``offset`` is the index of ``bars[0]`` in the series the item indexes
+    (``ChanSnapshot.bar_offset_*``); an item reaching outside ``bars``
+    raises ``ValueError``.
+    """
+    if isinstance(item, Fractal):
+        return {
+            "kind": item.kind,
+            "price": item.price,
+            "event_time": iso_utc(item.event_time),
+            "available_time": iso_utc(item.available_time),
+            "status": item.status,
+        }
+    row: dict[str, Any] = {
+        "start_time": iso_utc(_bar_time(bars, item.start_index, offset)),
+        "end_time": iso_utc(_bar_time(bars, item.end_index, offset)),
+    }
+    if isinstance(item, Bi):
+        row.update(direction=item.direction, start_price=item.start_price, end_price=item.end_price)
+    elif isinstance(item, Segment):
+        row.update(direction=item.direction, high=item.high, low=item.low)
+    else:
+        row.update(
+            zd=item.zd,
+            zg=item.zg,
+            gg=item.gg,
+            dd=item.dd,
+            g=item.g,
+            d=item.d,
+            evolution=item.evolution,
+            origin_available_time=iso_utc(item.origin_available_time),
+        )
+    row.update(
+        event_time=iso_utc(item.event_time),
+        available_time=iso_utc(item.available_time),
+        status=item.status,
+    )
+    return row
+
+
+@dataclass(slots=True)
+class StructureDelta:
+    """Changes of one structure list; ``added``/``modified`` map id to item dict."""
+
+    added: dict[str, dict[str, Any]] = field(default_factory=dict)
+    modified: dict[str, dict[str, Any]] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"added": self.added, "modified": self.modified, "removed": self.removed}
+
+
+@dataclass(slots=True)
+class SnapshotDelta:
+    """Structural changes between two consecutive snapshots.
+
+    ``changes`` only holds the structure lists that changed, keyed by the
+    ``ChanSnapshot`` field name (``bis_main``, ``zhongshus_sub``, ...).
+    """
+
+    asof_time: datetime
+    previous_asof_time: datetime | None
+    changes: dict[str, StructureDelta] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "asof_time": iso_utc(self.asof_time),
+            "previous_asof_time": iso_utc(self.previous_asof_time) if self.previous_asof_time else None,
+            "changes": {name: delta.to_dict() for name, delta in self.changes.items()},
+        }
+
+
+class SnapshotDiffer:
+    """Turn a stream of snapshots into ``SnapshotDelta`` records.
+
+    This is a post-hoc differ: it compares finished snapshots rather than
+    listening to the structure builders.  It keeps the keyed state of the
+    previous snapshot, so each call costs one pass over the current lists
+    with tuple compares and only the changed items are converted to dicts.  Lists that are the very same
+    object as last time (a ``LevelCascade`` reuses a level's structure until
+    that level gets a new bar) are skipped outright.  The first delta lists
+    every item as added.
+    """
+
+    def __init__(self) -> None:
+        self._asof_time: datetime | None = None
+        self._lists: dict[str, list] = {}
+        self._states: dict[str, dict[_Key, _State]] = {}
+
+    def reset(self) -> None:
+        self._asof_time = None
+        self._lists.clear()
+        self._states.clear()
+
+    def diff(self, snapshot: ChanSnapshot) -> SnapshotDelta:
+        delta = SnapshotDelta(asof_time=snapshot.asof_time, previous_asof_time=self._asof_time)
+        for name, level in DELTA_FIELDS:
+            items = getattr(snapshot, name)
+            if self._lists.get(name) is items:
+                continue
+            bars = getattr(snapshot, f"bars_{level}")
+            offset = getattr(snapshot, f"bar_offset_{level}")
+            entry = _ENTRY[name.partition("_")[0]]
+            previous = self._states.get(name, {})
+            states: dict[_Key, _State] = {}
+            changes = StructureDelta()
+            for item in items:
+                key, state = entry(item, bars, offset)
+                states[key] = state
+                old = previous.get(key)
+                if old is None:
+                    changes.added[structure_id(key)] = structure_item_dict(item, bars, offset)
+                elif old != state:
+                    changes.modified[structure_id(key)] = structure_item_dict(item, bars, offset)
+            if len(states) - len(changes.added) != len(previous):
+                changes.removed = [structure_id(key) for key in previous if key not in states]
+            self._lists[name] = items
+            self._states[name] = states
+            if changes:
+                delta.changes[name] = changes
+        self._asof_time = snapshot.asof_time
+        return delta
+
+
+def snapshot_structure_index(snapshot: ChanSnapshot) -> dict[str, dict[str, dict[str, Any]]]:
+    """Full structure state of ``snapshot`` in the id-keyed form deltas use."""
+    index: dict[str, dict[str, dict[str, Any]]] = {}
+    for name, level in DELTA_FIELDS:
+        bars = getattr(snapshot, f"bars_{level}")
+        offset = getattr(snapshot, f"bar_offset_{level}")
+        entry = _ENTRY[name.partition("_")[0]]
+        index[name] = {
+            structure_id(entry(item, bars, offset)[0]): structure_item_dict(item, bars, offset)
+            for item in getattr(snapshot, name)
+        }
+    return index
+
+
+def apply_snapshot_delta(
+    index: MutableMapping[str, dict[str, dict[str, Any]]],
+    delta: SnapshotDelta | Mapping[str, Any],
+) -> None:
+    """Apply a delta (object or ``to_dict`` form) to an id-keyed structure index."""
+    changes = delta.to_dict()["changes"] if isinstance(delta, SnapshotDelta) else delta["changes"]
+    for name, change in changes.items():
+        items = index.setdefault(name, {})
+        for item_id in change["removed"]:
+            items.pop(item_id, None)
+        items.update(change["modified"])
+        items.update(change["added"])
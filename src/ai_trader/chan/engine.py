@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import replace
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from datetime import datetime
+from operator import attrgetter
 
 from collections.abc import Sequence
+from typing import Any, Literal
 
 from ai_trader.chan.config import ChanConfig, get_chan_config
 from ai_trader.chan.core.buy_sell_points import (
@@ -10,23 +14,27 @@ from ai_trader.chan.core.buy_sell_points import (
     decide_action,
     generate_signals,
 )
-from ai_trader.chan.core.center import build_zhongshus_from_bis
-from ai_trader.chan.core.divergence import detect_divergence_candidates
+from ai_trader.chan.core.center import ZhongshuBuilder, build_zhongshus_from_bis
+from ai_trader.chan.core.divergence import DivergenceCandidate, detect_divergence_candidates
 from ai_trader.chan.core.fractal import detect_fractals
 from ai_trader.chan.core.include import merge_inclusions
 from ai_trader.chan.core.segment import build_segments
 from ai_trader.chan.core.stroke import build_bis
-from ai_trader.chan.core.trend_phase import infer_market_state
-from ai_trader.indicators import compute_macd
+from ai_trader.chan.core.trend_phase import OscillationTracker, infer_market_state
+from ai_trader.chan.dedup import SignalEventStore, TurningGuardBook
+from ai_trader.indicators import MACDView, as_macd_view, compute_macd
+from ai_trader.range_index import BarRangeIndex
 from ai_trader.types import (
     Action,
     Bar,
     ChanSnapshot,
     DataQuality,
+    LevelStructure,
     MACDPoint,
     MarketState,
     Signal,
     SignalDecision,
+    Zhongshu,
     parse_utc_time,
 )
 
@@ -38,7 +46,13 @@ def _bars_until(bars: list[Bar], asof_time) -> list[Bar]:
 
 def _normalize_macd(
     macd_values: Sequence[float] | Sequence[MACDPoint] | None, bars: list[Bar]
-) -> list[MACDPoint]:
+) -> Sequence[MACDPoint]:
+    """MACD points of ``bars`` up to the last bar's time.
+
+    A ``MACDView`` is narrowed in place of copying, so callers that hold a
+    precomputed full-history array should pass ``MACDView(points)``.  Plain
+    lists are copied: ``LevelCascade`` keeps appending to its own.
+    """
     if macd_values is None:
         return compute_macd(bars)
     if not macd_values:
@@ -46,11 +60,10 @@ def _normalize_macd(
 
     first = macd_values[0]
     if isinstance(first, MACDPoint):
-        return (
-            [item for item in macd_values if item.time <= bars[-1].time]
-            if bars
-            else list(macd_values)
-        )
+        if not bars:
+            return macd_values if isinstance(macd_values, MACDView) else list(macd_values)
+        view = as_macd_view(macd_values).asof(bars[-1].time)
+        return view if isinstance(macd_values, MACDView) else list(view)
 
     hist = [float(v) for v in macd_values]
     size = min(len(hist), len(bars))
@@ -107,6 +120,7 @@ def build_chan_state(
     timeframe_main: str = "4h",
     timeframe_sub: str = "1h",
     chan_config: ChanConfig | None = None,
+    oscillation_trackers: dict[str, OscillationTracker] | None = None,
 ) -> ChanSnapshot:
     cfg = chan_config or get_chan_config("orthodox_chan")
     asof = parse_utc_time(asof_time)
@@ -129,59 +143,198 @@ def build_chan_state(
             ),
         )
 
-    merged_main = merge_inclusions(raw_main)
-    merged_sub = merge_inclusions(raw_sub)
-
-    fractals_main = detect_fractals(merged_main, allow_equal=cfg.allow_equal_fractal)
-    fractals_sub = detect_fractals(merged_sub, allow_equal=cfg.allow_equal_fractal)
+    main = build_level_structure(timeframe_main, raw_main, macd_main, cfg)
+    sub = build_level_structure(timeframe_sub, raw_sub, macd_sub, cfg)
+    snapshot = snapshot_from_levels(
+        main,
+        sub,
+        asof,
+        exchange=exchange,
+        symbol=symbol,
+        oscillation_trackers=oscillation_trackers,
+    )
+    return apply_snapshot_mode(snapshot, cfg)
 
-    bis_main = build_bis(fractals_main, merged_main, min_bars=cfg.min_stroke_bars)
-    bis_sub = build_bis(fractals_sub, merged_sub, min_bars=cfg.min_stroke_bars)
 
-    segments_main = build_segments(
-        bis_main, require_case2_confirmation=cfg.require_case2_confirmation
-    )
-    segments_sub = build_segments(
-        bis_sub, require_case2_confirmation=cfg.require_case2_confirmation
+def build_level_structure(
+    timeframe: str,
+    raw_bars: list[Bar],
+    macd: Sequence[float] | Sequence[MACDPoint] | None,
+    cfg: ChanConfig,
+    zhongshu_builder: ZhongshuBuilder | None = None,
+) -> LevelStructure:
+    """Run the structure pipeline for one timeframe's closed bars.
+
+    ``zhongshu_builder`` carries the centers over from the previous call,
+    so only a revised or new tail of the bis is rescanned.
+    """
+    merged = merge_inclusions(raw_bars)
+    fractals = detect_fractals(merged, allow_equal=cfg.allow_equal_fractal)
+    bis = build_bis(fractals, merged, min_bars=cfg.min_stroke_bars)
+    segments = build_segments(bis, require_case2_confirmation=cfg.require_case2_confirmation)
+    if zhongshu_builder is None:
+        zhongshus = build_zhongshus_from_bis(bis)
+    else:
+        zhongshu_builder.sync(bis)
+        zhongshus = zhongshu_builder.zhongshus
+    return LevelStructure(
+        timeframe=timeframe,
+        raw_bar_count=len(raw_bars),
+        bars=merged,
+        macd=_normalize_macd(macd, raw_bars),
+        fractals=fractals,
+        bis=bis,
+        segments=segments,
+        zhongshus=zhongshus,
+        previous_bar_time=raw_bars[-2].time if len(raw_bars) >= 2 else None,
     )
 
-    zhongshus_main = build_zhongshus_from_bis(bis_main)
-    zhongshus_sub = build_zhongshus_from_bis(bis_sub)
 
-    normalized_macd_main = _normalize_macd(macd_main, raw_main)
-    normalized_macd_sub = _normalize_macd(macd_sub, raw_sub)
+def snapshot_from_levels(
+    main: LevelStructure,
+    sub: LevelStructure,
+    asof_time,
+    exchange: str = "binance",
+    symbol: str = "BTC/USDT",
+    oscillation_trackers: dict[str, OscillationTracker] | None = None,
+) -> ChanSnapshot:
+    """Pair two level structures into a snapshot.
 
-    last_close = merged_main[-1].close if merged_main else 0.0
+    ``oscillation_trackers`` ("main"/"sub") are kept on the snapshot and
+    carry each level's oscillation window over from the previous bar.
+    """
+    trackers = oscillation_trackers if oscillation_trackers is not None else {}
+    last_close = main.bars[-1].close if main.bars else 0.0
     market_state = infer_market_state(
-        last_close, bis_main, segments_main, zhongshus_main
+        last_close,
+        main.bis,
+        main.segments,
+        main.zhongshus,
+        oscillation_tracker=trackers.get("main"),
     )
 
     return ChanSnapshot(
         exchange=exchange,
         symbol=symbol,
-        timeframe_main=timeframe_main,
-        timeframe_sub=timeframe_sub,
-        asof_time=asof,
-        bars_main=merged_main,
-        bars_sub=merged_sub,
-        macd_main=normalized_macd_main,
-        macd_sub=normalized_macd_sub,
-        fractals_main=fractals_main,
-        fractals_sub=fractals_sub,
-        bis_main=bis_main,
-        bis_sub=bis_sub,
-        segments_main=segments_main,
-        segments_sub=segments_sub,
-        previous_main_bar_time=raw_main[-2].time if len(raw_main) >= 2 else None,
-        zhongshus_main=zhongshus_main,
-        zhongshus_sub=zhongshus_sub,
-        last_zhongshu_main=zhongshus_main[-1] if zhongshus_main else None,
+        timeframe_main=main.timeframe,
+        timeframe_sub=sub.timeframe,
+        asof_time=parse_utc_time(asof_time),
+        bars_main=main.bars,
+        bars_sub=sub.bars,
+        macd_main=main.macd,
+        macd_sub=sub.macd,
+        fractals_main=main.fractals,
+        fractals_sub=sub.fractals,
+        bis_main=main.bis,
+        bis_sub=sub.bis,
+        segments_main=main.segments,
+        segments_sub=sub.segments,
+        previous_main_bar_time=main.previous_bar_time,
+        zhongshus_main=main.zhongshus,
+        zhongshus_sub=sub.zhongshus,
+        last_zhongshu_main=main.zhongshus[-1] if main.zhongshus else None,
         trend_type_main=market_state.trend_type,
         market_state_main=market_state,
         data_quality=DataQuality(status="ok", notes=""),
+        oscillation_trackers=trackers,
+        time_ordered=True,
     )
 
 
+_COUNTED_FIELDS = (
+    "bars_main",
+    "bars_sub",
+    "fractals_main",
+    "fractals_sub",
+    "bis_main",
+    "bis_sub",
+    "segments_main",
+    "segments_sub",
+    "zhongshus_main",
+    "zhongshus_sub",
+)
+
+# ``_zero_axis_pullback`` compares against the 50 MACD points before a leg.
+_MACD_CONTEXT_POINTS = 50
+
+
+def structure_summary(snapshot: ChanSnapshot) -> dict[str, Any]:
+    """Compact per-bar view of a snapshot, small enough to memoize per bar."""
+    counts = snapshot.structure_counts
+    summary: dict[str, Any] = {
+        "asof_time": snapshot.asof_time,
+        "previous_main_bar_time": snapshot.previous_main_bar_time,
+    }
+    for name in _COUNTED_FIELDS:
+        summary[name] = counts.get(name, len(getattr(snapshot, name)))
+    return summary
+
+
+def _tail_start(bis, segments, zhongshus, depth: int) -> int:
+    """First merged-bar index a summary snapshot keeps for one level.
+
+    The tail starts at the ``depth``-th last zhongshu, bi or segment,
+    whichever is earliest; a level with fewer of any of them is kept whole.
+    """
+    if depth <= 0 or min(len(bis), len(segments), len(zhongshus)) < depth:
+        return 0
+    return min(bis[-depth].start_index, segments[-depth].start_index, zhongshus[-depth].start_index)
+
+
+def _tail_from(items: list, start: int, key: str) -> list:
+    return items[bisect_left(items, start, key=attrgetter(key)) :]
+
+
+def summarize_snapshot(snapshot: ChanSnapshot, depth: int) -> ChanSnapshot:
+    """Copy of ``snapshot`` holding only the structure tail signal rules read.
+
+    Per level, fractals, bis, segments and zhongshus starting before the
+    ``_tail_start`` index are dropped, along with the merged bars before
+    it and MACD points older than the rules' look-back.  Sub bars after the
+    previous main bar are always kept for the invalidation check.  Indices
+    are not renumbered: ``bar_offset_*`` records where the kept bars start
+    and ``structure_counts`` the full list lengths.
+    """
+    if snapshot.structure_counts:
+        return snapshot
+
+    counts = {name: len(getattr(snapshot, name)) for name in _COUNTED_FIELDS}
+    fields: dict[str, Any] = {"structure_counts": counts, "level_analyses": {}}
+    for level in ("main", "sub"):
+        bars = getattr(snapshot, f"bars_{level}")
+        macd = getattr(snapshot, f"macd_{level}")
+        start = _tail_start(
+            getattr(snapshot, f"bis_{level}"),
+            getattr(snapshot, f"segments_{level}"),
+            getattr(snapshot, f"zhongshus_{level}"),
+            depth,
+        )
+        bar_start = start
+        if level == "sub" and start > 0:
+            previous = snapshot.previous_main_bar_time
+            keep_from = 0 if previous is None else bisect_right(bars, previous, key=attrgetter("time"))
+            bar_start = min(start, keep_from)
+        if bar_start <= 0:
+            continue
+
+        cut_time = bars[bar_start - 1].time
+        macd_start = max(0, bisect_right(macd, cut_time, key=attrgetter("time")) - _MACD_CONTEXT_POINTS)
+        fields[f"bar_offset_{level}"] = bar_start
+        fields[f"bars_{level}"] = bars[bar_start:]
+        fields[f"macd_{level}"] = macd[macd_start:]
+        fields[f"fractals_{level}"] = _tail_from(getattr(snapshot, f"fractals_{level}"), start, "index")
+        for name in ("bis", "segments", "zhongshus"):
+            fields[f"{name}_{level}"] = _tail_from(getattr(snapshot, f"{name}_{level}"), start, "start_index")
+    return replace(snapshot, **fields)
+
+
+def apply_snapshot_mode(snapshot: ChanSnapshot, cfg: ChanConfig) -> ChanSnapshot:
+    """Reduce ``snapshot`` per ``cfg.snapshot_mode``; full snapshots pass through."""
+    if cfg.snapshot_mode != "summary" or snapshot.data_quality.status != "ok":
+        return snapshot
+    return summarize_snapshot(snapshot, cfg.snapshot_tail_depth)
+
+
 def _conflict_level(snapshot: ChanSnapshot) -> tuple[str, str]:
     if not snapshot.bis_sub:
         return "none", "次级别笔不足，按主级别执行"
@@ -215,6 +368,14 @@ def _signal_event_key(signal: Signal) -> tuple:
     )
 
 
+def _signal_event_center(signal: Signal) -> tuple[str, datetime] | None:
+    # Center identity of keys without a time: ``(level, center available time)``.
+    if signal.type in {"B3", "S3"} and signal.anchor_center_start_index is not None:
+        if signal.anchor_center_available_time is not None:
+            return signal.level, signal.anchor_center_available_time
+    return None
+
+
 def _turning_signal_guard_key(signal: Signal) -> tuple | None:
     if signal.type not in {"B1", "B2", "S1", "S2"}:
         return None
@@ -229,6 +390,10 @@ def _expire_turning_signal_guards(
     asof_low: float | None,
     asof_high: float | None,
 ) -> None:
+    if isinstance(active_turning_guards, TurningGuardBook):
+        active_turning_guards.expire(asof_low, asof_high)
+        return
+
     expired: list[tuple] = []
     for key, state in active_turning_guards.items():
         invalid_price = state.get("invalid_price")
@@ -285,17 +450,25 @@ def _remember_turning_signal(
     emitted_types.add(signal.type)
     if signal.invalid_price is not None:
         state["invalid_price"] = signal.invalid_price
+    if isinstance(active_turning_guards, TurningGuardBook):
+        active_turning_guards.track(key)
 
 
 def suppress_seen_signal_events(
     decision: SignalDecision,
-    seen_signal_keys: set[tuple],
+    seen_signal_keys: set[tuple] | SignalEventStore,
     chan_config: ChanConfig,
     min_confidence: float,
     active_turning_guards: dict[tuple, dict[str, object]] | None = None,
     asof_low: float | None = None,
     asof_high: float | None = None,
 ) -> SignalDecision:
+    """Drop signal events already emitted and turning signals still guarded.
+
+    Long-running callers should pass a ``SignalEventStore`` and a
+    ``TurningGuardBook``, which stay bounded and expire guards by price
+    index; a plain ``set`` and ``dict`` still work.
+    """
     if active_turning_guards is not None:
         _expire_turning_signal_guards(active_turning_guards, asof_low, asof_high)
 
@@ -303,7 +476,7 @@ def suppress_seen_signal_events(
         return decision
 
     kept = []
-    new_keys = []
+    new_keys: list[tuple[tuple, Signal]] = []
     turning_to_remember = []
     for item in decision.signals:
         if active_turning_guards is not None and not _keep_turning_signal(
@@ -312,14 +485,19 @@ def suppress_seen_signal_events(
             continue
         key = _signal_event_key(item)
         if key in seen_signal_keys:
+            if isinstance(seen_signal_keys, SignalEventStore):
+                seen_signal_keys.add(key, item.available_time, _signal_event_center(item))
             continue
         kept.append(item)
-        new_keys.append(key)
+        new_keys.append((key, item))
         if active_turning_guards is not None and _turning_signal_guard_key(item) is not None:
             turning_to_remember.append(item)
 
-    for key in new_keys:
-        seen_signal_keys.add(key)
+    for key, item in new_keys:
+        if isinstance(seen_signal_keys, SignalEventStore):
+            seen_signal_keys.add(key, item.available_time, _signal_event_center(item))
+        else:
+            seen_signal_keys.add(key)
     if active_turning_guards is not None:
         for item in turning_to_remember:
             _remember_turning_signal(item, active_turning_guards)
@@ -354,20 +532,19 @@ def _fresh_signals(snapshot: ChanSnapshot, signals):
 
 def _invalidated_after_available(
     signal: Signal,
-    bars: list[Bar],
+    index: BarRangeIndex,
     asof_time,
 ) -> bool:
     if signal.invalid_price is None:
         return False
 
-    for bar in bars:
-        if bar.time <= signal.available_time or bar.time > asof_time:
-            continue
-        if signal.type.startswith("B") and bar.low <= signal.invalid_price:
-            return True
-        if signal.type.startswith("S") and bar.high >= signal.invalid_price:
-            return True
-
+    lo, hi = index.span(signal.available_time, asof_time)
+    if signal.type.startswith("B"):
+        low = index.min_low(lo, hi)
+        return low is not None and low <= signal.invalid_price
+    if signal.type.startswith("S"):
+        high = index.max_high(lo, hi)
+        return high is not None and high >= signal.invalid_price
     return False
 
 
@@ -378,37 +555,53 @@ def _drop_invalidated_fresh_signals(
     if not signals:
         return []
 
+    checked = [item.available_time for item in signals if item.invalid_price is not None]
+    if not checked:
+        return list(signals)
     bars = snapshot.bars_sub if snapshot.bars_sub else snapshot.bars_main
+    # Only bars after the earliest checked signal matter; fresh signals are
+    # recent, so the index covers a short tail.
+    index = BarRangeIndex.from_bars(bars[bisect_right(bars, min(checked), key=attrgetter("time")) :])
     return [
         item
         for item in signals
-        if not _invalidated_after_available(item, bars, snapshot.asof_time)
+        if not _invalidated_after_available(item, index, snapshot.asof_time)
     ]
 
 
-def _sub_interval_confirmed(
-    snapshot: ChanSnapshot,
-    main_candidates,
-    threshold: float,
-    cfg: ChanConfig,
-):
-    if not cfg.require_sub_interval_confirmation or not main_candidates or not snapshot.bars_sub:
-        return list(main_candidates)
+@dataclass(slots=True)
+class LevelAnalysis:
+    """Signal-side reading of one snapshot level.
+
+    ``market_state`` is ``None`` when the level has no zhongshu to anchor
+    it; candidates and signals are then empty.  Main-level candidates are
+    already filtered by sub-interval confirmation.
+    """
+
+    market_state: MarketState | None
+    zhongshus: list[Zhongshu]
+    candidates: list[DivergenceCandidate]
+    signals: list[Signal]
 
-    sub_zhongshus = build_zhongshus_from_bis(snapshot.bis_sub)
+
+def _consolidation_anchor(zhongshus: list[Zhongshu], market_state: MarketState, default):
+    anchor_start = int(market_state.oscillation_state.get("anchor_start_index", -1))
+    return next((item for item in zhongshus if item.start_index == anchor_start), default)
+
+
+def _analyze_sub_level(snapshot: ChanSnapshot, threshold: float, cfg: ChanConfig) -> LevelAnalysis:
+    # Stand-in snapshots may lack zhongshus_sub; an empty list is rebuilt
+    # from the bis so both paths agree.
+    sub_zhongshus = getattr(snapshot, "zhongshus_sub", None) or build_zhongshus_from_bis(snapshot.bis_sub)
     if not sub_zhongshus:
-        return []
+        return LevelAnalysis(market_state=None, zhongshus=[], candidates=[], signals=[])
 
     sub_state = infer_market_state(
         snapshot.bars_sub[-1].close,
         snapshot.bis_sub,
         snapshot.segments_sub,
         sub_zhongshus,
-    )
-    sub_anchor_start = int(sub_state.oscillation_state.get("anchor_start_index", -1))
-    sub_consolidation_anchor = next(
-        (item for item in sub_zhongshus if item.start_index == sub_anchor_start),
-        sub_zhongshus[-1],
+        oscillation_tracker=getattr(snapshot, "oscillation_trackers", {}).get("sub"),
     )
     sub_candidates = detect_divergence_candidates(
         bis=snapshot.bis_sub,
@@ -420,7 +613,7 @@ def _sub_interval_confirmed(
         include_consolidation_divergence_hint=getattr(
             cfg, "include_consolidation_divergence_hint", False
         ),
-        consolidation_anchor=sub_consolidation_anchor,
+        consolidation_anchor=_consolidation_anchor(sub_zhongshus, sub_state, sub_zhongshus[-1]),
     )
     sub_signals = generate_signals(
         divergence_candidates=sub_candidates,
@@ -433,7 +626,96 @@ def _sub_interval_confirmed(
         missing_macd_penalty=cfg.missing_macd_penalty,
         transitional_confidence_cap=cfg.transitional_confidence_cap,
         bis_context=snapshot.bis_sub,
+        time_ordered=getattr(snapshot, "time_ordered", False),
+    )
+    return LevelAnalysis(
+        market_state=sub_state,
+        zhongshus=sub_zhongshus,
+        candidates=sub_candidates,
+        signals=sub_signals,
+    )
+
+
+def _analyze_main_level(snapshot: ChanSnapshot, threshold: float, cfg: ChanConfig) -> LevelAnalysis:
+    market_state = snapshot.market_state_main or MarketState(trend_type="range")
+    candidates = detect_divergence_candidates(
+        bis=snapshot.bis_main,
+        zhongshu_count=market_state.zhongshu_count,
+        trend_type=market_state.trend_type,
+        macd=snapshot.macd_main,
+        threshold=threshold,
+        zhongshus=snapshot.zhongshus_main,
+        include_consolidation_divergence_hint=cfg.include_consolidation_divergence_hint,
+        consolidation_anchor=_consolidation_anchor(
+            snapshot.zhongshus_main, market_state, snapshot.last_zhongshu_main
+        ),
+    )
+    candidates = _sub_interval_confirmed(snapshot, candidates, threshold, cfg)
+    signals = generate_signals(
+        divergence_candidates=candidates,
+        bis_sub=snapshot.bis_sub,
+        segments_sub=snapshot.segments_sub,
+        zhongshus_sub=snapshot.zhongshus_sub,
+        zhongshu_main=snapshot.last_zhongshu_main,
+        market_state=market_state,
+        macd_missing=len(snapshot.macd_main) == 0,
+        missing_macd_penalty=cfg.missing_macd_penalty,
+        transitional_confidence_cap=cfg.transitional_confidence_cap,
+        bis_context=snapshot.bis_sub,
+        time_ordered=getattr(snapshot, "time_ordered", False),
+    )
+    return LevelAnalysis(
+        market_state=market_state,
+        zhongshus=snapshot.zhongshus_main,
+        candidates=candidates,
+        signals=signals,
+    )
+
+
+def analyze_level(
+    snapshot: ChanSnapshot,
+    level: Literal["main", "sub"],
+    threshold: float,
+    cfg: ChanConfig,
+) -> LevelAnalysis:
+    """``LevelAnalysis`` of one level, memoized on the snapshot.
+
+    The memo is keyed by ``threshold`` and the config fields the analysis
+    reads, so one snapshot can serve several parameter sets.
+    """
+    key = (
+        level,
+        threshold,
+        getattr(cfg, "include_consolidation_divergence_hint", False),
+        cfg.missing_macd_penalty,
+        cfg.transitional_confidence_cap,
+        level == "main" and cfg.require_sub_interval_confirmation,
     )
+    memo = getattr(snapshot, "level_analyses", None)
+    if memo is not None and key in memo:
+        return memo[key]
+    if level == "main":
+        analysis = _analyze_main_level(snapshot, threshold, cfg)
+    else:
+        analysis = _analyze_sub_level(snapshot, threshold, cfg)
+    if memo is not None:
+        memo[key] = analysis
+    return analysis
+
+
+def _sub_interval_confirmed(
+    snapshot: ChanSnapshot,
+    main_candidates,
+    threshold: float,
+    cfg: ChanConfig,
+):
+    if not cfg.require_sub_interval_confirmation or not main_candidates or not snapshot.bars_sub:
+        return list(main_candidates)
+
+    sub = analyze_level(snapshot, "sub", threshold, cfg)
+    if not sub.zhongshus:
+        return []
+    sub_signals = sub.signals
 
     snapshot_anchor_time = (
         snapshot.last_zhongshu_main.available_time if snapshot.last_zhongshu_main else None
@@ -526,39 +808,9 @@ def generate_signal(
             cn_summary="当前数据不足，先补齐主次级别K线后再分析。",
         )
 
-    divergence = detect_divergence_candidates(
-        bis=snapshot.bis_main,
-        zhongshu_count=market_state.zhongshu_count,
-        trend_type=market_state.trend_type,
-        macd=snapshot.macd_main,
-        threshold=threshold,
-        zhongshus=snapshot.zhongshus_main,
-        include_consolidation_divergence_hint=cfg.include_consolidation_divergence_hint,
-        consolidation_anchor=next(
-            (
-                item
-                for item in snapshot.zhongshus_main
-                if item.start_index
-                == int(market_state.oscillation_state.get("anchor_start_index", -1))
-            ),
-            snapshot.last_zhongshu_main,
-        ),
-    )
-    divergence = _sub_interval_confirmed(snapshot, divergence, threshold, cfg)
-
-    macd_missing = len(snapshot.macd_main) == 0
-    signals = generate_signals(
-        divergence_candidates=divergence,
-        bis_sub=snapshot.bis_sub,
-        segments_sub=snapshot.segments_sub,
-        zhongshus_sub=snapshot.zhongshus_sub,
-        zhongshu_main=snapshot.last_zhongshu_main,
-        market_state=market_state,
-        macd_missing=macd_missing,
-        missing_macd_penalty=cfg.missing_macd_penalty,
-        transitional_confidence_cap=cfg.transitional_confidence_cap,
-        bis_context=snapshot.bis_sub,
-    )
+    analysis = analyze_level(snapshot, "main", threshold, cfg)
+    divergence = analysis.candidates
+    signals = analysis.signals
 
     fresh_signals = _fresh_signals(snapshot, signals)
     fresh_signals = _drop_invalidated_fresh_signals(snapshot, fresh_signals)
@@ -1,3 +1,15 @@
-from .binance_ohlcv import cache_path_for, load_ohlcv
+from .async_fetch import AsyncOHLCVFetcher, CacheJob, refill_cache_async, warm_cache_async
+from .binance_ohlcv import cache_path_for, compact_cache, load_ohlcv
+from .resample import load_resampled_ohlcv, resample_bars
 
-__all__ = ["cache_path_for", "load_ohlcv"]
+__all__ = [
+    "AsyncOHLCVFetcher",
+    "CacheJob",
+    "cache_path_for",
+    "compact_cache",
+    "load_ohlcv",
+    "load_resampled_ohlcv",
+    "refill_cache_async",
+    "resample_bars",
+    "warm_cache_async",
+]
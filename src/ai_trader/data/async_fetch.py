@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from ai_trader.data.binance_ohlcv import (
+    bars_from_ohlcv_rows,
+    count_missing_bars,
+    find_missing_ranges,
+    migrate_legacy_cache,
+    raw_window,
+    read_cache_window,
+    store_bars,
+    timeframe_to_ms,
+    to_ms,
+)
+from ai_trader.types import Bar, parse_utc_time
+
+
+def _create_client(exchange: str) -> Any:
+    try:
+        import ccxt.async_support as ccxt_async
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("ccxt is required to fetch online data") from exc
+
+    if not hasattr(ccxt_async, exchange):
+        raise ValueError(f"Unsupported exchange: {exchange}")
+    return getattr(ccxt_async, exchange)({"enableRateLimit": True, "timeout": 30000})
+
+
+class AsyncOHLCVFetcher:
+    """Async OHLCV paging over ``ccxt.async_support`` with one client per exchange.
+
+    Clients are created and their markets loaded once, then reused by every
+    fetch.  A range is split into ``page_limit``-bar pages that are all
+    requested concurrently, at most ``max_in_flight`` at a time per
+    exchange; ccxt's own throttler (``enableRateLimit``) spaces the actual
+    requests, so the pipeline stays at the exchange's rate limit instead of
+    waiting out each round trip.  Failed requests back off with
+    ``asyncio.sleep`` like ``_fetch_range_with_retry``.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        page_limit: int = 1000,
+        max_retries: int = 4,
+        clients: Mapping[str, Any] | None = None,
+    ) -> None:
+        if max_in_flight < 1 or page_limit < 1 or max_retries < 1:
+            raise ValueError("max_in_flight, page_limit and max_retries must be >= 1")
+        self.max_in_flight = max_in_flight
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+        self.requests = 0
+        self._clients: dict[str, Any] = dict(clients or {})
+        self._ready: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> AsyncOHLCVFetcher:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def client(self, exchange: str) -> Any:
+        lock = self._locks.setdefault(exchange, asyncio.Lock())
+        async with lock:
+            if exchange not in self._ready:
+                client = self._clients.get(exchange)
+                if client is None:
+                    client = _create_client(exchange)
+                    self._clients[exchange] = client
+                await self._retry(client.load_markets)
+                self._ready.add(exchange)
+        return self._clients[exchange]
+
+    async def fetch_range(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> list[Bar]:
+        """Bars with open times in ``[start_ms, end_ms]``, cache timestamps."""
+        if end_ms < start_ms:
+            return []
+        client = await self.client(exchange)
+        step = timeframe_to_ms(timeframe)
+        span = step * self.page_limit
+        pages = await asyncio.gather(
+            *(
+                self._fetch_page(client, exchange, symbol, timeframe, since, min(end_ms, since + span - step))
+                for since in range(start_ms, end_ms + 1, span)
+            )
+        )
+        rows = [row for page in pages for row in page]
+        return bars_from_ohlcv_rows(rows, start_ms=start_ms, end_ms=end_ms)
+
+    async def close(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._ready.clear()
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                await close()
+
+    async def _fetch_page(
+        self,
+        client: Any,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        since: int,
+        until: int,
+    ) -> list[list[float]]:
+        # Exchanges that cap pages below ``page_limit`` get follow-up
+        # requests within the page.
+        step = timeframe_to_ms(timeframe)
+        slots = self._slots.setdefault(exchange, asyncio.Semaphore(self.max_in_flight))
+        rows: list[list[float]] = []
+        cursor = since
+        while cursor <= until:
+            async with slots:
+                batch = await self._retry(
+                    client.fetch_ohlcv, symbol, timeframe=timeframe, since=cursor, limit=self.page_limit
+                )
+            if not batch:
+                break
+            rows.extend(batch)
+            next_cursor = int(batch[-1][0]) + step
+            if next_cursor <= cursor:
+                break
+            cursor = next_cursor
+        return rows
+
+    async def _retry(self, func, *args, **kwargs):
+        for idx in range(self.max_retries):
+            self.requests += 1
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                if idx + 1 == self.max_retries:
+                    raise
+                await asyncio.sleep(min(8, 2**idx))
+
+
+@dataclass(frozen=True, slots=True)
+class CacheJob:
+    """One cache refill: bars available in ``[start_utc, end_utc]``."""
+
+    exchange: str
+    symbol: str
+    timeframe: str
+    start_utc: str
+    end_utc: str
+
+
+async def refill_cache_async(fetcher: AsyncOHLCVFetcher, job: CacheJob) -> int:
+    """Fetch the gaps ``load_ohlcv`` would fetch for ``job`` and update the cache.
+
+    Missing ranges are fetched concurrently.  Returns the number of bars
+    fetched; a cache whose gaps are within ``AI_TRADER_MAX_MISSING_BARS`` is
+    left alone, as ``load_ohlcv`` would.
+    """
+    start = parse_utc_time(job.start_utc)
+    end = parse_utc_time(job.end_utc)
+    if end < start:
+        raise ValueError("end_utc must be >= start_utc")
+
+    raw_start, raw_end = raw_window(start, end, job.timeframe)
+    directory = await asyncio.to_thread(migrate_legacy_cache, job.exchange, job.symbol, job.timeframe)
+    cached, covered = await asyncio.to_thread(
+        read_cache_window, directory, job.timeframe, to_ms(raw_start), to_ms(raw_end)
+    )
+    if covered:
+        return 0
+    missing = find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=job.timeframe)
+    allowed = int(os.getenv("AI_TRADER_MAX_MISSING_BARS", "3"))
+    if not missing or (cached and count_missing_bars(missing, timeframe=job.timeframe) <= allowed):
+        return 0
+
+    fetched = await asyncio.gather(
+        *(
+            fetcher.fetch_range(job.exchange, job.symbol, job.timeframe, miss_start_ms, miss_end_ms)
+            for miss_start_ms, miss_end_ms in missing
+        )
+    )
+    new_bars = [bar for bars in fetched for bar in bars]
+    if new_bars:
+        await asyncio.to_thread(store_bars, directory, new_bars, job.timeframe)
+    return len(new_bars)
+
+
+async def warm_cache_async(
+    jobs: Iterable[CacheJob],
+    fetcher: AsyncOHLCVFetcher | None = None,
+    workers: int = 4,
+) -> dict[CacheJob, int]:
+    """Run cache refills from a shared queue; returns bars fetched per job.
+
+    Repeated jobs run once, and two different jobs for the same cache file
+    are rejected so workers never write one file concurrently.  Without
+    ``fetcher`` a new one is created and closed afterwards.
+    """
+    pending = list(dict.fromkeys(jobs))
+    files = [(job.exchange, job.symbol, job.timeframe) for job in pending]
+    if len(set(files)) != len(files):
+        raise ValueError("each exchange/symbol/timeframe may appear in only one job")
+
+    owned = fetcher is None
+    fetcher = fetcher or AsyncOHLCVFetcher()
+    queue: asyncio.Queue[CacheJob] = asyncio.Queue()
+    for job in pending:
+        queue.put_nowait(job)
+    results: dict[CacheJob, int] = {}
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[job] = await refill_cache_async(fetcher, job)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(workers, len(pending))))))
+    finally:
+        if owned:
+            await fetcher.close()
+    return {job: results[job] for job in pending}
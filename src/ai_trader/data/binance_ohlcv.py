@@ -2,17 +2,19 @@ from __future__ import annotations
 
 import csv
 import os
+import re
 import time
 import warnings
 from dataclasses import replace
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Iterable
 
+from ai_trader.data.manifest import forget_cache_files, load_manifest, missing_from_coverage, record_cache_file
 from ai_trader.types import Bar, iso_utc, parse_utc_time
 
 
-def _timeframe_to_ms(timeframe: str) -> int:
+def timeframe_to_ms(timeframe: str) -> int:
     unit = timeframe[-1]
     value = int(timeframe[:-1])
     if unit == "m":
@@ -25,23 +27,31 @@ def _timeframe_to_ms(timeframe: str) -> int:
 
 
 def timeframe_to_timedelta(timeframe: str) -> timedelta:
-    return timedelta(milliseconds=_timeframe_to_ms(timeframe))
+    return timedelta(milliseconds=timeframe_to_ms(timeframe))
 
 
-def _data_root() -> Path:
+def data_root() -> Path:
     return Path(os.getenv("AI_TRADER_DATA_DIR", "data/raw"))
 
 
-def _cache_path(exchange: str, symbol: str, timeframe: str) -> Path:
+def _cache_dir(exchange: str, symbol: str, timeframe: str) -> Path:
     symbol_key = symbol.replace("/", "")
-    return _data_root() / exchange / symbol_key / f"{timeframe}.csv"
+    return data_root() / exchange / symbol_key / timeframe
+
+
+def legacy_cache_path(exchange: str, symbol: str, timeframe: str) -> Path:
+    # Single-file layout used before caches were split into chunks.
+    return _cache_dir(exchange, symbol, timeframe).with_suffix(".csv")
 
 
 def cache_path_for(exchange: str, symbol: str, timeframe: str) -> Path:
-    return _cache_path(exchange, symbol, timeframe)
+    """Chunk directory of a cache; ``read_bars_csv`` reads it as one series."""
+    return _cache_dir(exchange, symbol, timeframe)
 
 
-def _read_csv(path: Path) -> list[Bar]:
+def read_bars_csv(path: Path) -> list[Bar]:
+    if path.is_dir():
+        return _read_chunk_files(_chunk_paths(path))
     if not path.exists():
         return []
     bars: list[Bar] = []
@@ -71,34 +81,182 @@ def _write_csv(path: Path, bars: Iterable[Bar]) -> None:
             writer.writerow(bar.to_dict())
 
 
-def _to_ms(dt) -> int:
+def _store_cache(path: Path, bars: list[Bar], timeframe: str) -> None:
+    """Write a cache file and record it in the directory manifest."""
+    _write_csv(path, bars)
+    record_cache_file(path, bars, timeframe, timeframe_to_ms(timeframe))
+
+
+# Chunks hold one UTC month (``YYYY-MM.csv``) of bars by open time, or a
+# whole year (``YYYY.csv``) once ``compact_cache`` has merged its months.
+_CHUNK_NAME = re.compile(r"^(\d{4})(?:-(\d{2}))?\.csv$")
+
+
+def _chunk_span(name: str) -> tuple[int, int] | None:
+    """Open-time range ``[lo_ms, hi_ms)`` of a chunk file name."""
+    match = _CHUNK_NAME.match(name)
+    if match is None:
+        return None
+    year = int(match.group(1))
+    if match.group(2) is None:
+        lo = datetime(year, 1, 1, tzinfo=timezone.utc)
+        hi = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        month = int(match.group(2))
+        lo = datetime(year, month, 1, tzinfo=timezone.utc)
+        hi = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(lo.timestamp() * 1000), int(hi.timestamp() * 1000)
+
+
+def _list_chunks(directory: Path) -> list[tuple[int, int, Path]]:
+    if not directory.is_dir():
+        return []
+    chunks: list[tuple[int, int, Path]] = []
+    for path in directory.iterdir():
+        span = _chunk_span(path.name)
+        if span is not None:
+            chunks.append((span[0], span[1], path))
+    chunks.sort()
+    return chunks
+
+
+def _chunk_paths(directory: Path, start_ms: int | None = None, end_ms: int | None = None) -> list[Path]:
+    """Chunks of ``directory`` overlapping ``[start_ms, end_ms]`` (open times)."""
+    return [
+        path
+        for lo, hi, path in _list_chunks(directory)
+        if (end_ms is None or lo <= end_ms) and (start_ms is None or hi > start_ms)
+    ]
+
+
+def _read_chunk_files(paths: list[Path]) -> list[Bar]:
+    bars: list[Bar] = []
+    for path in paths:
+        part = read_bars_csv(path)
+        if bars and part and part[0].time <= bars[-1].time:
+            # A yearly chunk next to months left by an interrupted compaction.
+            bars = merge_bars(bars, part)
+        else:
+            bars.extend(part)
+    return bars
+
+
+def read_cache_window(directory: Path, timeframe: str, start_ms: int, end_ms: int) -> tuple[list[Bar], bool]:
+    """Bars of the chunks overlapping ``[start_ms, end_ms]`` (open times).
+
+    The flag is true when the manifest shows those chunks hold every bar of
+    the window, so the caller can skip the gap scan.
+    """
+    paths = _chunk_paths(directory, start_ms, end_ms)
+    entries = load_manifest(directory) if paths else {}
+    coverage: list[tuple[int, int]] = []
+    vouched = bool(paths)
+    for path in paths:
+        entry = entries.get(path.name)
+        if entry is None or not entry.matches(path):
+            vouched = False
+            break
+        coverage.extend(entry.coverage)
+    coverage.sort()
+    bars = _read_chunk_files(paths)
+    return bars, vouched and not missing_from_coverage(coverage, start_ms, end_ms, timeframe_to_ms(timeframe))
+
+
+def store_bars(directory: Path, bars: Iterable[Bar], timeframe: str) -> list[Path]:
+    """Merge ``bars`` into the chunks they fall in; other chunks are not touched."""
+    years = {path.stem for _, _, path in _list_chunks(directory) if len(path.stem) == 4}
+    groups: dict[str, list[Bar]] = {}
+    for bar in bars:
+        year = f"{bar.time:%Y}"
+        name = f"{year}.csv" if year in years else f"{bar.time:%Y-%m}.csv"
+        groups.setdefault(name, []).append(bar)
+    written: list[Path] = []
+    for name, group in sorted(groups.items()):
+        path = directory / name
+        _store_cache(path, merge_bars(read_bars_csv(path), group), timeframe)
+        written.append(path)
+    return written
+
+
+def split_legacy_file(legacy: Path, timeframe: str) -> Path:
+    """Move a single-file cache into its chunk directory; returns the directory."""
+    directory = legacy.with_suffix("")
+    if legacy.is_file():
+        store_bars(directory, read_bars_csv(legacy), timeframe)
+        legacy.unlink()
+        forget_cache_files(legacy.parent, [legacy.name])
+    return directory
+
+
+def migrate_legacy_cache(exchange: str, symbol: str, timeframe: str) -> Path:
+    """Split a single-file cache into chunks once; returns the chunk directory."""
+    return split_legacy_file(legacy_cache_path(exchange, symbol, timeframe), timeframe)
+
+
+def compact_cache(exchange: str, symbol: str, timeframe: str, max_bars: int = 10_000) -> list[Path]:
+    """Merge the monthly chunks of finished years into yearly chunks.
+
+    A year is finished once a later chunk exists, so it no longer receives
+    appends.  Years with more than ``max_bars`` bars stay monthly, keeping
+    short window reads of fine timeframes small.  Returns the yearly
+    chunks written.
+    """
+    directory = migrate_legacy_cache(exchange, symbol, timeframe)
+    chunks = _list_chunks(directory)
+    if not chunks:
+        return []
+    last_year = max(path.stem[:4] for _, _, path in chunks)
+    months: dict[str, list[Path]] = {}
+    for _, _, path in chunks:
+        if len(path.stem) == 7 and path.stem[:4] < last_year:
+            months.setdefault(path.stem[:4], []).append(path)
+
+    entries = load_manifest(directory)
+    written: list[Path] = []
+    for year, paths in sorted(months.items()):
+        count = 0
+        for path in paths:
+            entry = entries.get(path.name)
+            count += entry.bars if entry is not None and entry.matches(path) else len(read_bars_csv(path))
+        if count > max_bars:
+            continue
+        target = directory / f"{year}.csv"
+        _store_cache(target, _read_chunk_files(sorted([target, *paths])), timeframe)
+        for path in paths:
+            path.unlink()
+        forget_cache_files(directory, [path.name for path in paths])
+        written.append(target)
+    return written
+
+
+def to_ms(dt) -> int:
     return int(parse_utc_time(dt).timestamp() * 1000)
 
 
-def _from_ms(ms: int) -> str:
+def from_ms(ms: int) -> str:
     return parse_utc_time(ms / 1000).isoformat().replace("+00:00", "Z")
 
 
-def _merge_bars(left: list[Bar], right: list[Bar]) -> list[Bar]:
+def merge_bars(left: list[Bar], right: list[Bar]) -> list[Bar]:
     merged: dict[int, Bar] = {int(item.time.timestamp()): item for item in left}
     for item in right:
         merged[int(item.time.timestamp())] = item
     return [merged[k] for k in sorted(merged.keys())]
 
 
-def _to_available_time(bars: Iterable[Bar], timeframe: str) -> list[Bar]:
+def to_available_time(bars: Iterable[Bar], timeframe: str) -> list[Bar]:
     delta = timeframe_to_timedelta(timeframe)
     return [replace(item, time=item.time + delta) for item in bars]
 
 
-def _filter_available_window(
+def filter_available_window(
     bars: Iterable[Bar], start, end, timeframe: str
 ) -> list[Bar]:
     delta = timeframe_to_timedelta(timeframe)
     return [item for item in bars if start <= item.time + delta <= end]
 
 
-def _bars_from_ohlcv_rows(rows: Iterable[Iterable[float]], start_ms: int, end_ms: int) -> list[Bar]:
+def bars_from_ohlcv_rows(rows: Iterable[Iterable[float]], start_ms: int, end_ms: int) -> list[Bar]:
     bars: list[Bar] = []
     for item in rows:
         ts = int(item[0])
@@ -114,13 +272,13 @@ def _bars_from_ohlcv_rows(rows: Iterable[Iterable[float]], start_ms: int, end_ms
                 volume=float(item[5] or 0.0),
             )
         )
-    return _merge_bars([], bars)
+    return merge_bars([], bars)
 
 
-def _find_missing_ranges(cached: list[Bar], start_utc: str, end_utc: str, timeframe: str) -> list[tuple[int, int]]:
-    step = _timeframe_to_ms(timeframe)
-    start_ms = _to_ms(start_utc)
-    end_ms = _to_ms(end_utc)
+def find_missing_ranges(cached: list[Bar], start_utc: str, end_utc: str, timeframe: str) -> list[tuple[int, int]]:
+    step = timeframe_to_ms(timeframe)
+    start_ms = to_ms(start_utc)
+    end_ms = to_ms(end_utc)
     if end_ms < start_ms:
         return []
 
@@ -150,8 +308,14 @@ def _find_missing_ranges(cached: list[Bar], start_utc: str, end_utc: str, timefr
     return missing
 
 
-def _count_missing_bars(missing: list[tuple[int, int]], timeframe: str) -> int:
-    step = _timeframe_to_ms(timeframe)
+def raw_window(start, end, timeframe: str) -> tuple[str, str]:
+    """Cache (open-time) range holding the bars available in ``[start, end]``."""
+    step = timedelta(milliseconds=timeframe_to_ms(timeframe))
+    return iso_utc(start - step), iso_utc(end - step)
+
+
+def count_missing_bars(missing: list[tuple[int, int]], timeframe: str) -> int:
+    step = timeframe_to_ms(timeframe)
     return sum(((end_ms - start_ms) // step) + 1 for start_ms, end_ms in missing)
 
 
@@ -165,7 +329,7 @@ def _fetch_with_ccxt_ms(exchange: str, symbol: str, timeframe: str, start_ms: in
         raise ValueError(f"Unsupported exchange: {exchange}")
 
     client = getattr(ccxt, exchange)({"enableRateLimit": True, "timeout": 30000})
-    step = _timeframe_to_ms(timeframe)
+    step = timeframe_to_ms(timeframe)
 
     rows: list[list[float]] = []
     cursor = start_ms
@@ -179,7 +343,7 @@ def _fetch_with_ccxt_ms(exchange: str, symbol: str, timeframe: str, start_ms: in
             break
         cursor = next_cursor
 
-    return _bars_from_ohlcv_rows(rows, start_ms=start_ms, end_ms=end_ms)
+    return bars_from_ohlcv_rows(rows, start_ms=start_ms, end_ms=end_ms)
 
 
 def _fetch_with_binance_rest_ms(symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[Bar]:
@@ -195,7 +359,7 @@ def _fetch_with_binance_rest_ms(symbol: str, timeframe: str, start_ms: int, end_
 
     rows: list[list[float]] = []
     cursor = start_ms
-    step = _timeframe_to_ms(timeframe)
+    step = timeframe_to_ms(timeframe)
 
     while cursor <= end_ms:
         response = requests.get(
@@ -219,7 +383,7 @@ def _fetch_with_binance_rest_ms(symbol: str, timeframe: str, start_ms: int, end_
             break
         cursor = next_cursor
 
-    return _bars_from_ohlcv_rows(rows, start_ms=start_ms, end_ms=end_ms)
+    return bars_from_ohlcv_rows(rows, start_ms=start_ms, end_ms=end_ms)
 
 
 def _fetch_range_with_retry(exchange: str, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[Bar]:
@@ -247,43 +411,66 @@ def _fetch_range_with_retry(exchange: str, symbol: str, timeframe: str, start_ms
     return []
 
 
-def load_ohlcv(exchange: str, symbol: str, timeframe: str, start_utc: str, end_utc: str) -> list[Bar]:
+def load_ohlcv(
+    exchange: str,
+    symbol: str,
+    timeframe: str,
+    start_utc: str,
+    end_utc: str,
+    base_timeframe: str | None = None,
+) -> list[Bar]:
     """Load closed OHLCV bars with cache-first refill.
 
     Exchange/cache timestamps are open times. Returned ``Bar.time`` values
     are close/availability times, so downstream Chan logic can treat
     ``bar.time <= asof_time`` as "this bar was already known".
+
+    The cache is split into monthly chunks and only the chunks overlapping
+    the window are read; fetched bars are merged into the chunks they fall
+    in.  A single-file cache from the old layout is split on first use.
+
+    When ``base_timeframe`` names a finer timeframe, ``timeframe`` is
+    derived locally from its cache instead of being fetched separately.
     """
+    if base_timeframe and timeframe_to_ms(timeframe) > timeframe_to_ms(base_timeframe):
+        from ai_trader.data.resample import load_resampled_ohlcv
+
+        return load_resampled_ohlcv(exchange, symbol, timeframe, start_utc, end_utc, base_timeframe)
+
     start = parse_utc_time(start_utc)
     end = parse_utc_time(end_utc)
     if end < start:
         raise ValueError("end_utc must be >= start_utc")
 
-    step_ms = _timeframe_to_ms(timeframe)
-    raw_start = iso_utc(start - timedelta(milliseconds=step_ms))
-    raw_end = iso_utc(end - timedelta(milliseconds=step_ms))
+    raw_start, raw_end = raw_window(start, end, timeframe)
 
-    path = _cache_path(exchange=exchange, symbol=symbol, timeframe=timeframe)
-    cached = _read_csv(path)
+    directory = migrate_legacy_cache(exchange=exchange, symbol=symbol, timeframe=timeframe)
+    cached, covered = read_cache_window(directory, timeframe, to_ms(raw_start), to_ms(raw_end))
+    if covered:
+        # The manifest vouches for the chunks: no gap scan needed.
+        return to_available_time(
+            filter_available_window(cached, start, end, timeframe),
+            timeframe,
+        )
 
-    missing = _find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
+    missing = find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
     allowed = int(os.getenv("AI_TRADER_MAX_MISSING_BARS", "3"))
-    missing_bars = _count_missing_bars(missing, timeframe=timeframe) if missing else 0
+    missing_bars = count_missing_bars(missing, timeframe=timeframe) if missing else 0
 
     if missing and cached and missing_bars <= allowed:
-        summary = ", ".join(f"[{_from_ms(a)} ~ {_from_ms(b)}]" for a, b in missing[:5])
+        summary = ", ".join(f"[{from_ms(a)} ~ {from_ms(b)}]" for a, b in missing[:5])
         warnings.warn(
             f"Cache has minor gaps for {exchange} {symbol} {timeframe}: "
             f"missing_bars={missing_bars}, missing={summary}",
             stacklevel=2,
         )
-        return _to_available_time(
-            _filter_available_window(cached, start, end, timeframe),
+        return to_available_time(
+            filter_available_window(cached, start, end, timeframe),
             timeframe,
         )
 
     if missing:
-        merged = cached[:]
+        fetched_all: list[Bar] = []
         for miss_start_ms, miss_end_ms in missing:
             fetched = _fetch_range_with_retry(
                 exchange=exchange,
@@ -292,17 +479,17 @@ def load_ohlcv(exchange: str, symbol: str, timeframe: str, start_utc: str, end_u
                 start_ms=miss_start_ms,
                 end_ms=miss_end_ms,
             )
-            if fetched:
-                merged = _merge_bars(merged, fetched)
+            fetched_all.extend(fetched)
 
-        merged.sort(key=lambda x: x.time)
-        _write_csv(path, merged)
-        cached = merged
+        if fetched_all:
+            # Only the chunks the fetched bars fall in are rewritten.
+            store_bars(directory, fetched_all, timeframe)
+            cached = merge_bars(cached, fetched_all)
 
-        remaining = _find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
+        remaining = find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
         if remaining:
-            missing_bars = _count_missing_bars(remaining, timeframe=timeframe)
-            summary = ", ".join(f"[{_from_ms(a)} ~ {_from_ms(b)}]" for a, b in remaining[:5])
+            missing_bars = count_missing_bars(remaining, timeframe=timeframe)
+            summary = ", ".join(f"[{from_ms(a)} ~ {from_ms(b)}]" for a, b in remaining[:5])
             if missing_bars > allowed:
                 raise RuntimeError(
                     f"Cache still incomplete for {exchange} {symbol} {timeframe}. "
@@ -314,7 +501,7 @@ def load_ohlcv(exchange: str, symbol: str, timeframe: str, start_utc: str, end_u
                 stacklevel=2,
             )
 
-    return _to_available_time(
-        _filter_available_window(cached, start, end, timeframe),
+    return to_available_time(
+        filter_available_window(cached, start, end, timeframe),
         timeframe,
     )
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ai_trader.types import Bar, iso_utc
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_SCHEMA_VERSION = 1
+
+# Async warming writes several timeframes of one symbol from worker threads.
+_MANIFEST_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
+class CacheFileEntry:
+    """Manifest record of one cache file.
+
+    ``coverage`` lists the contiguous runs of bar open times (epoch ms,
+    inclusive) in the file.  ``size`` and ``mtime_ns`` tie the record to the
+    file it describes: a file touched outside ``record_cache_file`` no
+    longer matches and its record is ignored.
+    """
+
+    name: str
+    timeframe: str
+    bars: int
+    coverage: list[tuple[int, int]]
+    sha256: str
+    size: int
+    mtime_ns: int
+    updated_at: str
+
+    @property
+    def start_ms(self) -> int | None:
+        return self.coverage[0][0] if self.coverage else None
+
+    @property
+    def end_ms(self) -> int | None:
+        return self.coverage[-1][1] if self.coverage else None
+
+    def matches(self, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timeframe": self.timeframe,
+            "bars": self.bars,
+            "coverage": [list(item) for item in self.coverage],
+            "sha256": self.sha256,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, row: dict[str, Any]) -> CacheFileEntry:
+        return cls(
+            name=name,
+            timeframe=str(row["timeframe"]),
+            bars=int(row["bars"]),
+            coverage=[(int(a), int(b)) for a, b in row["coverage"]],
+            sha256=str(row["sha256"]),
+            size=int(row["size"]),
+            mtime_ns=int(row["mtime_ns"]),
+            updated_at=str(row["updated_at"]),
+        )
+
+
+def _open_ms(bar: Bar) -> int:
+    return int(bar.time.timestamp() * 1000)
+
+
+def coverage_intervals(bars: Iterable[Bar], step_ms: int) -> list[tuple[int, int]]:
+    """Contiguous runs of open times in sorted cache ``bars``."""
+    intervals: list[tuple[int, int]] = []
+    run_start = previous = None
+    for bar in bars:
+        ts = _open_ms(bar)
+        if previous is not None and ts == previous:
+            continue
+        if previous is None or ts != previous + step_ms:
+            if run_start is not None:
+                intervals.append((run_start, previous))
+            run_start = ts
+        previous = ts
+    if run_start is not None:
+        intervals.append((run_start, previous))
+    return intervals
+
+
+def missing_from_coverage(
+    coverage: Sequence[tuple[int, int]], start_ms: int, end_ms: int, step_ms: int
+) -> list[tuple[int, int]]:
+    """``find_missing_ranges`` computed from coverage runs instead of bars."""
+    if end_ms < start_ms:
+        return []
+    missing: list[tuple[int, int]] = []
+    cursor = start_ms
+    for run_start, run_end in coverage:
+        if run_end < cursor:
+            continue
+        if run_start > end_ms:
+            break
+        if (run_start - start_ms) % step_ms:
+            # Off the window's grid: none of the window's bars are in it.
+            continue
+        if run_start > cursor:
+            missing.append((cursor, run_start - step_ms))
+        cursor = run_end + step_ms
+        if cursor > end_ms:
+            return missing
+    missing.append((cursor, end_ms))
+    return missing
+
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(directory: Path) -> dict[str, CacheFileEntry]:
+    """Entries of ``directory``'s manifest; empty if absent, unreadable or outdated."""
+    path = Path(directory) / MANIFEST_NAME
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("schema") != MANIFEST_SCHEMA_VERSION:
+            return {}
+        return {name: CacheFileEntry.from_dict(name, row) for name, row in payload["files"].items()}
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _save_manifest(directory: Path, entries: dict[str, CacheFileEntry]) -> None:
+    path = directory / MANIFEST_NAME
+    payload = {
+        "schema": MANIFEST_SCHEMA_VERSION,
+        "files": {name: entries[name].to_dict() for name in sorted(entries)},
+    }
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def record_cache_file(path: Path, bars: Sequence[Bar], timeframe: str, step_ms: int) -> CacheFileEntry:
+    """Record ``path`` (just written with ``bars``) in its directory's manifest."""
+    path = Path(path)
+    stat = path.stat()
+    entry = CacheFileEntry(
+        name=path.name,
+        timeframe=timeframe,
+        bars=len(bars),
+        coverage=coverage_intervals(bars, step_ms),
+        sha256=file_checksum(path),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        updated_at=iso_utc(datetime.now(tz=timezone.utc)),
+    )
+    with _MANIFEST_LOCK:
+        entries = load_manifest(path.parent)
+        entries[entry.name] = entry
+        _save_manifest(path.parent, entries)
+    return entry
+
+
+def forget_cache_files(directory: Path, names: Iterable[str]) -> None:
+    """Drop entries of deleted cache files; an emptied manifest is removed."""
+    directory = Path(directory)
+    with _MANIFEST_LOCK:
+        entries = load_manifest(directory)
+        for name in names:
+            entries.pop(name, None)
+        if entries:
+            _save_manifest(directory, entries)
+        else:
+            (directory / MANIFEST_NAME).unlink(missing_ok=True)
+
+
+def cache_entry(path: Path) -> CacheFileEntry | None:
+    """Manifest entry for ``path`` if it still describes the file on disk."""
+    path = Path(path)
+    entry = load_manifest(path.parent).get(path.name)
+    if entry is None or not entry.matches(path):
+        return None
+    return entry
+
+
+@dataclass(slots=True)
+class VerifyIssue:
+    path: Path
+    problem: str
+
+
+def verify_cache_dir(directory: Path, checksums: bool = True) -> list[VerifyIssue]:
+    """Check the files of one cache directory against its manifest.
+
+    Files are hashed, not parsed.  ``checksums=False`` only compares sizes
+    and modification times.
+    """
+    directory = Path(directory)
+    entries = load_manifest(directory)
+    issues: list[VerifyIssue] = []
+    for name, entry in sorted(entries.items()):
+        path = directory / name
+        if not path.exists():
+            issues.append(VerifyIssue(path, "missing"))
+        elif path.stat().st_size != entry.size:
+            issues.append(VerifyIssue(path, "size mismatch"))
+        elif checksums and file_checksum(path) != entry.sha256:
+            issues.append(VerifyIssue(path, "checksum mismatch"))
+        elif not checksums and not entry.matches(path):
+            issues.append(VerifyIssue(path, "modified"))
+    for path in sorted(directory.glob("*.csv")):
+        if path.name not in entries:
+            issues.append(VerifyIssue(path, "not in manifest"))
+    return issues
+
+
+def iter_cache_dirs(root: Path) -> list[Path]:
+    """Cache directories with a manifest or cache files.
+
+    Covers chunk directories (``<root>/<exchange>/<symbol>/<timeframe>``)
+    and symbol directories still holding single-file caches.
+    """
+    root = Path(root)
+    found: set[Path] = set()
+    for pattern in ("*/*", "*/*/*"):
+        found.update(path.parent for path in root.glob(f"{pattern}/{MANIFEST_NAME}"))
+        found.update(path.parent for path in root.glob(f"{pattern}/*.csv"))
+    return sorted(found)
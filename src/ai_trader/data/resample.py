@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import warnings
+from collections.abc import Sequence
+
+import numpy as np
+
+from ai_trader.data.binance_ohlcv import (
+    count_missing_bars,
+    filter_available_window,
+    find_missing_ranges,
+    from_ms,
+    load_ohlcv,
+    merge_bars,
+    migrate_legacy_cache,
+    read_cache_window,
+    store_bars,
+    timeframe_to_ms,
+    to_available_time,
+)
+from ai_trader.types import Bar, parse_utc_time
+
+
+def _resample_ratio(base_timeframe: str, timeframe: str) -> int:
+    base_ms = timeframe_to_ms(base_timeframe)
+    target_ms = timeframe_to_ms(timeframe)
+    if target_ms <= base_ms or target_ms % base_ms:
+        raise ValueError(f"{timeframe} cannot be resampled from {base_timeframe}")
+    return target_ms // base_ms
+
+
+def resample_bars(bars: Sequence[Bar], base_timeframe: str, timeframe: str) -> list[Bar]:
+    """Aggregate open-time ``base_timeframe`` bars into ``timeframe`` bars.
+
+    Bars use cache (open-time) timestamps.  Buckets are aligned to the UTC
+    epoch like exchange klines; a bucket is emitted only when every base bar
+    in it is present, so gaps and the still-forming last bucket are dropped
+    instead of producing short bars.
+    """
+    ratio = _resample_ratio(base_timeframe, timeframe)
+    if not bars:
+        return []
+
+    target_ms = timeframe_to_ms(timeframe)
+    times = np.fromiter((int(item.time.timestamp() * 1000) for item in bars), dtype=np.int64, count=len(bars))
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    ohlcv = np.array(
+        [(item.open, item.high, item.low, item.close, item.volume) for item in bars],
+        dtype=np.float64,
+    )[order]
+
+    buckets = times - times % target_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(times)])
+    ends = starts + counts - 1
+
+    opens = ohlcv[starts, 0]
+    highs = np.maximum.reduceat(ohlcv[:, 1], starts)
+    lows = np.minimum.reduceat(ohlcv[:, 2], starts)
+    closes = ohlcv[ends, 3]
+    volumes = np.add.reduceat(ohlcv[:, 4], starts)
+
+    keep = np.flatnonzero(counts == ratio)
+    return [
+        Bar(
+            time=int(buckets[starts[i]]) / 1000,
+            open=float(opens[i]),
+            high=float(highs[i]),
+            low=float(lows[i]),
+            close=float(closes[i]),
+            volume=float(volumes[i]),
+        )
+        for i in keep
+    ]
+
+
+def load_resampled_ohlcv(
+    exchange: str,
+    symbol: str,
+    timeframe: str,
+    start_utc: str,
+    end_utc: str,
+    base_timeframe: str = "1h",
+) -> list[Bar]:
+    """``load_ohlcv`` for a timeframe derived locally from ``base_timeframe``.
+
+    The derived cache file is read first; only when it misses bars in the
+    window is the base timeframe loaded (fetching it if needed), resampled
+    and merged into the derived cache.  Returned bars use available
+    (close) times exactly like ``load_ohlcv``.
+    """
+    _resample_ratio(base_timeframe, timeframe)
+    start = parse_utc_time(start_utc)
+    end = parse_utc_time(end_utc)
+    if end < start:
+        raise ValueError("end_utc must be >= start_utc")
+
+    # Derived bars sit on the epoch-aligned grid, so snap the open-time
+    # window onto it.
+    step_ms = timeframe_to_ms(timeframe)
+    raw_start_ms = -(-(int(start.timestamp() * 1000) - step_ms) // step_ms) * step_ms
+    raw_end_ms = (int(end.timestamp() * 1000) - step_ms) // step_ms * step_ms
+    raw_start = from_ms(raw_start_ms)
+    raw_end = from_ms(raw_end_ms)
+
+    directory = migrate_legacy_cache(exchange=exchange, symbol=symbol, timeframe=timeframe)
+    cached, _ = read_cache_window(directory, timeframe, raw_start_ms, raw_end_ms)
+    missing = find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
+
+    if missing:
+        # A derived bar opening at t is available at t + step once every base
+        # bar up to that time is available, so the base window never extends
+        # past ``end``.
+        first_open_ms = missing[0][0]
+        last_open_ms = missing[-1][1]
+        base_step_ms = timeframe_to_ms(base_timeframe)
+        if first_open_ms <= last_open_ms:
+            base_bars = load_ohlcv(
+                exchange,
+                symbol,
+                base_timeframe,
+                from_ms(first_open_ms + base_step_ms),
+                from_ms(last_open_ms + step_ms),
+            )
+            base_open = [
+                Bar(
+                    time=item.time.timestamp() - base_step_ms / 1000,
+                    open=item.open,
+                    high=item.high,
+                    low=item.low,
+                    close=item.close,
+                    volume=item.volume,
+                )
+                for item in base_bars
+            ]
+            derived = resample_bars(base_open, base_timeframe, timeframe)
+            if derived:
+                store_bars(directory, derived, timeframe)
+                cached = merge_bars(cached, derived)
+
+        remaining = find_missing_ranges(cached, start_utc=raw_start, end_utc=raw_end, timeframe=timeframe)
+        if remaining:
+            allowed = int(os.getenv("AI_TRADER_MAX_MISSING_BARS", "3"))
+            missing_bars = count_missing_bars(remaining, timeframe=timeframe)
+            summary = ", ".join(f"[{from_ms(a)} ~ {from_ms(b)}]" for a, b in remaining[:5])
+            if missing_bars > allowed:
+                raise RuntimeError(
+                    f"Cannot derive {exchange} {symbol} {timeframe} from {base_timeframe}: "
+                    f"missing_bars={missing_bars}, allowed={allowed}, missing={summary}"
+                )
+            warnings.warn(
+                f"Derived cache has minor gaps for {exchange} {symbol} {timeframe}: "
+                f"missing_bars={missing_bars}, missing={summary}",
+                stacklevel=2,
+            )
+
+    return to_available_time(
+        filter_available_window(cached, start, end, timeframe),
+        timeframe,
+    )
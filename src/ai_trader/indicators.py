@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator, Sequence
+from operator import attrgetter
+from typing import overload
+
 from ai_trader.types import Bar, MACDPoint
 
+_point_time = attrgetter("time")
+
 
 def _ema(values: list[float], period: int) -> list[float]:
     if not values:
@@ -28,3 +35,114 @@ def compute_macd(bars: list[Bar], fast: int = 12, slow: int = 26, signal: int =
         MACDPoint(time=bar.time, dif=d, dea=e, hist=h)
         for bar, d, e, h in zip(bars, dif, dea, hist)
     ]
+
+
+class MACDAccumulator:
+    """Incremental ``compute_macd`` for bars that arrive one at a time.
+
+    Uses the same EMA recurrences, so the pushed points match
+    ``compute_macd`` over all pushed bars exactly.  Only the EMA state and
+    a point count are kept; callers store the points they need.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self._alpha_fast = 2.0 / (fast + 1)
+        self._alpha_slow = 2.0 / (slow + 1)
+        self._alpha_signal = 2.0 / (signal + 1)
+        self._ema_fast = 0.0
+        self._ema_slow = 0.0
+        self._dea = 0.0
+        self.count = 0
+
+    def push(self, bar: Bar) -> MACDPoint:
+        close = bar.close
+        if not self.count:
+            self._ema_fast = close
+            self._ema_slow = close
+            self._dea = self._ema_fast - self._ema_slow
+        else:
+            self._ema_fast = self._alpha_fast * close + (1 - self._alpha_fast) * self._ema_fast
+            self._ema_slow = self._alpha_slow * close + (1 - self._alpha_slow) * self._ema_slow
+            dif = self._ema_fast - self._ema_slow
+            self._dea = self._alpha_signal * dif + (1 - self._alpha_signal) * self._dea
+        dif = self._ema_fast - self._ema_slow
+        self.count += 1
+        return MACDPoint(time=bar.time, dif=dif, dea=self._dea, hist=dif - self._dea)
+
+
+class MACDView(Sequence[MACDPoint]):
+    """Read-only window ``points[start:stop]`` over a shared MACD list.
+
+    Creating or narrowing a view never copies points.  ``points`` must be
+    sorted by time and must not be mutated while views over it are alive;
+    a ``compute_macd`` result over the full history is the intended backing
+    list.  Time-based narrowing (``asof``, ``window``, ``before``) bisects.
+    """
+
+    __slots__ = ("_points", "_start", "_stop")
+
+    def __init__(self, points: Sequence[MACDPoint], start: int = 0, stop: int | None = None) -> None:
+        offset = 0
+        if isinstance(points, MACDView):
+            offset = points._start
+            limit = points._stop
+            points = points._points
+        else:
+            limit = len(points)
+        size = limit - offset
+        start, stop, _ = slice(start, stop).indices(size)
+        self._points = points
+        self._start = offset + start
+        self._stop = offset + max(start, stop)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> MACDPoint: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[MACDPoint]: ...
+
+    def __getitem__(self, index):
+        positions = range(self._start, self._stop)[index]
+        if isinstance(index, slice):
+            if positions.step == 1:
+                return MACDView(self._points, positions.start, positions.stop)
+            return [self._points[i] for i in positions]
+        return self._points[positions]
+
+    def __iter__(self) -> Iterator[MACDPoint]:
+        return map(self._points.__getitem__, range(self._start, self._stop))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"MACDView(start={self._start}, stop={self._stop}, size={len(self)})"
+
+    def asof(self, time) -> MACDView:
+        """Points with ``time <= time``."""
+        stop = bisect_right(self._points, time, self._start, self._stop, key=_point_time)
+        return MACDView(self._points, self._start, stop)
+
+    def window(self, start_time, end_time) -> MACDView:
+        """Points with ``start_time <= time <= end_time``."""
+        lo = bisect_left(self._points, start_time, self._start, self._stop, key=_point_time)
+        hi = bisect_right(self._points, end_time, lo, self._stop, key=_point_time)
+        return MACDView(self._points, lo, hi)
+
+    def before(self, time, count: int | None = None) -> MACDView:
+        """Points with ``time < time``, limited to the last ``count``."""
+        stop = bisect_left(self._points, time, self._start, self._stop, key=_point_time)
+        start = self._start if count is None else max(self._start, stop - count)
+        return MACDView(self._points, start, stop)
+
+
+def as_macd_view(points: Sequence[MACDPoint]) -> MACDView:
+    """``points`` as a view; existing views are returned unchanged."""
+    return points if isinstance(points, MACDView) else MACDView(points)
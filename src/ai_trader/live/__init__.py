@@ -0,0 +1,11 @@
+from .feeds import ReplayFileFeed, WebSocketFeed, parse_bar_message
+from .paper import PaperDecision, PaperTrader, run_paper_daemon
+
+__all__ = [
+    "PaperDecision",
+    "PaperTrader",
+    "ReplayFileFeed",
+    "WebSocketFeed",
+    "parse_bar_message",
+    "run_paper_daemon",
+]
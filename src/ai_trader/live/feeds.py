@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Mapping
+from pathlib import Path
+from typing import Any, Protocol
+
+from ai_trader.data.binance_ohlcv import read_bars_csv, timeframe_to_timedelta, to_available_time
+from ai_trader.types import Bar, parse_utc_time
+
+
+class BarFeed(Protocol):
+    """Async source of closed bars with available (close) times, in order."""
+
+    timeframe: str
+
+    def __aiter__(self) -> AsyncIterator[Bar]: ...
+
+
+def parse_bar_message(payload: Mapping[str, Any], timeframe: str) -> Bar | None:
+    """Bar from a feed message, or None for a kline that has not closed yet.
+
+    Two shapes are accepted: a cache row ``{"time", "open", ...}`` keyed by
+    open time, and a Binance kline event ``{"k": {"t", "o", ..., "x"}}``.
+    Both are shifted to the available time like ``load_ohlcv``.
+    """
+    kline = payload.get("k")
+    if isinstance(kline, Mapping):
+        if not kline.get("x", True):
+            return None
+        row = {
+            "time": int(kline["t"]) / 1000,
+            "open": kline["o"],
+            "high": kline["h"],
+            "low": kline["l"],
+            "close": kline["c"],
+            "volume": kline.get("v", 0.0),
+        }
+    else:
+        row = payload
+    return Bar(
+        time=parse_utc_time(row["time"]) + timeframe_to_timedelta(timeframe),
+        open=float(row["open"]),
+        high=float(row["high"]),
+        low=float(row["low"]),
+        close=float(row["close"]),
+        volume=float(row.get("volume", 0.0) or 0.0),
+    )
+
+
+class ReplayFileFeed:
+    """Replay a cache CSV (open-time rows) as a stream of closed bars.
+
+    ``delay`` paces the replay in seconds per bar; with the default 0 the
+    feed still yields control to the event loop between bars.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        timeframe: str,
+        start_utc: str | None = None,
+        end_utc: str | None = None,
+        delay: float = 0.0,
+    ) -> None:
+        self.path = Path(path)
+        self.timeframe = timeframe
+        self.start = parse_utc_time(start_utc) if start_utc else None
+        self.end = parse_utc_time(end_utc) if end_utc else None
+        self.delay = delay
+
+    def bars(self) -> list[Bar]:
+        if not self.path.exists():
+            raise RuntimeError(f"replay file not found: {self.path}")
+        bars = to_available_time(read_bars_csv(self.path), self.timeframe)
+        return [
+            item
+            for item in bars
+            if (self.start is None or item.time >= self.start) and (self.end is None or item.time <= self.end)
+        ]
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        for bar in self.bars():
+            await asyncio.sleep(self.delay)
+            yield bar
+
+
+class WebSocketFeed:
+    """Closed bars from a websocket endpoint, reconnecting with backoff.
+
+    Messages are JSON objects understood by ``parse_bar_message``.  After a
+    reconnect the server may resend bars already seen; those are dropped
+    here so consumers only ever see strictly increasing times.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeframe: str,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        max_reconnects: int | None = None,
+    ) -> None:
+        self.url = url
+        self.timeframe = timeframe
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_reconnects = max_reconnects
+
+    async def __aiter__(self) -> AsyncIterator[Bar]:
+        try:
+            import aiohttp
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError("aiohttp is required for the websocket feed") from exc
+
+        last_time = None
+        delay = self.reconnect_delay
+        reconnects = 0
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30.0) as ws:
+                        delay = self.reconnect_delay
+                        async for message in ws:
+                            if message.type != aiohttp.WSMsgType.TEXT:
+                                if message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                    break
+                                continue
+                            bar = parse_bar_message(json.loads(message.data), self.timeframe)
+                            if bar is None or (last_time is not None and bar.time <= last_time):
+                                continue
+                            last_time = bar.time
+                            yield bar
+                except aiohttp.ClientError:
+                    pass
+                reconnects += 1
+                if self.max_reconnects is not None and reconnects > self.max_reconnects:
+                    return
+                await asyncio.sleep(delay)
+                delay = min(self.max_reconnect_delay, delay * 2)
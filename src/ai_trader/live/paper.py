@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from ai_trader.backtest.engine import EVALUATION_WARMUP_BARS
+from ai_trader.backtest.execution import ExecutionSimulator, decision_signature
+from ai_trader.backtest.metrics import OnlineMetrics
+from ai_trader.chan.cascade import LevelCascade
+from ai_trader.chan.config import ChanConfig, get_chan_config
+from ai_trader.chan.dedup import SignalEventStore, TurningGuardBook
+from ai_trader.chan.engine import generate_signal, suppress_seen_signal_events
+from ai_trader.live.feeds import BarFeed
+from ai_trader.types import BacktestConfig, Bar, DecisionStep, SignalDecision, Trade
+
+STATE_VERSION = 4
+
+# Main bars a forward 3-bar return needs after its signal bar.
+FORWARD_RETURN_BARS = 3
+
+# Rolling windows of ``PaperTrader.rolling_metrics``.
+ROLLING_METRIC_DAYS = (30, 90)
+
+# Dedup horizon of the running trader: B3/S3 keys are kept for the newest
+# anchor centers per level, time-keyed signal events for a year.
+SIGNAL_KEY_KEEP_CENTERS = 64
+SIGNAL_KEY_MAX_AGE = timedelta(days=365)
+
+
+@dataclass(slots=True)
+class PaperDecision:
+    """Decision taken at a main bar close; it fills at the next bar's open."""
+
+    time: datetime
+    decision: SignalDecision
+    latency_ms: float
+    equity: float
+    drawdown: float
+    position_qty: float
+
+
+class _BarWindow(Sequence[Bar]):
+    """Recent main bars, still addressed by their index in the full history.
+
+    ``ExecutionSimulator`` refers to bars by absolute index; bars before
+    ``offset`` have been dropped and raise ``IndexError``.
+    """
+
+    __slots__ = ("bars", "offset")
+
+    def __init__(self) -> None:
+        self.bars: list[Bar] = []
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return self.offset + len(self.bars)
+
+    def __getitem__(self, index: int) -> Bar:  # type: ignore[override]
+        if index < 0:
+            index += len(self)
+        pos = index - self.offset
+        if pos < 0:
+            raise IndexError(f"main bar {index} is no longer kept")
+        return self.bars[pos]
+
+    def append(self, bar: Bar) -> None:
+        self.bars.append(bar)
+
+    def trim(self, keep_from: int) -> None:
+        """Drop the bars before absolute index ``keep_from``."""
+        drop = keep_from - self.offset
+        if drop > 0:
+            del self.bars[:drop]
+            self.offset += drop
+
+
+@dataclass(slots=True)
+class _PendingOrder:
+    index: int
+    bar: Bar
+    step: DecisionStep
+    decision: SignalDecision
+    signature: tuple
+    drawdown: float
+
+
+class PaperTrader:
+    """Paper-trading account fed one closed sub-level bar at a time.
+
+    Sub bars go into a ``LevelCascade`` that aggregates the main level and
+    keeps both windows at the backtest's structure lookback, so per-decision
+    work does not grow with the amount of history.  At each main bar close
+    the trader marks to market, builds the decision and suppresses repeated
+    signal events exactly like ``run_backtest``; the decision is executed by
+    the shared ``ExecutionSimulator`` when the next main bar closes, at that
+    bar's open.  Given the same bars, trades therefore match
+    ``run_backtest`` except for the forward-return and benchmark statistics,
+    which only use bars seen so far.  ``metrics`` and ``rolling_metrics``
+    keep account statistics current, so the simulator holds only the latest
+    equity point and the saved state does not grow with the run.  Seen
+    signal events are forgotten beyond the ``SIGNAL_KEY_*`` horizon, where
+    an unbounded backtest could still suppress a repeat.
+    """
+
+    def __init__(self, config: BacktestConfig, chan_config: ChanConfig | None = None) -> None:
+        self.config = config
+        self.chan_config = chan_config or get_chan_config(config.chan_mode)
+        self.cascade = LevelCascade(
+            (config.timeframe_main, config.timeframe_sub),
+            chan_config=self.chan_config,
+            exchange=config.exchange,
+            symbol=config.symbol,
+            max_bars={
+                config.timeframe_main: config.structure_lookback_main_bars or None,
+                config.timeframe_sub: config.structure_lookback_sub_bars or None,
+            },
+        )
+        if self.cascade.base_timeframe != config.timeframe_sub:
+            raise ValueError("timeframe_main must be a higher level than timeframe_sub")
+        # Only the latest equity point is kept; ``metrics`` and
+        # ``rolling_metrics`` carry the account statistics instead.
+        self.simulator = ExecutionSimulator(
+            replace(config, keep_equity_curve=False),
+            self.chan_config,
+            rng=random.Random(config.random_seed),
+            year_returns={},
+        )
+        self.metrics = OnlineMetrics(config.initial_capital)
+        self.rolling_metrics = {
+            f"{days}d": OnlineMetrics(window=timedelta(days=days)) for days in ROLLING_METRIC_DAYS
+        }
+        self.simulator.metric_sinks.extend([self.metrics, *self.rolling_metrics.values()])
+        self.bars_main = _BarWindow()
+        # Main bars kept for forward returns: the structure lookback plus the
+        # forward window, extended back to the signal bar of an open position.
+        self.keep_main_bars = (config.structure_lookback_main_bars or EVALUATION_WARMUP_BARS) + FORWARD_RETURN_BARS
+        self.seen_signal_keys = SignalEventStore(max_age=SIGNAL_KEY_MAX_AGE, keep_centers=SIGNAL_KEY_KEEP_CENTERS)
+        self.turning_signal_guards = TurningGuardBook()
+        self.pending: _PendingOrder | None = None
+        self.latencies_ms: deque[float] = deque(maxlen=1000)
+
+    @property
+    def asof_time(self) -> datetime | None:
+        return self.cascade.asof_time
+
+    @property
+    def trades(self) -> list[Trade]:
+        return self.simulator.state.trades
+
+    def prime(self, bars: Iterable[Bar]) -> None:
+        """Load history without trading; decisions start after the last bar."""
+        for bar in bars:
+            if self._advance(bar) is not None:
+                self.pending = None
+
+    def on_bar(self, bar: Bar) -> PaperDecision | None:
+        """Consume one closed sub bar; return the decision when a main bar closed.
+
+        Bars at or before the last consumed time are ignored, so a feed that
+        replays from an earlier point after a restart is harmless.
+        """
+        main_bar = self._advance(bar)
+        if main_bar is None:
+            return None
+
+        config = self.config
+        i = len(self.bars_main) - 1
+        if self.pending is not None:
+            order = self.pending
+            self.pending = None
+            self.simulator.execute(
+                order.index,
+                order.bar,
+                main_bar,
+                order.step,
+                order.decision,
+                order.signature,
+                order.drawdown,
+                self.bars_main,
+            )
+        if i < EVALUATION_WARMUP_BARS:
+            return None
+
+        started = time.perf_counter()
+        drawdown = self.simulator.mark_to_market(main_bar)
+        snapshot = self.cascade.snapshot(config.timeframe_main, config.timeframe_sub)
+        raw_decision = generate_signal(
+            snapshot=snapshot,
+            macd_divergence_threshold=config.macd_divergence_threshold,
+            min_confidence=config.min_confidence,
+            chan_config=self.chan_config,
+        )
+        decision = suppress_seen_signal_events(
+            decision=raw_decision,
+            seen_signal_keys=self.seen_signal_keys,
+            chan_config=self.chan_config,
+            min_confidence=config.min_confidence,
+            active_turning_guards=self.turning_signal_guards,
+            asof_low=main_bar.low,
+            asof_high=main_bar.high,
+        )
+        self.pending = _PendingOrder(
+            index=i,
+            bar=main_bar,
+            step=DecisionStep(
+                time=main_bar.time,
+                decision=raw_decision,
+                last_zhongshu_main=snapshot.last_zhongshu_main,
+            ),
+            decision=decision,
+            signature=decision_signature(decision.to_contract_dict()),
+            drawdown=drawdown,
+        )
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        self.latencies_ms.append(latency_ms)
+
+        point = self.simulator.state.equity_curve[-1]
+        return PaperDecision(
+            time=main_bar.time,
+            decision=decision,
+            latency_ms=latency_ms,
+            equity=point.equity,
+            drawdown=drawdown,
+            position_qty=self.simulator.state.position_qty,
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Persist the full trader state atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            pickle.dump((STATE_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> PaperTrader:
+        with Path(path).open("rb") as f:
+            version, trader = pickle.load(f)
+        if version != STATE_VERSION or not isinstance(trader, cls):
+            raise RuntimeError(f"incompatible paper trading state: {path}")
+        return trader
+
+    def _advance(self, bar: Bar) -> Bar | None:
+        asof = self.cascade.asof_time
+        if asof is not None and bar.time <= asof:
+            return None
+        closed = self.cascade.push(bar)
+        if self.config.timeframe_main not in closed:
+            return None
+        main_bar = self.cascade.bars(self.config.timeframe_main)[-1]
+        self.bars_main.append(main_bar)
+        self._record_forward_return()
+        keep_from = len(self.bars_main) - self.keep_main_bars
+        signal_index = self.simulator.state.position_signal_index
+        if signal_index >= 0:
+            keep_from = min(keep_from, signal_index)
+        self.bars_main.trim(keep_from)
+        return main_bar
+
+    def _record_forward_return(self) -> None:
+        # Benchmark pool of run_backtest, grown as the 3-bar windows complete.
+        bars = self.bars_main
+        if len(bars) < 4:
+            return
+        i = len(bars) - 4
+        entry = bars[i + 1].open
+        if entry <= 0:
+            return
+        ret = (bars[i + 3].close - entry) / entry
+        self.simulator.year_returns.setdefault(bars[i].time.year, []).append(ret)
+
+
+async def run_paper_daemon(
+    trader: PaperTrader,
+    feed: BarFeed,
+    state_path: str | Path | None = None,
+    on_decision: Callable[[PaperDecision], None] | None = None,
+) -> PaperTrader:
+    """Drive ``trader`` from ``feed`` until it ends, persisting after each decision."""
+    if feed.timeframe != trader.config.timeframe_sub:
+        raise ValueError(
+            f"feed timeframe {feed.timeframe} does not match timeframe_sub {trader.config.timeframe_sub}"
+        )
+    try:
+        async for bar in feed:
+            event = trader.on_bar(bar)
+            if event is None:
+                continue
+            if state_path is not None:
+                trader.save(state_path)
+            if on_decision is not None:
+                on_decision(event)
+    finally:
+        if state_path is not None:
+            trader.save(state_path)
+    return trader
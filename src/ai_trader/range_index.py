@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+
+import numpy as np
+
+from ai_trader.types import Bar
+
+
+def _sparse_table(values: np.ndarray, reduce) -> list[np.ndarray]:
+    # levels[j][i] reduces values[i : i + 2**j].
+    levels = [values]
+    width = 1
+    while 2 * width <= len(values):
+        prev = levels[-1]
+        levels.append(reduce(prev[:-width], prev[width:]))
+        width *= 2
+    return levels
+
+
+class BarRangeIndex:
+    """Sparse-table range min/max over the lows and highs of a bar series.
+
+    Built once in O(n log n); ``min_low``/``max_high`` over any index range
+    are then O(1) and the first bar crossing a price is found in O(log n).
+    Ranges are half-open ``[lo, hi)`` indices into ``bars``; ``span`` maps
+    a time window onto them by bisecting the (sorted) bar times.  Any bar
+    fields can serve as lows/highs, e.g. ``low="close", high="close"`` for
+    close-based stops.
+    """
+
+    __slots__ = ("times", "_mins", "_maxs")
+
+    def __init__(self, times: Sequence, lows: Sequence[float], highs: Sequence[float]) -> None:
+        if not (len(times) == len(lows) == len(highs)):
+            raise ValueError("times, lows and highs must have the same length")
+        self.times = list(times)
+        self._mins = _sparse_table(np.asarray(lows, dtype=np.float64), np.minimum)
+        self._maxs = _sparse_table(np.asarray(highs, dtype=np.float64), np.maximum)
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[Bar], low: str = "low", high: str = "high") -> BarRangeIndex:
+        return cls(
+            [bar.time for bar in bars],
+            [getattr(bar, low) for bar in bars],
+            [getattr(bar, high) for bar in bars],
+        )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def span(self, after, until) -> tuple[int, int]:
+        """Index range of the bars with ``after < time <= until``."""
+        lo = bisect_right(self.times, after)
+        return lo, max(lo, bisect_right(self.times, until))
+
+    @staticmethod
+    def _query(levels: list[np.ndarray], lo: int, hi: int, reduce) -> float | None:
+        if hi <= lo:
+            return None
+        j = (hi - lo).bit_length() - 1
+        return float(reduce(levels[j][lo], levels[j][hi - (1 << j)]))
+
+    def min_low(self, lo: int, hi: int) -> float | None:
+        return self._query(self._mins, lo, hi, min)
+
+    def max_high(self, lo: int, hi: int) -> float | None:
+        return self._query(self._maxs, lo, hi, max)
+
+    def first_low_at_or_below(self, price: float, lo: int = 0, hi: int | None = None) -> int | None:
+        """Index of the first bar in ``[lo, hi)`` whose low is ``<= price``."""
+        return self._first(self._mins, lambda value: value > price, lo, hi)
+
+    def first_high_at_or_above(self, price: float, lo: int = 0, hi: int | None = None) -> int | None:
+        """Index of the first bar in ``[lo, hi)`` whose high is ``>= price``."""
+        return self._first(self._maxs, lambda value: value < price, lo, hi)
+
+    def _first(self, levels: list[np.ndarray], clear, lo: int, hi: int | None) -> int | None:
+        hi = len(self.times) if hi is None else min(hi, len(self.times))
+        pos = max(lo, 0)
+        # Skip the longest prefix of blocks that stay clear of the price.
+        for j in range(len(levels) - 1, -1, -1):
+            width = 1 << j
+            if pos + width <= hi and clear(levels[j][pos]):
+                pos += width
+        return pos if pos < hi else None
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import struct
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
+
+from ai_trader.types import Bar
+
+T = TypeVar("T")
+
+CACHE_SCHEMA_VERSION = 1
+DEFAULT_RESULT_CACHE_MAX_MB = 1024
+
+_PACKAGE_ROOT = Path(__file__).resolve().parent
+
+
+def _cache_root() -> Path:
+    return Path(os.getenv("AI_TRADER_CACHE_DIR", "data/cache")) / "results"
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the package sources, so cached results die with code edits."""
+    digest = hashlib.sha256()
+    for path in sorted(_PACKAGE_ROOT.rglob("*.py")):
+        digest.update(path.relative_to(_PACKAGE_ROOT).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def bars_fingerprint(bars: Iterable[Bar]) -> str:
+    digest = hashlib.sha256()
+    pack = struct.Struct("<d5d").pack
+    count = 0
+    for bar in bars:
+        digest.update(pack(bar.time.timestamp(), bar.open, bar.high, bar.low, bar.close, bar.volume))
+        count += 1
+    return f"{count}:{digest.hexdigest()}"
+
+
+def _jsonable(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return str(value)
+
+
+def result_cache_key(kind: str, *parts: Any, **params: Any) -> str:
+    """Content address for a derived result.
+
+    ``parts`` are usually bar fingerprints; ``params`` hold configs and
+    any other inputs.  The package code version and cache schema version
+    are always mixed in.
+    """
+    payload = {
+        "kind": kind,
+        "schema": CACHE_SCHEMA_VERSION,
+        "code": code_version(),
+        "parts": list(parts),
+        "params": params,
+    }
+    text = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Pickle store addressed by content hash with an LRU size cap.
+
+    Reads refresh the entry's mtime; once the store grows beyond
+    ``max_bytes`` the least recently used entries are deleted.
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int | None = None) -> None:
+        self.root = Path(root) if root is not None else _cache_root()
+        if max_bytes is None:
+            max_mb = int(os.getenv("AI_TRADER_RESULT_CACHE_MAX_MB", str(DEFAULT_RESULT_CACHE_MAX_MB)))
+            max_bytes = max_mb * 1024 * 1024
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def __contains__(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    def get(self, key: str) -> Any | None:
+        path = self.path_for(key)
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Truncated or incompatible entry: drop it and recompute.
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+        self.evict()
+        return path
+
+    def get_or_compute(self, key: str, compute: Callable[[], T]) -> T:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out: list[tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return out
+        for path in self.root.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            out.append((stat.st_mtime, stat.st_size, path))
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under ``max_bytes``."""
+        if self.max_bytes <= 0:
+            return 0
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
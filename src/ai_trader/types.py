@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Literal
@@ -93,18 +94,56 @@ class Bi:
     event_time: datetime
     available_time: datetime
     status: StructureStatus = "confirmed"
+    # Derived from the prices once; segment and center builders read them
+    # in their inner loops.  Use ``dataclasses.replace`` to change prices.
+    high: float = field(init=False, repr=False, compare=False)
+    low: float = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.event_time = parse_utc_time(self.event_time)
         self.available_time = parse_utc_time(self.available_time)
+        if self.start_price >= self.end_price:
+            self.high = self.start_price
+            self.low = self.end_price
+        else:
+            self.high = self.end_price
+            self.low = self.start_price
 
-    @property
-    def high(self) -> float:
-        return max(self.start_price, self.end_price)
 
-    @property
-    def low(self) -> float:
-        return min(self.start_price, self.end_price)
+@dataclass(slots=True)
+class BiColumns:
+    """Struct-of-arrays view of a bi list for bulk structure building.
+
+    Each attribute is a plain list indexed like the source bis, so builders
+    can scan highs/lows without a per-element attribute lookup.
+    """
+
+    direction: list[str]
+    start_index: list[int]
+    end_index: list[int]
+    start_price: list[float]
+    end_price: list[float]
+    high: list[float]
+    low: list[float]
+    event_time: list[datetime]
+    available_time: list[datetime]
+
+    @classmethod
+    def from_bis(cls, bis: Sequence[Bi]) -> BiColumns:
+        return cls(
+            direction=[item.direction for item in bis],
+            start_index=[item.start_index for item in bis],
+            end_index=[item.end_index for item in bis],
+            start_price=[item.start_price for item in bis],
+            end_price=[item.end_price for item in bis],
+            high=[item.high for item in bis],
+            low=[item.low for item in bis],
+            event_time=[item.event_time for item in bis],
+            available_time=[item.available_time for item in bis],
+        )
+
+    def __len__(self) -> int:
+        return len(self.direction)
 
 
 @dataclass(slots=True)
@@ -268,6 +307,29 @@ class SignalDecision:
         }
 
 
+@dataclass(slots=True)
+class LevelStructure:
+    """Chan structure of a single timeframe.
+
+    ``ChanSnapshot`` pairs two of these; a multi-level cascade builds each
+    level once and shares it between the adjacent pairs.
+    """
+
+    timeframe: str
+    raw_bar_count: int
+    bars: list[Bar]
+    macd: Sequence[MACDPoint]
+    fractals: list[Fractal]
+    bis: list[Bi]
+    segments: list[Segment]
+    zhongshus: list[Zhongshu]
+    previous_bar_time: datetime | None = None
+
+    def __post_init__(self) -> None:
+        if self.previous_bar_time is not None:
+            self.previous_bar_time = parse_utc_time(self.previous_bar_time)
+
+
 @dataclass(slots=True)
 class ChanSnapshot:
     exchange: str
@@ -277,8 +339,8 @@ class ChanSnapshot:
     asof_time: datetime
     bars_main: list[Bar]
     bars_sub: list[Bar]
-    macd_main: list[MACDPoint]
-    macd_sub: list[MACDPoint]
+    macd_main: Sequence[MACDPoint]
+    macd_sub: Sequence[MACDPoint]
     fractals_main: list[Fractal]
     fractals_sub: list[Fractal]
     bis_main: list[Bi]
@@ -292,6 +354,21 @@ class ChanSnapshot:
     trend_type_main: TrendType = "range"
     market_state_main: MarketState | None = None
     data_quality: DataQuality = field(default_factory=lambda: DataQuality(status="insufficient", notes=""))
+    # Set on "summary" snapshots, which keep only a tail of each list:
+    # structure indices stay those of the full merged series, so
+    # ``bars_main[i - bar_offset_main]`` is the bar at index ``i``, and
+    # ``structure_counts`` holds the full list lengths.
+    bar_offset_main: int = 0
+    bar_offset_sub: int = 0
+    structure_counts: dict[str, int] = field(default_factory=dict)
+    # ``chan.engine.analyze_level`` results, keyed by level and parameters.
+    level_analyses: dict[tuple, Any] = field(default_factory=dict)
+    # ``OscillationTracker`` per level ("main"/"sub"), shared by the
+    # snapshots of one run so the Zn windows carry over between bars.
+    oscillation_trackers: dict[str, Any] = field(default_factory=dict)
+    # Set by the structure pipeline, whose lists are in availability order;
+    # signal derivation then bisects them instead of filtering linearly.
+    time_ordered: bool = False
 
     def __post_init__(self) -> None:
         self.asof_time = parse_utc_time(self.asof_time)
@@ -299,6 +376,23 @@ class ChanSnapshot:
             self.previous_main_bar_time = parse_utc_time(self.previous_main_bar_time)
 
 
+@dataclass(slots=True)
+class DecisionStep:
+    """Raw per-bar decision plus the structure context execution needs.
+
+    The stream depends only on bars and structure/signal parameters, so it
+    can be shared between backtests that differ only in execution settings.
+    """
+
+    time: datetime
+    decision: SignalDecision
+    last_zhongshu_main: Zhongshu | None = None
+    summary: dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.time = parse_utc_time(self.time)
+
+
 @dataclass(slots=True)
 class Trade:
     side: Literal["long", "short"]
@@ -405,6 +499,12 @@ class BacktestConfig:
     structure_lookback_main_bars: int = DEFAULT_STRUCTURE_LOOKBACK_MAIN_BARS
     structure_lookback_sub_bars: int = DEFAULT_STRUCTURE_LOOKBACK_SUB_BARS
     check_signal_repaint: bool = False
+    # False keeps only the latest equity point; report metrics then come
+    # from streaming accumulators instead of the full curve.
+    keep_equity_curve: bool = True
+    # When set (e.g. "1h"), coarser timeframes are derived locally from
+    # this timeframe's cache instead of being fetched (see ``load_ohlcv``).
+    resample_base_timeframe: str | None = None
 
 
 @dataclass(slots=True)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.backtest.engine import run_backtest
+from ai_trader.backtest.events import EventBus, Fill, Order, OrderSubmitted
+from ai_trader.backtest.execution import ExecutionSimulator
+from ai_trader.backtest.fills import NextOpenFill, SubBarFill
+from ai_trader.chan.config import get_chan_config
+from ai_trader.types import BacktestConfig, Signal
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+def _fills(report) -> list[tuple]:
+    return [
+        (item.side, item.entry_price, item.exit_price, item.quantity, item.net_pnl, item.fees)
+        for item in report.trades
+    ]
+
+
+class EventDrivenBacktestTest(unittest.TestCase):
+    def setUp(self) -> None:
+        start = datetime(2023, 10, 1, 1, tzinfo=timezone.utc)
+        self.bars_sub = make_random_walk_bars(start, count=4 * 450, minutes=60, seed=1)
+        self.bars_main = aggregate_bars(self.bars_sub, 4)
+        self.config = BacktestConfig(chan_mode="pragmatic", min_confidence=0.3, slippage_rate=0.001)
+        self.report = run_backtest(self.config, bars_main=self.bars_main, bars_sub=self.bars_sub)
+
+    def test_next_open_fill_is_the_default(self) -> None:
+        explicit = run_backtest(
+            self.config, bars_main=self.bars_main, bars_sub=self.bars_sub, fill_model=NextOpenFill()
+        )
+        self.assertGreater(len(self.report.trades), 0)
+        self.assertEqual(explicit.trades, self.report.trades)
+        self.assertEqual(explicit.equity_curve, self.report.equity_curve)
+        self.assertEqual(explicit.metrics, self.report.metrics)
+
+    def test_first_sub_bar_open_prices_like_the_next_main_open(self) -> None:
+        report = run_backtest(
+            self.config, bars_main=self.bars_main, bars_sub=self.bars_sub, fill_model=SubBarFill(self.bars_sub)
+        )
+        self.assertEqual(_fills(report), _fills(self.report))
+        for sub_trade, main_trade in zip(report.trades, self.report.trades):
+            self.assertEqual(sub_trade.exit_time, main_trade.exit_time - timedelta(hours=3))
+
+    def test_delayed_sub_bar_fills_inside_the_next_main_bar(self) -> None:
+        report = run_backtest(
+            self.config,
+            bars_main=self.bars_main,
+            bars_sub=self.bars_sub,
+            fill_model=SubBarFill(self.bars_sub, offset=2, price="close"),
+        )
+        by_time = {bar.time: bar for bar in self.bars_sub}
+        self.assertGreater(len(report.trades), 0)
+        for trade in report.trades:
+            self.assertEqual(trade.exit_time.hour % 4, 3)
+            sub = by_time[trade.exit_time]
+            slip = 1 - self.config.slippage_rate if trade.side == "long" else 1 + self.config.slippage_rate
+            self.assertEqual(trade.exit_price, sub.close * slip)
+
+
+class EventFlowTest(unittest.TestCase):
+    def test_orders_are_filled_and_booked_through_the_bus(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        bars = aggregate_bars(make_random_walk_bars(start, count=40, minutes=60), 4)
+        config = BacktestConfig(fee_rate=0.001, slippage_rate=0.001)
+        bus = EventBus()
+        seen: list[str] = []
+        bus.subscribe(OrderSubmitted, lambda event: seen.append(event.order.action))
+        bus.subscribe(Fill, lambda event: seen.append(f"fill@{event.reference_price}"))
+        simulator = ExecutionSimulator(config, get_chan_config("pragmatic"), bus=bus, bars_main=bars)
+        signal = Signal(
+            type="B2",
+            level="main",
+            trigger="",
+            invalid_if="",
+            confidence=1.0,
+            event_time=bars[1].time,
+            available_time=bars[1].time,
+        )
+        for order in (
+            Order(action="open_long", side="buy", index=1, time=bars[1].time, size=0.5, signal=signal),
+            Order(action="reduce", side="sell", index=3, time=bars[3].time, size=0.5, signature=("reduce",)),
+            Order(action="close", side="sell", index=5, time=bars[5].time),
+        ):
+            bus.publish(OrderSubmitted(order, bars[order.index + 1]))
+
+        self.assertEqual(
+            seen,
+            [
+                "open_long",
+                f"fill@{bars[2].open}",
+                "reduce",
+                f"fill@{bars[4].open}",
+                "close",
+                f"fill@{bars[6].open}",
+            ],
+        )
+        first, second = simulator.state.trades
+        self.assertEqual(first.entry_time, bars[2].time)
+        self.assertEqual(first.entry_price, bars[2].open * 1.001)
+        self.assertEqual((first.exit_time, first.exit_price), (bars[4].time, bars[4].open * 0.999))
+        self.assertEqual(first.quantity, second.quantity)
+        self.assertEqual(simulator.state.position_qty, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import random
 import unittest
 from datetime import datetime, timezone
 from types import SimpleNamespace
 from unittest.mock import patch
 
 from ai_trader.backtest.engine import run_backtest
+from ai_trader.backtest.execution import BenchmarkReturnPool, _pick_benchmark_return
 from ai_trader.types import (
     Action,
     BacktestConfig,
@@ -55,8 +57,8 @@ class BacktestExecutionSemanticsTest(unittest.TestCase):
         load_calls = []
         asof_times = []
 
-        def fake_load_ohlcv(exchange, symbol, timeframe, start_utc, end_utc):
-            load_calls.append((timeframe, start_utc, end_utc))
+        def fake_load_ohlcv(exchange, symbol, timeframe, start_utc, end_utc, base_timeframe=None):
+            load_calls.append((timeframe, start_utc, end_utc, base_timeframe))
             return self.bars_main if timeframe == "4h" else self.bars_sub
 
         def fake_compute_macd(_bars):
@@ -95,6 +97,8 @@ class BacktestExecutionSemanticsTest(unittest.TestCase):
 
         self.assertEqual(load_calls[0][1], "2022-01-11T00:00:00Z")
         self.assertEqual(load_calls[1][1], "2022-01-11T00:00:00Z")
+        # Resampling is opt-in through the config, never ambient.
+        self.assertEqual([call[3] for call in load_calls], [None, None])
         self.assertTrue(asof_times)
         self.assertTrue(report.signals)
         self.assertGreaterEqual(report.signals[0]["time"], "2022-02-10T00:00:00Z")
@@ -890,6 +894,27 @@ class BacktestExecutionSemanticsTest(unittest.TestCase):
         self.assertEqual(report.trades[0].entry_time, self.bars_main[121].time)
         self.assertEqual(report.trades[1].entry_time, self.bars_main[123].time)
 
+    def test_benchmark_pool_draws_match_year_lists(self) -> None:
+        bars = make_synthetic_bars(datetime(2023, 12, 20, tzinfo=timezone.utc), count=400, step_hours=4)
+        bars[10].open = 0.0
+        year_returns: dict[int, list[float]] = {}
+        for i in range(len(bars) - 3):
+            entry = bars[i + 1].open
+            if entry > 0:
+                year_returns.setdefault(bars[i].time.year, []).append((bars[i + 3].close - entry) / entry)
+
+        pool = BenchmarkReturnPool.from_bars(bars)
+        self.assertEqual(sorted(pool.spans), [2023, 2024])
+        self.assertEqual(len(pool), sum(len(values) for values in year_returns.values()))
+
+        expected_rng, pool_rng = random.Random(7), random.Random(7)
+        for year in [2023, 2024, 2022, 2025] * 20:
+            self.assertEqual(
+                _pick_benchmark_return(pool_rng, pool, year),
+                _pick_benchmark_return(expected_rng, year_returns, year),
+            )
+        self.assertEqual(BenchmarkReturnPool.from_bars(bars[:3]).pick(pool_rng, 2024), 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
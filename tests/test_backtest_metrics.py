@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import random
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from statistics import mean, pstdev
+from unittest.mock import patch
+
+import numpy as np
+
+from ai_trader.backtest import metrics as metrics_module
+from ai_trader.backtest.engine import run_backtest
+from ai_trader.backtest.metrics import (
+    OnlineMetrics,
+    OnlineReportMetrics,
+    SegmentSpec,
+    _sharpe_from_returns,
+    calc_metrics,
+    calc_report_metrics,
+    calc_segmented_metrics,
+    calc_walk_forward_metrics,
+)
+from ai_trader.types import BacktestConfig, EquityPoint, Trade
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+def _reference_metrics(equity_curve, trades, initial_capital):
+    # The loop-based calc_metrics the array version replaced.
+    equity = [item.equity for item in equity_curve]
+    if not equity:
+        return dict(metrics_module._EMPTY_METRICS)
+    total_return = (equity[-1] - initial_capital) / initial_capital
+    days = (equity_curve[-1].time - equity_curve[0].time).total_seconds() / 86400 if len(equity) >= 2 else 0.0
+    annual_return = (1 + total_return) ** (365 / days) - 1 if days > 0 else 0.0
+    returns = [0.0 if equity[i - 1] <= 0 else (equity[i] - equity[i - 1]) / equity[i - 1] for i in range(1, len(equity))]
+    peak, max_dd = equity[0], 0.0
+    for value in equity:
+        peak = max(peak, value)
+        if peak > 0:
+            max_dd = max(max_dd, (peak - value) / peak)
+    sharpe = 0.0
+    if len(returns) >= 2 and pstdev(returns) != 0:
+        sharpe = (mean(returns) / pstdev(returns)) * ((365 * 6) ** 0.5)
+    gross_profit = sum(item.net_pnl for item in trades if item.net_pnl > 0)
+    gross_loss = abs(sum(item.net_pnl for item in trades if item.net_pnl < 0))
+    return {
+        "total_return": total_return,
+        "annual_return": annual_return,
+        "max_drawdown": max_dd,
+        "sharpe": sharpe,
+        "win_rate": sum(1 for item in trades if item.net_pnl > 0) / len(trades) if trades else 0.0,
+        "profit_factor": gross_profit / gross_loss if gross_loss > 0 else 0.0,
+        "expectancy": mean([item.net_return for item in trades]) if trades else 0.0,
+        "trade_count": float(len(trades)),
+    }
+
+
+def _reference_segmented(equity_curve, trades, initial_capital):
+    result = {}
+    for name, (lo, hi) in {"2022": (2022, 2022), "2023": (2023, 2023), "2024-2026": (2024, 2026)}.items():
+        equity = [item for item in equity_curve if lo <= item.time.year <= hi]
+        picked = [item for item in trades if lo <= item.entry_time.year <= hi]
+        result[name] = _reference_metrics(equity, picked, equity[0].equity if equity else initial_capital)
+    return result
+
+
+def _reference_walk_forward(equity_curve, trades, initial_capital):
+    train = [item for item in equity_curve if 2022 <= item.time.year <= 2023]
+    val = [item for item in equity_curve if 2024 <= item.time.year <= 2026]
+    return {
+        "train_2022_2023": _reference_metrics(
+            train, [item for item in trades if 2022 <= item.entry_time.year <= 2023], initial_capital
+        ),
+        "validate_2024_2026": _reference_metrics(
+            val,
+            [item for item in trades if 2024 <= item.entry_time.year <= 2026],
+            val[0].equity if val else initial_capital,
+        ),
+    }
+
+
+def _random_run(seed: int, count: int = 3000) -> tuple[list[EquityPoint], list[Trade]]:
+    rng = random.Random(seed)
+    start = datetime(2021, 11, 1, tzinfo=timezone.utc)
+    equity, value = [], 10_000.0
+    for i in range(count):
+        value *= 1 + rng.gauss(0.0002, 0.01)
+        if rng.random() < 0.01:
+            value = 0.0 if rng.random() < 0.5 else value
+        elif value == 0.0:
+            value = 10_000.0 * rng.random()
+        equity.append(
+            EquityPoint(time=start + timedelta(hours=4 * i), equity=value, drawdown=0.0, cash=value, position_value=0.0)
+        )
+    trades = []
+    for _ in range(80):
+        entry = start + timedelta(hours=4 * rng.randrange(count))
+        pnl = rng.gauss(5.0, 60.0)
+        trades.append(
+            Trade(
+                side="long",
+                signal_type="B1",
+                entry_time=entry,
+                exit_time=entry + timedelta(hours=8),
+                entry_price=100.0,
+                exit_price=100.0,
+                quantity=1.0,
+                gross_pnl=pnl,
+                net_pnl=pnl,
+                net_return=pnl / 1000.0,
+                fees=0.0,
+                slippage_cost=0.0,
+                forward_3bar_return=0.0,
+                benchmark_return=0.0,
+            )
+        )
+    return equity, trades
+
+
+class MetricsRegressionTest(unittest.TestCase):
+    def test_sharpe_matches_statistics_across_magnitudes(self) -> None:
+        rng = random.Random(3)
+        values = [rng.gauss(0.0, 10.0 ** rng.randrange(-12, 6)) for _ in range(3000)] + [1e-300, 0.0]
+        expected = mean(values) / pstdev(values) * (365 * 6) ** 0.5
+        self.assertEqual(_sharpe_from_returns(np.asarray(values)), expected)
+
+    def test_empyrical_risk_replaces_the_builtin_computation(self) -> None:
+        class FakeEmpyrical:
+            @staticmethod
+            def max_drawdown(series):
+                return -0.25
+
+            @staticmethod
+            def sharpe_ratio(series):
+                return 1.5
+
+        equity, trades = _random_run(0)
+        with (
+            patch.object(metrics_module, "_empyrical", return_value=FakeEmpyrical),
+            patch.object(metrics_module, "_sharpe_from_returns", side_effect=AssertionError("computed")),
+        ):
+            metrics = calc_metrics(equity, trades, 10_000.0)
+        self.assertEqual((metrics["max_drawdown"], metrics["sharpe"]), (0.25, 1.5))
+
+    def test_metrics_match_reference_bit_for_bit(self) -> None:
+        if metrics_module._empyrical() is not None:
+            self.skipTest("empyrical overrides sharpe and max_drawdown")
+        for seed in range(4):
+            equity, trades = _random_run(seed)
+            self.assertEqual(calc_metrics(equity, trades, 10_000.0), _reference_metrics(equity, trades, 10_000.0))
+            self.assertEqual(
+                calc_segmented_metrics(equity, trades, 10_000.0), _reference_segmented(equity, trades, 10_000.0)
+            )
+            self.assertEqual(
+                calc_walk_forward_metrics(equity, trades, 10_000.0),
+                _reference_walk_forward(equity, trades, 10_000.0),
+            )
+            overall, segmented, walk_forward = calc_report_metrics(equity, trades, 10_000.0)
+            self.assertEqual(overall, _reference_metrics(equity, trades, 10_000.0))
+            self.assertEqual(segmented, _reference_segmented(equity, trades, 10_000.0))
+            self.assertEqual(walk_forward, _reference_walk_forward(equity, trades, 10_000.0))
+
+    def test_empty_inputs(self) -> None:
+        self.assertEqual(calc_metrics([], [], 1.0)["sharpe"], 0.0)
+        self.assertEqual(calc_segmented_metrics([], [], 1.0)["2023"]["trade_count"], 0.0)
+
+
+class SegmentSpecTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if metrics_module._empyrical() is not None:
+            self.skipTest("empyrical overrides sharpe and max_drawdown")
+        self.equity, self.trades = _random_run(7, count=4000)
+
+    def _filtered(self, keep) -> dict:
+        equity = [item for item in self.equity if keep(item.time)]
+        trades = [item for item in self.trades if keep(item.entry_time)]
+        return _reference_metrics(equity, trades, equity[0].equity) if equity else dict(metrics_module._EMPTY_METRICS)
+
+    def test_calendar_periods_match_filtered_metrics(self) -> None:
+        quarters = calc_segmented_metrics(self.equity, self.trades, 10_000.0, SegmentSpec.periods("quarter"))
+        self.assertEqual(list(quarters)[:3], ["2021Q4", "2022Q1", "2022Q2"])
+        for name, values in quarters.items():
+            year, quarter = int(name[:4]), int(name[-1])
+            self.assertEqual(values, self._filtered(lambda t: t.year == year and (t.month - 1) // 3 + 1 == quarter))
+        months = calc_segmented_metrics(self.equity, self.trades, 10_000.0, SegmentSpec.periods("month"))
+        self.assertEqual(months["2022-03"], self._filtered(lambda t: (t.year, t.month) == (2022, 3)))
+
+    def test_time_cuts_match_filtered_metrics(self) -> None:
+        cuts = [datetime(2022, 5, 17, 3, tzinfo=timezone.utc), "2023-02-01T00:00:00Z"]
+        got = calc_segmented_metrics(self.equity, self.trades, 10_000.0, SegmentSpec.cuts(cuts))
+        lo, hi = datetime(2022, 5, 17, 3, tzinfo=timezone.utc), datetime(2023, 2, 1, tzinfo=timezone.utc)
+        self.assertEqual(
+            got,
+            {
+                "start..2022-05-17T03:00:00Z": self._filtered(lambda t: t < lo),
+                "2022-05-17T03:00:00Z..2023-02-01T00:00:00Z": self._filtered(lambda t: lo <= t < hi),
+                "2023-02-01T00:00:00Z..end": self._filtered(lambda t: t >= hi),
+            },
+        )
+
+    def test_market_state_segments_chain_their_stretches(self) -> None:
+        start = self.equity[0].time
+        changes = {
+            start + timedelta(days=day): "trending" if k % 2 else "consolidating"
+            for k, day in enumerate(range(5, 600, 45))
+        }
+        spec = SegmentSpec.market_states(changes)
+        got = calc_segmented_metrics(self.equity, self.trades, 10_000.0, spec)
+        self.assertEqual(list(got), ["consolidating", "trending"])
+        for name, values in got.items():
+            points = [item for item in self.equity if spec.segment_of(item.time) == name]
+            trades = [item for item in self.trades if spec.segment_of(item.entry_time) == name]
+            self.assertEqual(values["trade_count"], float(len(trades)))
+            self.assertEqual(values["win_rate"], _reference_metrics(points, trades, 1.0)["win_rate"])
+            # Every stretch compounds from its own first point, so the moves into stretch starts are left out.
+            growth = 1.0
+            for item in points:
+                idx = self.equity.index(item)
+                if idx == 0 or spec.segment_of(self.equity[idx - 1].time) != name:
+                    continue
+                prev = self.equity[idx - 1].equity
+                growth *= 1.0 if prev <= 0 else item.equity / prev
+            self.assertAlmostEqual(values["total_return"], growth - 1.0, delta=1e-9 * max(1.0, growth))
+
+    def test_recurring_state_credits_every_stretch_alike(self) -> None:
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        values = [100.0] * 4 + [110.0] + [220.0] * 5 + [440.0] * 4 + [484.0]
+        equity = [
+            EquityPoint(time=start + timedelta(days=i), equity=value, drawdown=0.0, cash=value, position_value=0.0)
+            for i, value in enumerate(values)
+        ]
+        spec = SegmentSpec.market_states({start: "A", start + timedelta(days=5): "B", start + timedelta(days=10): "A"})
+        got = calc_segmented_metrics(equity, [], 100.0, spec)
+        self.assertAlmostEqual(got["A"]["total_return"], 1.1 * 1.1 - 1.0)
+        self.assertEqual(got["B"]["total_return"], 0.0)
+
+    def test_invalid_specs_are_rejected(self) -> None:
+        t0 = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        with self.assertRaises(ValueError):
+            SegmentSpec()
+        with self.assertRaises(ValueError):
+            SegmentSpec(calendar="week")
+        with self.assertRaises(ValueError):
+            SegmentSpec(ranges=(("a", t0, None), ("b", t0, None)))
+        with self.assertRaises(ValueError):
+            OnlineReportMetrics(1.0, SegmentSpec.market_states({t0: "trending"}))
+
+
+class OnlineMetricsTest(unittest.TestCase):
+    def assertMetricsClose(self, got: dict, expected: dict) -> None:
+        self.assertEqual(got.keys(), expected.keys())
+        for key, value in expected.items():
+            self.assertAlmostEqual(got[key], value, delta=1e-9 * max(1.0, abs(value)), msg=key)
+
+    def test_streaming_matches_batch_metrics(self) -> None:
+        equity, trades = _random_run(5)
+        trades.sort(key=lambda item: item.entry_time)
+        online = OnlineMetrics(10_000.0)
+        report = OnlineReportMetrics(10_000.0)
+        quarters = OnlineReportMetrics(10_000.0, SegmentSpec.periods("quarter"))
+        for point in equity:
+            quarters.push_equity(point.time, point.equity)
+            online.push_equity(point.time, point.equity)
+            report.push_equity(point.time, point.equity)
+        for trade in trades:
+            online.push_trade(trade)
+            report.push_trade(trade)
+            quarters.push_trade(trade)
+
+        self.assertMetricsClose(online.metrics(), calc_metrics(equity, trades, 10_000.0))
+        overall, segmented, walk_forward = report.report()
+        expected = calc_report_metrics(equity, trades, 10_000.0)
+        self.assertMetricsClose(overall, expected[0])
+        for got_group, expected_group in ((segmented, expected[1]), (walk_forward, expected[2])):
+            self.assertEqual(got_group.keys(), expected_group.keys())
+            for name in expected_group:
+                self.assertMetricsClose(got_group[name], expected_group[name])
+        expected_quarters = calc_segmented_metrics(equity, trades, 10_000.0, SegmentSpec.periods("quarter"))
+        self.assertEqual(quarters.report()[1].keys(), expected_quarters.keys())
+        for name, values in expected_quarters.items():
+            self.assertMetricsClose(quarters.report()[1][name], values)
+
+    def test_rolling_window_matches_metrics_of_the_window(self) -> None:
+        equity, trades = _random_run(6)
+        trades.sort(key=lambda item: item.entry_time)
+        window = timedelta(days=30)
+        rolling = OnlineMetrics(window=window)
+        pending = list(trades)
+        for idx, point in enumerate(equity):
+            rolling.push_equity(point.time, point.equity)
+            while pending and pending[0].entry_time <= point.time:
+                rolling.push_trade(pending.pop(0))
+            if idx % 250 != 249:
+                continue
+            cutoff = point.time - window
+            held = [item for item in equity[: idx + 1] if item.time > cutoff]
+            entered = [item for item in trades if cutoff < item.entry_time <= point.time]
+            self.assertMetricsClose(rolling.metrics(), calc_metrics(held, entered, held[0].equity))
+
+    def test_backtest_without_equity_curve_reports_streamed_metrics(self) -> None:
+        start = datetime(2023, 10, 1, 1, tzinfo=timezone.utc)
+        bars_sub = make_random_walk_bars(start, count=4 * 450, minutes=60, seed=1)
+        bars_main = aggregate_bars(bars_sub, 4)
+        config = BacktestConfig(chan_mode="pragmatic", min_confidence=0.3)
+        full = run_backtest(config, bars_main=bars_main, bars_sub=bars_sub)
+        lean = run_backtest(replace(config, keep_equity_curve=False), bars_main=bars_main, bars_sub=bars_sub)
+
+        self.assertGreater(len(full.trades), 0)
+        self.assertEqual(lean.trades, full.trades)
+        self.assertEqual(lean.equity_curve, full.equity_curve[-1:])
+        self.assertMetricsClose(lean.metrics, full.metrics)
+        for name, values in full.segmented_metrics.items():
+            self.assertMetricsClose(lean.segmented_metrics[name], values)
+        for name, values in full.walk_forward_metrics.items():
+            self.assertMetricsClose(lean.walk_forward_metrics[name], values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,52 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import os
+import random
 import tempfile
 import unittest
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from unittest.mock import patch
 
-from ai_trader.data import cache_path_for, load_ohlcv
+from ai_trader.data import AsyncOHLCVFetcher, CacheJob, cache_path_for, compact_cache, load_ohlcv, warm_cache_async
+from ai_trader.data import binance_ohlcv
+from ai_trader.data.binance_ohlcv import find_missing_ranges, from_ms, legacy_cache_path, store_bars
+from ai_trader.data.manifest import cache_entry, coverage_intervals, missing_from_coverage, verify_cache_dir
+from ai_trader.types import iso_utc
 from tests.test_utils import make_synthetic_bars
 
 
+class _FakeAsyncExchange:
+    """In-memory stand-in for a ``ccxt.async_support`` client."""
+
+    def __init__(self, bars, page_cap: int) -> None:
+        self.rows = [
+            [int(item.time.timestamp() * 1000), item.open, item.high, item.low, item.close, item.volume]
+            for item in bars
+        ]
+        self.page_cap = page_cap
+        self.markets_loaded = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def load_markets(self):
+        self.markets_loaded += 1
+        return {}
+
+    async def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return [row for row in self.rows if row[0] >= since][: min(limit, self.page_cap)]
+
+    async def close(self):
+        self.closed = True
+
+
 class CacheLoaderTest(unittest.TestCase):
     def setUp(self) -> None:
         self._tmp = tempfile.TemporaryDirectory()
@@ -25,7 +61,7 @@ class CacheLoaderTest(unittest.TestCase):
         self._tmp.cleanup()
 
     def _write_cache(self, exchange: str, symbol: str, timeframe: str, bars) -> Path:
-        path = cache_path_for(exchange, symbol, timeframe)
+        path = legacy_cache_path(exchange, symbol, timeframe)
         path.parent.mkdir(parents=True, exist_ok=True)
         with path.open("w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=["time", "open", "high", "low", "close", "volume"])
@@ -68,6 +104,101 @@ class CacheLoaderTest(unittest.TestCase):
                 end_utc=query_end.isoformat().replace("+00:00", "Z"),
             )
 
+    def test_async_warm_fills_gaps_with_one_client_and_concurrent_pages(self) -> None:
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        bars = make_synthetic_bars(start=start, count=600, step_hours=1)
+        self._write_cache("fake", "BTC/USDT", "1h", bars[:50] + bars[300:320])
+        exchange = _FakeAsyncExchange(bars, page_cap=70)
+        fetcher = AsyncOHLCVFetcher(max_in_flight=3, page_limit=100, clients={"fake": exchange})
+        query_start = (bars[0].time + timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+        query_end = (bars[-1].time + timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+        job = CacheJob("fake", "BTC/USDT", "1h", query_start, query_end)
+
+        async def warm():
+            async with fetcher:
+                return await warm_cache_async([job, job], fetcher=fetcher)
+
+        fetched = asyncio.run(warm())
+        self.assertEqual(fetched, {job: 530})
+        self.assertEqual(exchange.markets_loaded, 1)
+        self.assertTrue(exchange.closed)
+        self.assertGreater(exchange.max_in_flight, 1)
+        self.assertLessEqual(exchange.max_in_flight, 3)
+
+        result = load_ohlcv("fake", "BTC/USDT", "1h", query_start, query_end)
+        self.assertEqual([item.close for item in result], [item.close for item in bars])
+
+    def test_manifest_records_coverage_and_detects_corruption(self) -> None:
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        bars = make_synthetic_bars(start=start, count=40, step_hours=4)
+        directory = cache_path_for("unknown_exchange", "BTC/USDT", "4h")
+        (path,) = store_bars(directory, bars[:10] + bars[12:40], "4h")
+
+        entry = cache_entry(path)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.bars, 38)
+        self.assertEqual(len(entry.coverage), 2)
+        self.assertEqual(verify_cache_dir(directory), [])
+
+        # Fully covered windows are served on the manifest's word.
+        window = load_ohlcv(
+            "unknown_exchange",
+            "BTC/USDT",
+            "4h",
+            (bars[13].time + timedelta(hours=4)).isoformat(),
+            (bars[39].time + timedelta(hours=4)).isoformat(),
+        )
+        self.assertEqual(len(window), 27)
+
+        data = path.read_bytes()
+        path.write_bytes(data.replace(b"20", b"21", 1))
+        self.assertIsNone(cache_entry(path))
+        self.assertEqual([issue.problem for issue in verify_cache_dir(directory)], ["checksum mismatch"])
+
+    def test_chunked_cache_reads_only_overlapping_months(self) -> None:
+        start = datetime(2023, 11, 1, tzinfo=timezone.utc)
+        bars = make_synthetic_bars(start=start, count=6 * 540, step_hours=4)
+        legacy = self._write_cache("unknown_exchange", "BTC/USDT", "4h", bars)
+        full_start = iso_utc(bars[0].time + timedelta(hours=4))
+        full_end = iso_utc(bars[-1].time + timedelta(hours=4))
+        query_start = datetime(2024, 3, 10, tzinfo=timezone.utc)
+        query_end = datetime(2024, 4, 9, tzinfo=timezone.utc)
+
+        load_ohlcv("unknown_exchange", "BTC/USDT", "4h", full_start, full_end)
+        self.assertFalse(legacy.exists())
+        with patch.object(binance_ohlcv, "read_bars_csv", wraps=binance_ohlcv.read_bars_csv) as read:
+            result = load_ohlcv("unknown_exchange", "BTC/USDT", "4h", iso_utc(query_start), iso_utc(query_end))
+        self.assertEqual([call.args[0].name for call in read.call_args_list], ["2024-03.csv", "2024-04.csv"])
+        self.assertEqual(len(result), 30 * 6 + 1)
+        self.assertEqual(result[0].time, query_start)
+
+        directory = cache_path_for("unknown_exchange", "BTC/USDT", "4h")
+        compacted = compact_cache("unknown_exchange", "BTC/USDT", "4h")
+        self.assertEqual([path.name for path in compacted], ["2023.csv", "2024.csv"])
+        self.assertEqual(
+            sorted(path.name for path in directory.glob("*.csv")),
+            ["2023.csv", "2024.csv", "2025-01.csv", "2025-02.csv", "2025-03.csv", "2025-04.csv"],
+        )
+        self.assertEqual(verify_cache_dir(directory), [])
+        every = load_ohlcv("unknown_exchange", "BTC/USDT", "4h", full_start, full_end)
+        self.assertEqual([item.close for item in every], [item.close for item in bars])
+
+    def test_missing_from_coverage_matches_bar_scan(self) -> None:
+        rng = random.Random(4)
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        step_ms = 3600 * 1000
+        for trial in range(200):
+            bars = [item for item in make_synthetic_bars(start=start, count=60, step_hours=1) if rng.random() < 0.8]
+            coverage = coverage_intervals(bars, step_ms)
+            base = int(start.timestamp() * 1000)
+            lo = base + rng.randrange(-5, 65) * step_ms + rng.choice((0, 0, 0, 1800 * 1000))
+            hi = lo + rng.randrange(-2, 70) * step_ms + rng.choice((0, 0, 600 * 1000))
+            with self.subTest(trial=trial):
+                self.assertEqual(
+                    missing_from_coverage(coverage, lo, hi, step_ms),
+                    find_missing_ranges(bars, from_ms(lo), from_ms(hi), "1h"),
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
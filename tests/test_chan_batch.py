@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import random
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from ai_trader.chan.core.batch import (
+    bar_arrays,
+    bars_from_merged_arrays,
+    detect_fractal_arrays,
+    fractals_from_arrays,
+    merge_inclusion_arrays,
+    ohlcv_arrays,
+)
+from ai_trader.chan.core.center import build_zhongshus_from_bis
+from ai_trader.chan.core.fractal import detect_fractals
+from ai_trader.chan.core.include import merge_inclusions, merge_inclusions_with_trace
+from ai_trader.chan.core.segment import build_segments
+from ai_trader.types import Bar, Bi, BiColumns
+
+
+def _random_bars(rng: random.Random, count: int, levels: int) -> list[Bar]:
+    """Bars on a coarse price grid so equal highs/lows are common."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    bars: list[Bar] = []
+    for i in range(count):
+        low = float(rng.randrange(levels))
+        high = low + float(rng.randrange(0, 4))
+        bars.append(
+            Bar(
+                time=start + timedelta(minutes=5 * i),
+                open=low,
+                high=high,
+                low=low,
+                close=high,
+                volume=float(rng.randrange(1, 10)),
+            )
+        )
+    return bars
+
+
+class ChanBatchKernelTest(unittest.TestCase):
+    def test_fractal_kernel_matches_reference_on_random_data(self) -> None:
+        rng = random.Random(11)
+        for trial in range(200):
+            raw = _random_bars(rng, count=rng.randrange(0, 80), levels=rng.choice((3, 6, 50)))
+            for bars in (raw, merge_inclusions(raw)):
+                high, low = bar_arrays(bars)
+                for allow_equal in (False, True):
+                    with self.subTest(trial=trial, allow_equal=allow_equal, count=len(bars)):
+                        arrays = detect_fractal_arrays(high, low, allow_equal=allow_equal)
+                        expected = detect_fractals(bars, allow_equal=allow_equal)
+                        self.assertEqual(fractals_from_arrays(bars, arrays), expected)
+                        self.assertEqual(int(arrays.top.sum() + arrays.bottom.sum()), len(expected))
+                        self.assertFalse(np.any(arrays.top & arrays.bottom))
+
+    def test_merge_kernel_matches_reference_on_random_data(self) -> None:
+        rng = random.Random(5)
+        for trial in range(200):
+            raw = _random_bars(rng, count=rng.randrange(0, 80), levels=rng.choice((3, 6, 50)))
+            with self.subTest(trial=trial, count=len(raw)):
+                merged = merge_inclusion_arrays(*ohlcv_arrays(raw))
+                expected, traces = merge_inclusions_with_trace(raw)
+                self.assertEqual(bars_from_merged_arrays(raw, merged), expected)
+                self.assertEqual(merged.direction.tolist(), [item.direction for item in traces])
+                self.assertEqual(
+                    merged.raw_to_merged.tolist(),
+                    [trace.merged_index for trace in traces for _ in trace.raw_indices],
+                )
+
+    def test_bi_columns_feed_segment_and_center_builders(self) -> None:
+        rng = random.Random(3)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        price = 100.0
+        bis: list[Bi] = []
+        for i in range(400):
+            direction = "up" if i % 2 == 0 else "down"
+            end_price = price + rng.randrange(1, 6) * (1 if direction == "up" else -1)
+            bis.append(
+                Bi(
+                    direction=direction,
+                    start_index=5 * i,
+                    end_index=5 * (i + 1),
+                    start_price=price,
+                    end_price=float(end_price),
+                    event_time=start + timedelta(hours=i),
+                    available_time=start + timedelta(hours=i + 1),
+                )
+            )
+            price = end_price
+
+        columns = BiColumns.from_bis(bis)
+        self.assertEqual(columns.high, [max(item.start_price, item.end_price) for item in bis])
+        self.assertEqual(build_segments(columns), build_segments(bis))
+        self.assertEqual(build_zhongshus_from_bis(columns), build_zhongshus_from_bis(bis))
+        self.assertGreater(len(build_segments(bis)), 3)
+
+        moved = replace(bis[0], end_price=bis[0].start_price + 50.0)
+        self.assertEqual((moved.high, moved.low), (bis[0].start_price + 50.0, bis[0].start_price))
+
+    def test_fractal_kernel_rejects_mismatched_arrays(self) -> None:
+        with self.assertRaises(ValueError):
+            detect_fractal_arrays(np.zeros(5), np.zeros(4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,10 @@ from __future__ import annotations
 import unittest
 from dataclasses import replace
 from datetime import datetime, timezone
+from unittest.mock import patch
 
-from ai_trader.backtest.engine import run_backtest
+from ai_trader.backtest.engine import run_backtest, run_cost_scenarios
+from ai_trader.backtest.execution import BenchmarkReturnPool
 from ai_trader.types import BacktestConfig
 from tests.test_utils import make_synthetic_bars
 
@@ -23,6 +25,17 @@ class CostConsistencyTest(unittest.TestCase):
 
         self.assertLessEqual(costed_report.metrics["total_return"], no_cost_report.metrics["total_return"] + 1e-12)
 
+    def test_cost_scenarios_share_one_benchmark_pool(self) -> None:
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        bars_main = make_synthetic_bars(start=start, count=260, step_hours=4)
+        bars_sub = make_synthetic_bars(start=start, count=1040, step_hours=1)
+        config = BacktestConfig()
+
+        with patch.object(BenchmarkReturnPool, "from_bars", wraps=BenchmarkReturnPool.from_bars) as from_bars:
+            reports = run_cost_scenarios(config, bars_main, bars_sub)
+        self.assertEqual(from_bars.call_count, 1)
+        self.assertEqual(reports["base"].trades, run_backtest(config, bars_main=bars_main, bars_sub=bars_sub).trades)
+
 
 if __name__ == "__main__":
     unittest.main()
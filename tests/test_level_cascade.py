@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timezone
+
+from ai_trader.chan import build_chan_state, generate_signal
+from ai_trader.chan.cascade import LevelCascade
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.core.center import build_zhongshus_from_bis
+from ai_trader.indicators import MACDAccumulator, MACDView, compute_macd
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+class LevelCascadeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Close times: the first 15m bar closes at 00:15.
+        start = datetime(2024, 1, 1, 0, 15, tzinfo=timezone.utc)
+        self.bars_15m = make_random_walk_bars(start, count=4 * 4 * 160, minutes=15)
+        self.cfg = get_chan_config("orthodox_chan")
+
+    def test_macd_accumulator_matches_batch(self) -> None:
+        acc = MACDAccumulator()
+        points = [acc.push(bar) for bar in self.bars_15m[:300]]
+        self.assertEqual(points, compute_macd(self.bars_15m[:300]))
+        self.assertEqual(acc.count, 300)
+
+    def test_macd_view_matches_list_slicing(self) -> None:
+        points = compute_macd(self.bars_15m[:300])
+        view = MACDView(points, 40, 260)
+        self.assertEqual(view, points[40:260])
+        self.assertEqual(view[10:-5], points[50:255])
+        self.assertEqual(view[-1], points[259])
+        self.assertIs(view[5:20][3], points[48])
+
+        t0, t1 = points[100].time, points[180].time
+        self.assertEqual(view.asof(t1), [p for p in points[40:260] if p.time <= t1])
+        self.assertEqual(view.window(t0, t1), [p for p in points[40:260] if t0 <= p.time <= t1])
+        self.assertEqual(view.before(t0, 50), [p for p in points[40:260] if p.time < t0][-50:])
+        self.assertEqual(len(view.window(t1, t0)), 0)
+
+    def test_pair_snapshot_matches_independent_build(self) -> None:
+        cascade = LevelCascade(("4h", "1h", "15m"), chan_config=self.cfg)
+        cascade.extend(self.bars_15m)
+
+        bars_4h = aggregate_bars(self.bars_15m, 4)
+        bars_1h = aggregate_bars(self.bars_15m, 1)
+        self.assertEqual(cascade.bars("4h"), bars_4h)
+        self.assertEqual(cascade.bars("1h"), bars_1h)
+
+        expected = build_chan_state(
+            bars_main=bars_4h,
+            bars_sub=bars_1h,
+            macd_main=None,
+            macd_sub=None,
+            asof_time=self.bars_15m[-1].time,
+            chan_config=self.cfg,
+        )
+        actual = cascade.snapshot("4h")
+        self.assertGreater(len(actual.bis_main), 3)
+        self.assertEqual(actual.bis_main, expected.bis_main)
+        self.assertEqual(actual.bis_sub, expected.bis_sub)
+        self.assertEqual(actual.zhongshus_main, expected.zhongshus_main)
+        self.assertEqual(actual.macd_main, expected.macd_main)
+        self.assertEqual(actual.previous_main_bar_time, expected.previous_main_bar_time)
+        self.assertEqual(
+            cascade.decision("4h").to_contract_dict(),
+            generate_signal(expected, chan_config=self.cfg).to_contract_dict(),
+        )
+
+    def test_centers_carried_across_closes_match_a_batch_build(self) -> None:
+        cascade = LevelCascade(("4h", "1h"), chan_config=self.cfg, max_bars={"1h": 300})
+        checked = 0
+        for bar in aggregate_bars(self.bars_15m, 1):
+            if "4h" not in cascade.push(bar):
+                continue
+            for timeframe in ("4h", "1h"):
+                structure = cascade.structure(timeframe)
+                self.assertEqual(structure.zhongshus, build_zhongshus_from_bis(structure.bis))
+            checked += 1
+        self.assertGreater(checked, 100)
+
+    def test_levels_are_built_once_and_only_rebuilt_on_close(self) -> None:
+        cascade = LevelCascade(chan_config=self.cfg)
+        cascade.extend(self.bars_15m[:-1])
+
+        cascade.snapshot("4h", "1h")
+        cascade.snapshot("1h", "15m")
+        builds = cascade.structure_builds()
+        self.assertEqual(builds["1h"], 1)
+        self.assertEqual(builds["1d"], 0)
+
+        # The final 15m bar closes 1h and 4h bars, but no 1d bar.
+        closed = cascade.push(self.bars_15m[-1])
+        self.assertEqual(closed, ["15m", "1h", "4h"])
+        cascade.snapshot("4h", "1h")
+        builds = cascade.structure_builds()
+        self.assertEqual(builds["4h"], 2)
+        self.assertEqual(builds["15m"], 1)
+
+        with self.assertRaises(ValueError):
+            cascade.push(self.bars_15m[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
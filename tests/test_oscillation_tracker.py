@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from ai_trader.chan import build_chan_state
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.core.trend_phase import OscillationTracker
+from ai_trader.chan.engine import analyze_level
+from ai_trader.indicators import MACDView, compute_macd
+from ai_trader.types import Segment, Zhongshu
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+class OscillationTrackerTest(unittest.TestCase):
+    def _compare_windows(self, cfg, seed: int, main_window: int) -> int:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        bars_sub = make_random_walk_bars(start, count=4 * 400, minutes=60, seed=seed)
+        bars_main = aggregate_bars(bars_sub, 4)
+        macd_main = compute_macd(bars_main)
+        macd_sub = compute_macd(bars_sub)
+        trackers = {"main": OscillationTracker(), "sub": OscillationTracker()}
+
+        compared = 0
+        sub_cursor = 0
+        for i in range(60, len(bars_main)):
+            asof = bars_main[i].time
+            while sub_cursor < len(bars_sub) and bars_sub[sub_cursor].time <= asof:
+                sub_cursor += 1
+            main_start = max(0, i + 1 - main_window)
+            sub_start = max(0, sub_cursor - 4 * main_window)
+            kwargs = dict(
+                bars_main=bars_main[main_start : i + 1],
+                bars_sub=bars_sub[sub_start:sub_cursor],
+                macd_main=MACDView(macd_main, main_start, i + 1),
+                macd_sub=MACDView(macd_sub, sub_start, sub_cursor),
+                asof_time=asof,
+                chan_config=cfg,
+            )
+            tracked = build_chan_state(oscillation_trackers=trackers, **kwargs)
+            fresh = build_chan_state(**kwargs)
+            self.assertEqual(
+                tracked.market_state_main.oscillation_state,
+                fresh.market_state_main.oscillation_state,
+                asof,
+            )
+            tracked_sub = analyze_level(tracked, "sub", 0.1, cfg).market_state
+            fresh_sub = analyze_level(fresh, "sub", 0.1, cfg).market_state
+            if fresh_sub is not None:
+                self.assertEqual(tracked_sub.oscillation_state, fresh_sub.oscillation_state, asof)
+                compared += int(fresh_sub.oscillation_state["count"] > 0)
+        return compared
+
+    def test_tracked_state_matches_full_rebuild_with_sliding_window(self) -> None:
+        cfg = get_chan_config("pragmatic")
+        for seed in (1, 4):
+            self.assertGreater(self._compare_windows(cfg, seed, main_window=150), 0)
+
+    def test_tracked_state_matches_full_rebuild_on_summary_snapshots(self) -> None:
+        cfg = replace(get_chan_config("pragmatic"), snapshot_mode="summary")
+        self.assertGreater(self._compare_windows(cfg, 2, main_window=400), 0)
+
+    def test_window_keeps_the_last_nine_zn_values(self) -> None:
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        center = Zhongshu(zd=90.0, zg=110.0, start_index=0, end_index=3, event_time=t0, available_time=t0)
+        segments = [
+            Segment(
+                direction="up" if k % 2 else "down",
+                start_index=k,
+                end_index=k + 1,
+                high=105.0 + k,
+                low=95.0 + k,
+                event_time=t0.replace(day=2 + k),
+                available_time=t0.replace(day=2 + k),
+            )
+            for k in range(12)
+        ]
+        tracker = OscillationTracker()
+        for size in range(1, len(segments) + 1):
+            tracker.update(segments[:size], center)
+        state = tracker.state(center, "current_center")
+        self.assertEqual(list(tracker.zn_values), [100.0 + k for k in range(3, 12)])
+        self.assertEqual(state["count"], 9)
+        self.assertEqual(state["total_count"], 12)
+        self.assertTrue(state["limit_reached"])
+        self.assertEqual(state["direction"], "rising")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ai_trader.backtest.engine import run_backtest
+from ai_trader.live import PaperTrader, ReplayFileFeed, parse_bar_message, run_paper_daemon
+from ai_trader.types import BacktestConfig, Bar, iso_utc
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+def _execution_fields(trade) -> tuple:
+    row = trade.to_dict()
+    row.pop("forward_3bar_return")
+    row.pop("benchmark_return")
+    return tuple(sorted(row.items()))
+
+
+class PaperTraderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.config = BacktestConfig(chan_mode="pragmatic", min_confidence=0.3)
+        # Close times of 1h bars; 4h buckets close on epoch multiples.
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        self.bars_sub = make_random_walk_bars(start, count=4 * 450, minutes=60, seed=1)
+        self.bars_main = aggregate_bars(self.bars_sub, 4)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write_replay(self, bars: list[Bar]) -> Path:
+        path = self.root / "1h.csv"
+        with path.open("w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "open", "high", "low", "close", "volume"])
+            writer.writeheader()
+            for bar in bars:
+                row = bar.to_dict()
+                row["time"] = iso_utc(bar.time - timedelta(hours=1))
+                writer.writerow(row)
+        return path
+
+    def test_replay_matches_backtest_and_survives_restart(self) -> None:
+        report = run_backtest(self.config, bars_main=self.bars_main, bars_sub=self.bars_sub)
+        self.assertGreater(len(report.trades), 0)
+
+        path = self._write_replay(self.bars_sub)
+        state_path = self.root / "state.pkl"
+        half = self.bars_sub[len(self.bars_sub) // 2].time
+
+        events = []
+        first = PaperTrader(self.config)
+        asyncio.run(
+            run_paper_daemon(
+                first,
+                ReplayFileFeed(path, "1h", end_utc=iso_utc(half)),
+                state_path=state_path,
+                on_decision=events.append,
+            )
+        )
+        self.assertEqual(first.asof_time, half)
+
+        # The restarted daemon replays the whole file; consumed bars are skipped.
+        resumed = PaperTrader.load(state_path)
+        asyncio.run(
+            run_paper_daemon(resumed, ReplayFileFeed(path, "1h"), state_path=state_path, on_decision=events.append)
+        )
+
+        # The backtest leaves the last bar unevaluated; the daemon decides on it.
+        self.assertEqual(len(events), len(report.signals) + 1)
+        self.assertEqual(
+            [event.decision.to_contract_dict()["action"] for event in events[:-1]],
+            [item["action"] for item in report.signals],
+        )
+        self.assertEqual(
+            [_execution_fields(item) for item in resumed.trades],
+            [_execution_fields(item) for item in report.trades],
+        )
+        self.assertEqual(resumed.simulator.state.equity_curve, report.equity_curve[-1:])
+        self.assertEqual(resumed.metrics.metrics()["trade_count"], report.metrics["trade_count"])
+        self.assertAlmostEqual(resumed.metrics.metrics()["total_return"], report.metrics["total_return"], places=12)
+        self.assertTrue(all(event.latency_ms >= 0 for event in events))
+
+    def test_main_bar_history_is_trimmed_to_the_lookback(self) -> None:
+        config = replace(self.config, structure_lookback_main_bars=150, structure_lookback_sub_bars=600)
+        report = run_backtest(config, bars_main=self.bars_main, bars_sub=self.bars_sub)
+        self.assertGreater(len(report.trades), 0)
+
+        trader = PaperTrader(config)
+        for bar in self.bars_sub:
+            trader.on_bar(bar)
+        self.assertEqual(len(trader.bars_main), len(self.bars_main))
+        self.assertGreater(trader.bars_main.offset, 0)
+        self.assertLessEqual(len(trader.bars_main.bars), 150 + 3 + 1)
+        self.assertEqual(trader.bars_main[-1], self.bars_main[-1])
+        self.assertEqual(
+            [_execution_fields(item) for item in trader.trades],
+            [_execution_fields(item) for item in report.trades],
+        )
+
+    def test_parse_bar_message_shifts_to_close_time(self) -> None:
+        row = {"time": "2024-01-01T00:00:00Z", "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 3}
+        kline = {"e": "kline", "k": {"t": 1704067200000, "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "3", "x": True}}
+        expected = Bar(time=datetime(2024, 1, 1, 1, tzinfo=timezone.utc), open=1, high=2, low=0.5, close=1.5, volume=3)
+        self.assertEqual(parse_bar_message(row, "1h"), expected)
+        self.assertEqual(parse_bar_message(kline, "1h"), expected)
+        kline["k"]["x"] = False
+        self.assertIsNone(parse_bar_message(kline, "1h"))
+
+
+if __name__ == "__main__":
+    unittest.main()
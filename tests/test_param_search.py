@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from ai_trader.backtest import engine
+from ai_trader.backtest.search import rolling_walk_forward_folds, run_parameter_search
+from ai_trader.types import BacktestConfig
+from tests.test_utils import make_synthetic_bars
+
+
+class ParameterSearchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        self.bars_main = make_synthetic_bars(start=start, count=260, step_hours=4)
+        self.bars_sub = make_synthetic_bars(start=start, count=1040, step_hours=1)
+        self.folds = rolling_walk_forward_folds(
+            "2022-01-21T00:00:00Z",
+            "2022-02-10T00:00:00Z",
+            train_days=5,
+            test_days=5,
+        )
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_rolling_folds_tile_test_windows(self) -> None:
+        self.assertEqual(len(self.folds), 3)
+        for prev, cur in zip(self.folds, self.folds[1:]):
+            self.assertEqual(prev.test_end, cur.test_start)
+        self.assertLessEqual(
+            self.folds[-1].test_end, datetime(2022, 2, 10, tzinfo=timezone.utc)
+        )
+
+    def test_grid_search_shares_structure_streams_and_reuses_disk_cache(self) -> None:
+        space = {
+            "chan.min_stroke_bars": [4, 5],
+            "drawdown_reduce_threshold": [0.10, 0.12],
+        }
+        with patch(
+            "ai_trader.backtest.engine.build_chan_state",
+            wraps=engine.build_chan_state,
+        ) as build_spy:
+            first = run_parameter_search(
+                BacktestConfig(),
+                space,
+                bars_main=self.bars_main,
+                bars_sub=self.bars_sub,
+                folds=self.folds[:2],
+                cache_dir=self._tmp.name,
+            )
+            builds_after_first = build_spy.call_count
+            second = run_parameter_search(
+                BacktestConfig(),
+                space,
+                bars_main=self.bars_main,
+                bars_sub=self.bars_sub,
+                folds=self.folds[:2],
+                cache_dir=self._tmp.name,
+            )
+
+        # 2 structure variants x 2 folds; drawdown settings reuse the streams.
+        self.assertEqual(first.structure_builds, 4)
+        self.assertEqual(second.structure_builds, 0)
+        self.assertEqual(build_spy.call_count, builds_after_first)
+        self.assertEqual(len(first.trials), 4)
+        scores = [item.score for item in first.trials]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(
+            [item.to_row() for item in first.trials],
+            [item.to_row() for item in second.trials],
+        )
+
+    def test_successive_halving_widens_folds_for_survivors(self) -> None:
+        result = run_parameter_search(
+            BacktestConfig(),
+            {"macd_divergence_threshold": [0.05, 0.10, 0.15, 0.20]},
+            bars_main=self.bars_main,
+            bars_sub=self.bars_sub,
+            folds=self.folds,
+            strategy="successive_halving",
+            n_trials=4,
+            eta=2,
+            cache_dir=self._tmp.name,
+        )
+
+        self.assertEqual(len(result.trials), 4)
+        self.assertEqual(result.trials[0].folds_evaluated, len(self.folds))
+        self.assertEqual(
+            sorted(item.folds_evaluated for item in result.trials), [1, 1, 2, 3]
+        )
+        self.assertEqual(result.to_rows()[0]["rank"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.range_index import BarRangeIndex
+from ai_trader.types import Bar
+
+
+class BarRangeIndexTest(unittest.TestCase):
+    def test_queries_match_linear_scans(self) -> None:
+        rng = random.Random(7)
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for trial in range(200):
+            bars = []
+            for i in range(rng.randrange(0, 70)):
+                low = rng.uniform(90.0, 110.0)
+                bars.append(Bar(time=t0 + timedelta(hours=i), open=low, high=low + rng.uniform(0.0, 5.0), low=low, close=low))
+            index = BarRangeIndex.from_bars(bars)
+            for _ in range(10):
+                after = t0 + timedelta(hours=rng.randrange(-1, len(bars) + 2))
+                until = t0 + timedelta(hours=rng.randrange(-1, len(bars) + 2))
+                window = [bar for bar in bars if after < bar.time <= until]
+                lo, hi = index.span(after, until)
+                price = rng.uniform(88.0, 112.0)
+                start = rng.randrange(0, len(bars) + 1)
+                with self.subTest(trial=trial):
+                    self.assertEqual(index.min_low(lo, hi), min((bar.low for bar in window), default=None))
+                    self.assertEqual(index.max_high(lo, hi), max((bar.high for bar in window), default=None))
+                    self.assertEqual(
+                        index.first_low_at_or_below(price, start),
+                        next((i for i in range(start, len(bars)) if bars[i].low <= price), None),
+                    )
+                    self.assertEqual(
+                        index.first_high_at_or_above(price, start),
+                        next((i for i in range(start, len(bars)) if bars[i].high >= price), None),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import unittest
+from dataclasses import replace
 from datetime import datetime, timezone
 
 from ai_trader.backtest.engine import run_backtest
@@ -17,6 +18,15 @@ class RepaintRateTest(unittest.TestCase):
         report = run_backtest(config=BacktestConfig(), bars_main=bars_main, bars_sub=bars_sub)
         self.assertEqual(report.signal_repaint_rate, 0.0)
 
+    def test_enabled_repaint_check_runs(self) -> None:
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        bars_main = make_synthetic_bars(start=start, count=160, step_hours=4)
+        bars_sub = make_synthetic_bars(start=start, count=640, step_hours=1)
+
+        config = replace(BacktestConfig(), check_signal_repaint=True)
+        report = run_backtest(config=config, bars_main=bars_main, bars_sub=bars_sub)
+        self.assertEqual(report.signal_repaint_rate, 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
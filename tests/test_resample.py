@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.data import cache_path_for, load_ohlcv, resample_bars
+from ai_trader.data.binance_ohlcv import legacy_cache_path
+from ai_trader.types import Bar, iso_utc
+from tests.test_utils import make_synthetic_bars
+
+
+def _naive_resample(bars: list[Bar], hours: int) -> list[Bar]:
+    groups: dict[datetime, list[Bar]] = {}
+    for bar in bars:
+        key = bar.time.replace(hour=bar.time.hour - bar.time.hour % hours)
+        groups.setdefault(key, []).append(bar)
+    return [
+        Bar(
+            time=key,
+            open=items[0].open,
+            high=max(item.high for item in items),
+            low=min(item.low for item in items),
+            close=items[-1].close,
+            volume=sum(item.volume for item in items),
+        )
+        for key, items in sorted(groups.items())
+        if len(items) == hours
+    ]
+
+
+class ResampleTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._old_env = {key: os.environ.get(key) for key in ("AI_TRADER_DATA_DIR",)}
+        os.environ["AI_TRADER_DATA_DIR"] = self._tmp.name
+        # Open times; the first bar opens mid-bucket so the partial bucket is dropped.
+        self.start = datetime(2025, 1, 1, 2, tzinfo=timezone.utc)
+        self.bars_1h = make_synthetic_bars(start=self.start, count=24 * 10, step_hours=1)
+
+    def tearDown(self) -> None:
+        for key, value in self._old_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._tmp.cleanup()
+
+    def _write_cache(self, timeframe: str, bars: list[Bar]) -> None:
+        path = legacy_cache_path("unknown_exchange", "BTC/USDT", timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "open", "high", "low", "close", "volume"])
+            writer.writeheader()
+            for bar in bars:
+                writer.writerow(bar.to_dict())
+
+    def test_resample_matches_naive_and_drops_incomplete_buckets(self) -> None:
+        bars = [bar for i, bar in enumerate(self.bars_1h) if i != 50]
+        result = resample_bars(bars, "1h", "4h")
+        self.assertEqual(result, _naive_resample(bars, 4))
+        self.assertEqual(result[0].time, datetime(2025, 1, 1, 4, tzinfo=timezone.utc))
+        self.assertNotIn(datetime(2025, 1, 3, 4, tzinfo=timezone.utc), [bar.time for bar in result])
+
+        daily = resample_bars(self.bars_1h, "1h", "1d")
+        self.assertEqual(len(daily), 9)
+        self.assertTrue(all(bar.time.hour == 0 for bar in daily))
+
+        with self.assertRaises(ValueError):
+            resample_bars(bars, "4h", "1h")
+
+    def test_derived_timeframe_is_materialized_lazily(self) -> None:
+        self._write_cache("1h", self.bars_1h)
+        query_start = iso_utc(datetime(2025, 1, 2, tzinfo=timezone.utc))
+        query_end = iso_utc(datetime(2025, 1, 8, tzinfo=timezone.utc))
+
+        result = load_ohlcv("unknown_exchange", "BTC/USDT", "4h", query_start, query_end, base_timeframe="1h")
+        expected = _naive_resample(self.bars_1h, 4)
+        expected = [
+            Bar(
+                time=bar.time + timedelta(hours=4),
+                open=bar.open,
+                high=bar.high,
+                low=bar.low,
+                close=bar.close,
+                volume=bar.volume,
+            )
+            for bar in expected
+            if query_start <= iso_utc(bar.time + timedelta(hours=4)) <= query_end
+        ]
+        self.assertEqual(result, expected)
+        self.assertTrue(cache_path_for("unknown_exchange", "BTC/USDT", "4h").exists())
+
+        # Second load is served from the derived cache without the base file.
+        shutil.rmtree(cache_path_for("unknown_exchange", "BTC/USDT", "1h"))
+        again = load_ohlcv("unknown_exchange", "BTC/USDT", "4h", query_start, query_end, base_timeframe="1h")
+        self.assertEqual(again, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
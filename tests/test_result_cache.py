@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from ai_trader.backtest import engine
+from ai_trader.backtest.engine import cached_decision_stream, decision_stream_key, run_backtest
+from ai_trader.result_cache import ResultCache, bars_fingerprint, result_cache_key
+from ai_trader.types import BacktestConfig
+from tests.test_utils import make_synthetic_bars
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_key_depends_on_bar_content_and_params(self) -> None:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        bars = make_synthetic_bars(start=start, count=50, step_hours=4)
+        edited = list(bars)
+        edited[10] = replace(edited[10], close=edited[10].close + 1.0)
+
+        base = result_cache_key("demo", bars_fingerprint(bars), threshold=0.1)
+        self.assertEqual(base, result_cache_key("demo", bars_fingerprint(bars), threshold=0.1))
+        self.assertNotEqual(base, result_cache_key("demo", bars_fingerprint(edited), threshold=0.1))
+        self.assertNotEqual(base, result_cache_key("demo", bars_fingerprint(bars), threshold=0.2))
+
+    def test_lru_eviction_keeps_recently_read_entries(self) -> None:
+        payload = b"x" * 1000
+        cache = ResultCache(self.root, max_bytes=10**9)
+        for idx, key in enumerate(("aa01", "bb02", "cc03")):
+            path = cache.put(key, payload)
+            os.utime(path, (1000 + idx, 1000 + idx))
+
+        self.assertEqual(cache.get("aa01"), payload)  # refreshes aa01
+        cache.max_bytes = 2 * cache.path_for("aa01").stat().st_size
+        removed = cache.evict()
+
+        self.assertEqual(removed, 1)
+        self.assertNotIn("bb02", cache)
+        self.assertIn("aa01", cache)
+        self.assertIn("cc03", cache)
+
+    def test_corrupt_entry_is_dropped(self) -> None:
+        cache = ResultCache(self.root)
+        path = cache.path_for("dead")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not a pickle")
+        self.assertIsNone(cache.get("dead"))
+        self.assertFalse(path.exists())
+
+    def test_cached_decision_stream_skips_structure_on_hit(self) -> None:
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        bars_main = make_synthetic_bars(start=start, count=160, step_hours=4)
+        bars_sub = make_synthetic_bars(start=start, count=640, step_hours=1)
+        config = BacktestConfig()
+        cache = ResultCache(self.root)
+
+        first = cached_decision_stream(config, bars_main, bars_sub, cache=cache)
+        with patch(
+            "ai_trader.backtest.engine.build_chan_state",
+            wraps=engine.build_chan_state,
+        ) as build_spy:
+            second = cached_decision_stream(config, bars_main, bars_sub, cache=cache)
+        self.assertEqual(build_spy.call_count, 0)
+        self.assertEqual(len(first), len(second))
+        self.assertEqual(second[-1].summary["bars_main"], first[-1].summary["bars_main"])
+
+        # Execution-only settings share the key; structure settings do not.
+        self.assertEqual(
+            decision_stream_key(config, bars_main, bars_sub),
+            decision_stream_key(replace(config, fee_rate=0.002), bars_main, bars_sub),
+        )
+        self.assertNotEqual(
+            decision_stream_key(config, bars_main, bars_sub),
+            decision_stream_key(replace(config, min_confidence=0.7), bars_main, bars_sub),
+        )
+
+        cached = run_backtest(config, bars_main=bars_main, bars_sub=bars_sub, decision_stream=second)
+        fresh = run_backtest(config, bars_main=bars_main, bars_sub=bars_sub)
+        self.assertEqual(cached.metrics, fresh.metrics)
+        self.assertEqual(cached.signals, fresh.signals)
+
+
+if __name__ == "__main__":
+    unittest.main()
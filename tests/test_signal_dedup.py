@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.dedup import SignalEventStore, TurningGuardBook
+from ai_trader.chan.engine import _expire_turning_signal_guards, suppress_seen_signal_events
+from ai_trader.types import Action, DataQuality, MarketState, Risk, Signal, SignalDecision
+
+
+def _decision(signals: list[Signal]) -> SignalDecision:
+    return SignalDecision(
+        exchange="binance",
+        symbol="BTC/USDT",
+        timeframe_main="4h",
+        timeframe_sub="1h",
+        data_quality=DataQuality(status="ok", notes=""),
+        market_state=MarketState(trend_type="up"),
+        signals=signals,
+        action=Action(decision="buy", reason="buy"),
+        risk=Risk(conflict_level="low", notes=""),
+        cn_summary="buy",
+    )
+
+
+def _signal(kind: str, event_time: datetime, available_time: datetime, anchor=None) -> Signal:
+    return Signal(
+        type=kind,
+        level="main",
+        trigger=kind,
+        invalid_if="",
+        confidence=0.9,
+        event_time=event_time,
+        available_time=available_time,
+        anchor_center_start_index=None if anchor is None else anchor[0],
+        anchor_center_end_index=None if anchor is None else anchor[1],
+        anchor_center_available_time=None if anchor is None else anchor[2],
+    )
+
+
+class SignalDedupTest(unittest.TestCase):
+    def test_event_store_evicts_by_age(self) -> None:
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store = SignalEventStore(max_age=timedelta(days=30))
+        for day in range(100):
+            store.add(("B2", "main", day), t0 + timedelta(days=day))
+        self.assertNotIn(("B2", "main", 60), store)
+        self.assertIn(("B2", "main", 69), store)
+        self.assertEqual(len(store), 31)
+
+        unbounded = SignalEventStore(max_age=None)
+        for day in range(100):
+            unbounded.add(("B2", "main", day), t0 + timedelta(days=day))
+        self.assertEqual(len(unbounded), 100)
+
+    def test_hits_refresh_the_stamp(self) -> None:
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store = SignalEventStore(max_age=timedelta(days=30))
+        store.add(("B2", "main", -1), t0)
+        for day in range(1, 100):
+            store.add(("B2", "main", -1), t0 + timedelta(days=day))
+            store.add(("B2", "main", day), t0 + timedelta(days=day))
+        self.assertIn(("B2", "main", -1), store)
+        self.assertNotIn(("B2", "main", 60), store)
+        self.assertEqual(len(store), 32)
+
+    def test_anchored_keys_are_evicted_by_superseded_center_only(self) -> None:
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store = SignalEventStore(max_age=timedelta(days=1), keep_centers=2)
+        first = ("main", t0)
+        store.add(("B3", "main", 3, 5), t0, first)
+        store.add(("S3", "main", 3, 5), t0, first)
+        store.add(("B3", "main", 8, 10), t0 + timedelta(days=400), ("main", t0 + timedelta(days=300)))
+        self.assertEqual(len(store), 3)
+        store.add(("B3", "sub", 1, 2), t0 + timedelta(days=401), ("sub", t0 + timedelta(days=401)))
+        self.assertEqual(len(store), 4)
+        store.add(("B3", "main", 12, 14), t0 + timedelta(days=402), ("main", t0 + timedelta(days=402)))
+        self.assertNotIn(("B3", "main", 3, 5), store)
+        self.assertNotIn(("S3", "main", 3, 5), store)
+        self.assertEqual(set(store), {("B3", "main", 8, 10), ("B3", "sub", 1, 2), ("B3", "main", 12, 14)})
+
+    def test_default_store_matches_a_set_over_years(self) -> None:
+        # Anchored keys carry no time and recur for as long as their window
+        # indices do; a backtest must keep suppressing them however old.
+        rng = random.Random(11)
+        t0 = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        anchors = [(start, start + 2, t0 + timedelta(days=start)) for start in range(0, 40, 4)]
+        config = get_chan_config("orthodox_chan")
+        plain: set[tuple] = set()
+        store = SignalEventStore()
+        late_suppressed = 0
+        for step in range(6 * 365 * 4):
+            now = t0 + timedelta(hours=4 * step)
+            signals = [
+                _signal("B3", now, now, rng.choice(anchors)),
+                _signal("B2", now - timedelta(hours=4 * rng.randrange(30)), now),
+            ]
+            expected = suppress_seen_signal_events(_decision(signals), plain, config, 0.6).signals
+            got = suppress_seen_signal_events(_decision(signals), store, config, 0.6).signals
+            self.assertEqual(got, expected, step)
+            if now - t0 > timedelta(days=400) and not any(item.type == "B3" for item in expected):
+                late_suppressed += 1
+        self.assertEqual(set(store), plain)
+        self.assertGreater(late_suppressed, 0)
+
+    def test_guard_book_expires_like_a_full_scan(self) -> None:
+        rng = random.Random(3)
+        book = TurningGuardBook()
+        plain: dict[tuple, dict[str, object]] = {}
+        for step in range(2000):
+            key = (rng.choice(("buy", "sell")), rng.randrange(40), rng.randrange(40) + 40)
+            price = round(rng.uniform(90.0, 110.0), 1)
+            for guards in (book, plain):
+                guards.setdefault(key, {"invalid_price": None, "emitted_types": set()})["invalid_price"] = price
+            book.track(key)
+            low = rng.uniform(85.0, 100.0)
+            high = low + rng.uniform(0.0, 25.0)
+            _expire_turning_signal_guards(book, low, high)
+            _expire_turning_signal_guards(plain, low, high)
+            self.assertEqual(dict(book), plain, step)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from ai_trader.chan.cascade import LevelCascade
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.delta import SnapshotDiffer, apply_snapshot_delta, snapshot_structure_index
+from ai_trader.chan.engine import summarize_snapshot
+from tests.test_utils import make_random_walk_bars
+
+
+class SnapshotDeltaTest(unittest.TestCase):
+    def test_deltas_rebuild_every_snapshot_over_a_sliding_window(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        bars = make_random_walk_bars(start, count=4 * 260, minutes=60, seed=3)
+        cascade = LevelCascade(
+            ("4h", "1h"),
+            chan_config=get_chan_config("pragmatic"),
+            max_bars={"4h": 120, "1h": 400},
+        )
+        differ = SnapshotDiffer()
+        index: dict = {}
+        changed_items = 0
+        total_items = 0
+        for bar in bars:
+            if "4h" not in cascade.push(bar):
+                continue
+            snapshot = cascade.snapshot("4h", "1h")
+            delta = differ.diff(snapshot)
+            # Stored deltas are plain JSON.
+            apply_snapshot_delta(index, json.loads(json.dumps(delta.to_dict())))
+            expected = snapshot_structure_index(snapshot)
+            self.assertEqual(
+                {name: items for name, items in index.items() if items},
+                {name: items for name, items in expected.items() if items},
+            )
+            for change in delta.changes.values():
+                changed_items += len(change.added) + len(change.modified) + len(change.removed)
+            total_items += sum(len(items) for items in expected.values())
+
+        # Both windows slide here; ids keyed on bar times keep deltas small.
+        self.assertGreater(total_items, 0)
+        self.assertLess(changed_items * 10, total_items)
+
+    def test_unchanged_snapshot_yields_empty_delta(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        cascade = LevelCascade(("4h", "1h"), chan_config=get_chan_config("pragmatic"))
+        cascade.extend(make_random_walk_bars(start, count=4 * 150, minutes=60, seed=5))
+        snapshot = cascade.snapshot("4h", "1h")
+
+        differ = SnapshotDiffer()
+        first = differ.diff(snapshot)
+        self.assertEqual(
+            {name: len(change.added) for name, change in first.changes.items()},
+            {name: len(items) for name, items in snapshot_structure_index(snapshot).items() if items},
+        )
+        again = differ.diff(snapshot)
+        self.assertFalse(again)
+        self.assertEqual(again.previous_asof_time, snapshot.asof_time)
+
+    def test_summary_items_are_keyed_within_the_kept_bars(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        cascade = LevelCascade(("4h", "1h"), chan_config=get_chan_config("pragmatic"))
+        cascade.extend(make_random_walk_bars(start, count=4 * 200, minutes=60, seed=5))
+        full = cascade.snapshot("4h", "1h")
+        summary = summarize_snapshot(full, 2)
+        self.assertGreater(summary.bar_offset_main, 0)
+
+        full_index = snapshot_structure_index(full)
+        for name, items in snapshot_structure_index(summary).items():
+            for item_id, item in items.items():
+                self.assertEqual(full_index[name][item_id], item)
+
+        # Items from before the kept bars must not wrap to the window's end.
+        with self.assertRaises(ValueError):
+            SnapshotDiffer().diff(replace(summary, bis_main=full.bis_main))
+
+
+if __name__ == "__main__":
+    unittest.main()
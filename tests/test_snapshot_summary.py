@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+from datetime import datetime, timezone
+
+from ai_trader.backtest.engine import run_backtest
+from ai_trader.chan import build_chan_state, generate_signal
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.delta import snapshot_structure_index
+from ai_trader.chan import engine as chan_engine
+from ai_trader.chan.engine import analyze_level, structure_summary
+from ai_trader.indicators import compute_macd
+from ai_trader.types import BacktestConfig
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+class SummarySnapshotTest(unittest.TestCase):
+    def setUp(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        self.bars_sub = make_random_walk_bars(start, count=4 * 450, minutes=60, seed=1)
+        self.bars_main = aggregate_bars(self.bars_sub, 4)
+
+    def test_summary_snapshot_keeps_the_structure_tail(self) -> None:
+        full_cfg = get_chan_config("pragmatic")
+        summary_cfg = replace(full_cfg, snapshot_mode="summary")
+        kwargs = dict(
+            bars_main=self.bars_main,
+            bars_sub=self.bars_sub,
+            macd_main=compute_macd(self.bars_main),
+            macd_sub=compute_macd(self.bars_sub),
+            asof_time=self.bars_main[-1].time,
+        )
+        full = build_chan_state(chan_config=full_cfg, **kwargs)
+        summary = build_chan_state(chan_config=summary_cfg, **kwargs)
+
+        self.assertEqual(structure_summary(summary), structure_summary(full))
+        self.assertLess(len(summary.bars_sub), len(full.bars_sub))
+        self.assertLess(len(summary.fractals_sub), len(full.fractals_sub))
+        self.assertEqual(summary.bars_sub, full.bars_sub[summary.bar_offset_sub :])
+        self.assertEqual(summary.zhongshus_main, full.zhongshus_main[-len(summary.zhongshus_main) :])
+        self.assertGreaterEqual(len(summary.zhongshus_main), summary_cfg.snapshot_tail_depth)
+        self.assertEqual(summary.bis_sub[-1], full.bis_sub[-1])
+
+        full_index = snapshot_structure_index(full)
+        for name, items in snapshot_structure_index(summary).items():
+            self.assertEqual(items, {key: full_index[name][key] for key in items})
+
+    def test_summary_mode_backtest_matches_full_mode(self) -> None:
+        config = BacktestConfig(chan_mode="pragmatic", min_confidence=0.3)
+        cfg = get_chan_config("pragmatic")
+        full = run_backtest(config, bars_main=self.bars_main, bars_sub=self.bars_sub, chan_config=cfg)
+        summary = run_backtest(
+            config,
+            bars_main=self.bars_main,
+            bars_sub=self.bars_sub,
+            chan_config=replace(cfg, snapshot_mode="summary"),
+        )
+        self.assertGreater(len(full.trades), 0)
+        self.assertEqual(summary.signals, full.signals)
+        self.assertEqual([item.to_dict() for item in summary.trades], [item.to_dict() for item in full.trades])
+
+    def test_level_analysis_is_memoized_and_reuses_sub_zhongshus(self) -> None:
+        cfg = replace(get_chan_config("pragmatic"), require_sub_interval_confirmation=True)
+        snapshot = build_chan_state(
+            bars_main=self.bars_main,
+            bars_sub=self.bars_sub,
+            macd_main=compute_macd(self.bars_main),
+            macd_sub=compute_macd(self.bars_sub),
+            asof_time=self.bars_main[-1].time,
+            chan_config=cfg,
+        )
+        self.assertTrue(snapshot.zhongshus_sub)
+        with patch.object(chan_engine, "build_zhongshus_from_bis", side_effect=AssertionError("rebuilt")):
+            sub = analyze_level(snapshot, "sub", 0.12, cfg)
+            first = generate_signal(snapshot, macd_divergence_threshold=0.12, chan_config=cfg)
+        with patch.object(chan_engine, "detect_divergence_candidates", side_effect=AssertionError("recomputed")):
+            second = generate_signal(snapshot, macd_divergence_threshold=0.12, chan_config=cfg)
+        self.assertEqual(second, first)
+
+        self.assertIs(sub.zhongshus, snapshot.zhongshus_sub)
+        self.assertIs(analyze_level(snapshot, "sub", 0.12, cfg), sub)
+        self.assertIsNot(analyze_level(snapshot, "sub", 0.2, cfg), sub)
+
+
+if __name__ == "__main__":
+    unittest.main()
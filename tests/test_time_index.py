@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import fields
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from ai_trader.chan import build_chan_state
+from ai_trader.chan import engine as chan_engine
+from ai_trader.chan.config import get_chan_config
+from ai_trader.chan.core import buy_sell_points as bsp
+from ai_trader.chan.core.time_index import TimeOrdered, available_time, center_time
+from ai_trader.indicators import compute_macd
+from ai_trader.types import ChanSnapshot
+from tests.test_utils import aggregate_bars, make_random_walk_bars
+
+
+class TimeOrderedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        start = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+        bars_sub = make_random_walk_bars(start, count=4 * 450, minutes=60, seed=2)
+        bars_main = aggregate_bars(bars_sub, 4)
+        self.snapshot = build_chan_state(
+            bars_main=bars_main,
+            bars_sub=bars_sub,
+            macd_main=compute_macd(bars_main),
+            macd_sub=compute_macd(bars_sub),
+            asof_time=bars_main[-1].time,
+            chan_config=get_chan_config("pragmatic"),
+        )
+
+    def test_pipeline_lists_are_in_availability_order(self) -> None:
+        snap = self.snapshot
+        for items, key in (
+            (snap.bis_sub, available_time),
+            (snap.segments_sub, available_time),
+            (snap.zhongshus_sub, center_time),
+        ):
+            self.assertGreater(len(items), 1)
+            times = [key(item) for item in items]
+            self.assertEqual(times, sorted(times))
+
+    def test_window_queries_match_linear_filters(self) -> None:
+        snap = self.snapshot
+        bis = TimeOrdered(snap.bis_sub)
+        segments = TimeOrdered(snap.segments_sub)
+        zhongshus = TimeOrdered(snap.zhongshus_sub, key=center_time)
+        probes = [item.available_time for item in snap.bis_sub[::7]]
+        probes.append(snap.bis_sub[0].available_time.replace(year=2020))
+        for time in probes:
+            self.assertEqual(bis.after(time), [x for x in snap.bis_sub if x.available_time > time])
+            self.assertEqual(
+                segments.after(time, inclusive=True),
+                [x for x in snap.segments_sub if x.available_time >= time],
+            )
+            self.assertEqual(
+                bsp._confirmed_bis_in_b2_window(bis, time, snap.bis_sub[-1].available_time),
+                bsp._confirmed_bis_in_b2_window(snap.bis_sub, time, snap.bis_sub[-1].available_time),
+            )
+            self.assertEqual(
+                bsp._first_new_sub_center_after(zhongshus, time),
+                bsp._first_new_sub_center_after(snap.zhongshus_sub, time),
+            )
+        self.assertIs(TimeOrdered(bis).items, snap.bis_sub)
+
+    def test_only_pipeline_snapshots_are_bisected(self) -> None:
+        pipeline = self.snapshot
+        hand_built = ChanSnapshot(
+            **{item.name: getattr(pipeline, item.name) for item in fields(ChanSnapshot) if item.name != "time_ordered"}
+        )
+        hand_built.level_analyses = {}
+        self.assertTrue(pipeline.time_ordered)
+        self.assertFalse(hand_built.time_ordered)
+        cfg = get_chan_config("pragmatic")
+        for snapshot, expected in ((pipeline, True), (hand_built, False)):
+            with patch.object(chan_engine, "generate_signals", wraps=bsp.generate_signals) as derive:
+                chan_engine.analyze_level(snapshot, "main", 0.1, cfg)
+            self.assertTrue(derive.called)
+            self.assertTrue(all(call.kwargs["time_ordered"] is expected for call in derive.call_args_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+import random
 from datetime import datetime, timedelta, timezone
 
 from ai_trader.types import Bar
@@ -36,3 +37,46 @@ def make_synthetic_bars(
         )
         price = close_price
     return bars
+
+
+def make_random_walk_bars(start: datetime, count: int, minutes: int, seed: int = 7) -> list[Bar]:
+    rng = random.Random(seed)
+    bars: list[Bar] = []
+    price = 20000.0
+    for i in range(count):
+        close = max(1.0, price + rng.gauss(0.0, 40.0))
+        bars.append(
+            Bar(
+                time=start + timedelta(minutes=minutes * i),
+                open=price,
+                high=max(price, close) + rng.uniform(0.0, 20.0),
+                low=min(price, close) - rng.uniform(0.0, 20.0),
+                close=close,
+                volume=100.0 + i,
+            )
+        )
+        price = close
+    return bars
+
+
+def aggregate_bars(bars: list[Bar], hours: int) -> list[Bar]:
+    """Reference resample of close-time bars into closed ``hours`` buckets."""
+    out: list[Bar] = []
+    step = timedelta(hours=hours)
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    bucket: list[Bar] = []
+    for bar in bars:
+        bucket.append(bar)
+        if (bar.time - epoch) % step == timedelta(0):
+            out.append(
+                Bar(
+                    time=bar.time,
+                    open=bucket[0].open,
+                    high=max(item.high for item in bucket),
+                    low=min(item.low for item in bucket),
+                    close=bucket[-1].close,
+                    volume=sum(item.volume for item in bucket),
+                )
+            )
+            bucket = []
+    return out
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from ai_trader.chan.core.center import ZhongshuBuilder, build_zhongshus_from_bis
+from ai_trader.types import Bi, Zhongshu
+
+
+def _random_bis(rng: random.Random, count: int) -> list[Bi]:
+    """Alternating bis on a coarse grid so overlaps and extensions are common."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    price = float(rng.randrange(20))
+    bis: list[Bi] = []
+    for i in range(count):
+        direction = "up" if i % 2 == 0 else "down"
+        end_price = price + rng.randrange(1, 6) * (1 if direction == "up" else -1)
+        bis.append(
+            Bi(
+                direction=direction,
+                start_index=i,
+                end_index=i + 1,
+                start_price=price,
+                end_price=float(end_price),
+                event_time=start + timedelta(hours=i),
+                available_time=start + timedelta(hours=i + rng.randrange(1, 3)),
+            )
+        )
+        price = end_price
+    return bis
+
+
+def _apply(mirror: list[Zhongshu], events) -> None:
+    for event in events:
+        if event.kind == "removed":
+            del mirror[event.index]
+        elif event.index == len(mirror):
+            mirror.append(event.zhongshu)
+        else:
+            mirror[event.index] = event.zhongshu
+
+
+class ZhongshuBuilderTest(unittest.TestCase):
+    def test_incremental_matches_batch_and_events_replay_the_list(self) -> None:
+        rng = random.Random(1)
+        kinds: set[str] = set()
+        for trial in range(200):
+            bis = _random_bis(rng, rng.randrange(0, 120))
+            builder = ZhongshuBuilder()
+            mirror: list[Zhongshu] = []
+            for n, bi in enumerate(bis):
+                events = builder.push(bi)
+                kinds.update(event.kind for event in events)
+                _apply(mirror, events)
+                expected = build_zhongshus_from_bis(bis[: n + 1])
+                with self.subTest(trial=trial, n=n):
+                    self.assertEqual(builder.zhongshus, expected)
+                    self.assertEqual(mirror, expected)
+        self.assertTrue({"created", "extended", "expanded"} <= kinds)
+
+    def test_closed_centers_are_frozen_objects(self) -> None:
+        bis = _random_bis(random.Random(4), 200)
+        builder = ZhongshuBuilder()
+        builder.extend(bis[:100])
+        frozen = builder.zhongshus[:-1]
+        self.assertGreater(len(frozen), 2)
+        builder.extend(bis[100:])
+        self.assertTrue(all(a is b for a, b in zip(frozen[:-1], builder.zhongshus)))
+
+    def test_sync_rewinds_revised_tail_and_rebuilds_trimmed_window(self) -> None:
+        rng = random.Random(9)
+        bis = _random_bis(rng, 150)
+        builder = ZhongshuBuilder()
+        builder.extend(bis)
+        mirror = list(builder.zhongshus)
+
+        revised = bis[:-4] + _random_bis(rng, 6)
+        _apply(mirror, builder.sync(revised))
+        self.assertEqual(builder.zhongshus, build_zhongshus_from_bis(revised))
+        self.assertEqual(mirror, builder.zhongshus)
+
+        trimmed = revised[7:]
+        builder.sync(trimmed)
+        self.assertEqual(builder.zhongshus, build_zhongshus_from_bis(trimmed))
+
+        # The rebuild keeps the tail rewindable.
+        regrown = trimmed[:-2] + _random_bis(rng, 3)
+        builder.sync(regrown)
+        self.assertEqual(builder.zhongshus, build_zhongshus_from_bis(regrown))
+
+    def test_checkpoints_of_frozen_centers_are_pruned(self) -> None:
+        rng = random.Random(5)
+        bis = _random_bis(rng, 3000)
+        builder = ZhongshuBuilder()
+        for bi in bis:
+            builder.push(bi)
+        self.assertGreater(len(builder.zhongshus), 100)
+        self.assertLess(len(builder._checkpoints), 100)
+
+        # A revision reaching back before the pruned checkpoints rebuilds.
+        revised = bis[:-500] + _random_bis(rng, 40)
+        builder.sync(revised)
+        self.assertEqual(builder.zhongshus, build_zhongshus_from_bis(revised))
+
+
+if __name__ == "__main__":
+    unittest.main()